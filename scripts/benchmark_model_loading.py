@@ -0,0 +1,95 @@
+"""
+Benchmark cold model loading: legacy pickle vs native UBJSON + manifest.
+
+Each measurement runs in a fresh Python process (a cold worker), after
+xgboost has been imported, and reports load wall time and the growth of
+resident memory caused by the load.
+"""
+
+import json
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.model_store import current_manifest_path, load_model_artifacts  # noqa: E402
+
+N_RUNS = 5
+
+_CHILD_TEMPLATE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import xgboost  # noqa: F401  (import cost is excluded from the measurement)
+{setup_stmt}
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+rss_before = rss_kb()
+t0 = time.perf_counter()
+{load_stmt}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "rss_delta_kb": rss_kb() - rss_before}}))
+"""
+
+# (setup, load) statements per format; only the load statement is timed.
+_STATEMENTS = {
+    "pickle": (
+        "import pickle",
+        "with open({path!r}, 'rb') as f:\n    model = pickle.load(f)",
+    ),
+    "native": (
+        "from src.model_store import load_model_artifacts",
+        "model, _ = load_model_artifacts({path!r})",
+    ),
+}
+
+
+def _measure(fmt: str, path: str) -> dict:
+    setup_stmt, load_stmt = _STATEMENTS[fmt]
+    code = _CHILD_TEMPLATE.format(
+        root=str(PROJECT_ROOT),
+        setup_stmt=setup_stmt,
+        load_stmt=load_stmt.format(path=path),
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    manifest_path = str(PROJECT_ROOT / current_manifest_path())
+    model, _ = load_model_artifacts(manifest_path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = str(Path(tmp) / "volume_model.pkl")
+        with open(pickle_path, "wb") as f:
+            pickle.dump(model, f)
+
+        paths = {"pickle": pickle_path, "native": manifest_path}
+        print(f"{'format':<8} {'median load (ms)':>17} {'median RSS delta (MiB)':>23}")
+        for fmt, path in paths.items():
+            runs = [_measure(fmt, path) for _ in range(N_RUNS)]
+            seconds = statistics.median(r["seconds"] for r in runs)
+            rss_mib = statistics.median(r["rss_delta_kb"] for r in runs) / 1024.0
+            print(f"{fmt:<8} {seconds * 1000:>17.2f} {rss_mib:>23.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark price search strategies against the exhaustive grid.
+
+For a set of perturbed 'today' scenarios around today_example.json and
+for several grid steps, reports per strategy:
+  - mean number of candidates scored
+  - mean wall time per recommendation
+  - optimality gap of predicted profit vs the exhaustive grid optimum
+
+The "monotone" strategy is exact only for a model trained with monotone
+price constraints (run_pipeline.py --monotone); it is skipped, with a
+warning, when the current model was not.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.data_pipeline import load_raw_history, clean_history  # noqa: E402
+from src.features import build_feature_table  # noqa: E402
+from src.model_store import is_monotone_decreasing_in_price  # noqa: E402
+from src.price_search import SEARCH_STRATEGIES  # noqa: E402
+from src.pricing import (  # noqa: E402
+    HistoryContext,
+    load_model_with_manifest,
+    recommend_price_for_today,
+)
+
+N_SCENARIOS = 200
+GRID_STEPS = [0.05, 0.01]
+
+
+def _scenarios(base: dict, n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64(base["date"]) + rng.integers(0, 60, n)
+    out = []
+    for i in range(n):
+        shift = rng.normal(0, 1.5)
+        out.append(
+            {
+                "date": str(dates[i]),
+                "price": round(base["price"] + shift + rng.normal(0, 0.5), 2),
+                "cost": round(base["cost"] + shift + rng.normal(0, 0.5), 2),
+                "comp1_price": round(base["comp1_price"] + shift + rng.normal(0, 0.5), 2),
+                "comp2_price": round(base["comp2_price"] + shift + rng.normal(0, 0.5), 2),
+                "comp3_price": round(base["comp3_price"] + shift + rng.normal(0, 0.5), 2),
+            }
+        )
+    return out
+
+
+def main() -> None:
+    with open(PROJECT_ROOT / "data/raw/today_example.json") as f:
+        base = json.load(f)
+
+    ctx = HistoryContext.from_feature_table(
+        build_feature_table(clean_history(load_raw_history()))
+    )
+    model, manifest = load_model_with_manifest()
+    feature_cols = manifest["feature_columns"]
+    scenarios = _scenarios(base, N_SCENARIOS)
+
+    strategies = list(SEARCH_STRATEGIES)
+    if not is_monotone_decreasing_in_price(manifest):
+        strategies.remove("monotone")
+        print(
+            "WARNING: skipping 'monotone': the current model was not trained with "
+            "monotone price constraints (rerun run_pipeline.py with --monotone).",
+            file=sys.stderr,
+        )
+
+    print(
+        f"{'step':>5} {'strategy':<15} {'evals':>7} {'ms/req':>7} "
+        f"{'exact %':>8} {'mean gap %':>11} {'max gap %':>10}"
+    )
+    for step in GRID_STEPS:
+        optimum = [
+            recommend_price_for_today(t, ctx, model, feature_cols, "grid", step)
+            for t in scenarios
+        ]
+        for strategy in strategies:
+            t0 = time.perf_counter()
+            results = [
+                recommend_price_for_today(t, ctx, model, feature_cols, strategy, step)
+                for t in scenarios
+            ]
+            ms = (time.perf_counter() - t0) * 1000.0 / len(scenarios)
+
+            evals = np.mean([r["num_candidates_evaluated"] for r in results])
+            gaps = np.array(
+                [
+                    (o["expected_profit"] - r["expected_profit"]) / abs(o["expected_profit"])
+                    for o, r in zip(optimum, results)
+                ]
+            ) * 100.0
+            exact = np.mean(
+                [o["recommended_price"] == r["recommended_price"] for o, r in zip(optimum, results)]
+            ) * 100.0
+            print(
+                f"{step:>5.2f} {strategy:<15} {evals:>7.1f} {ms:>7.2f} "
+                f"{exact:>8.1f} {gaps.mean():>11.3f} {gaps.max():>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
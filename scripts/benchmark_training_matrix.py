@@ -0,0 +1,90 @@
+"""
+Benchmark how the training matrix is built: wall time and peak memory.
+
+Compares
+  - sklearn fit:   XGBRegressor.fit on the pandas feature frame (before)
+  - float32 QDM:   QuantileDMatrix from contiguous float32 arrays (after)
+  - DMatrix cache: binary DMatrix cache, first run (writes) and a rerun (loads)
+with the same hyperparameters. Each variant runs in a fresh process so
+its peak RSS is not inherited from the others; the table shows the peak
+RSS above the process's footprint after loading the feature table (the
+peak is reset after loading where Linux allows it).
+--scale repeats the feature table to benchmark larger inputs.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import FEATURES_PATH, XGB_PARAMS  # noqa: E402
+from src.data_pipeline import clean_history, load_raw_history  # noqa: E402
+from src.external_training import current_rss_mb, peak_rss_mb, reset_peak_rss  # noqa: E402
+from src.features import FEATURE_COLUMNS, TARGET_COLUMN, build_feature_table  # noqa: E402
+from src.modeling import build_regressor, fit_regressor  # noqa: E402
+
+VARIANTS = ["sklearn fit", "float32 QDM", "DMatrix cache (write)", "DMatrix cache (load)"]
+
+
+def _run(variant: str, features_path: str, params: dict, cache_dir: str) -> dict:
+    feat_df = pd.read_parquet(features_path)
+    reset_peak_rss()
+    base_mb = current_rss_mb()
+    if base_mb is None:
+        # No procfs: fall back to the peak so far.
+        base_mb = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    if variant == "sklearn fit":
+        build_regressor(params=params).fit(feat_df[FEATURE_COLUMNS], feat_df[TARGET_COLUMN])
+    elif variant == "float32 QDM":
+        fit_regressor(feat_df, params=params)
+    else:
+        fit_regressor(feat_df, params=params, dmatrix_cache_dir=cache_dir)
+    wall_s = time.perf_counter() - t0
+
+    return {"variant": variant, "wall_s": wall_s, "base_mb": base_mb, "peak_mb": peak_rss_mb()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=50, help="times to repeat the feature table")
+    parser.add_argument("--rounds", type=int, default=XGB_PARAMS["n_estimators"])
+    args = parser.parse_args()
+
+    if os.path.exists(FEATURES_PATH):
+        feat_df = pd.read_parquet(FEATURES_PATH)
+    else:
+        feat_df = build_feature_table(clean_history(load_raw_history()))
+    feat_df = pd.concat([feat_df] * args.scale, ignore_index=True)
+    params = {**XGB_PARAMS, "n_estimators": args.rounds}
+
+    print(f"{len(feat_df)} rows x {len(FEATURE_COLUMNS)} features, {args.rounds} rounds")
+    print(f"{'variant':<22} {'wall s':>7} {'peak RSS +MiB':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        features_path = os.path.join(tmp, "features.parquet")
+        feat_df.to_parquet(features_path, index=False)
+        cache_dir = os.path.join(tmp, "dmatrix_cache")
+
+        for variant in VARIANTS:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                row = pool.submit(_run, variant, features_path, params, cache_dir).result()
+            print(
+                f"{row['variant']:<22} {row['wall_s']:>7.2f} "
+                f"{row['peak_mb'] - row['base_mb']:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark warm-start retraining against full refits.
+
+Replays the last weeks of history as if they arrived one update at a
+time. At each update the model is either refit from scratch on all data
+so far, or warm-started from the previous warm-started model with
+WARM_START_N_TREES trees fitted to the last WARM_START_RECENT_DAYS.
+Both are scored on the days until the next update, so the report shows
+training time and how far warm-start accuracy drifts from a full refit.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import (  # noqa: E402
+    FEATURES_PATH,
+    WARM_START_N_TREES,
+    WARM_START_RECENT_DAYS,
+)
+from src.data_pipeline import clean_history, load_raw_history  # noqa: E402
+from src.features import FEATURE_COLUMNS, TARGET_COLUMN, build_feature_table  # noqa: E402
+from src.modeling import build_regressor, evaluate_model, fit_warm_start  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=12, help="number of updates")
+    parser.add_argument("--every-days", type=int, default=7, help="days between updates")
+    parser.add_argument("--trees", type=int, default=WARM_START_N_TREES)
+    parser.add_argument("--recent-days", type=int, default=WARM_START_RECENT_DAYS)
+    args = parser.parse_args()
+
+    if os.path.exists(FEATURES_PATH):
+        feat_df = pd.read_parquet(FEATURES_PATH)
+    else:
+        feat_df = build_feature_table(clean_history(load_raw_history()))
+
+    step = pd.Timedelta(days=args.every_days)
+    last_date = feat_df["date"].max()
+    origins = [last_date + step * (k - args.updates + 1) for k in range(args.updates)]
+
+    def upto(origin):
+        return feat_df[feat_df["date"] < origin]
+
+    base = build_regressor()
+    base.fit(upto(origins[0])[FEATURE_COLUMNS], upto(origins[0])[TARGET_COLUMN])
+    warm = base
+
+    print(
+        f"{'origin':<11} {'full s':>7} {'warm s':>7} {'speedup':>8} "
+        f"{'full MAE':>9} {'warm MAE':>9} {'drift %':>8}"
+    )
+    totals = {"full": 0.0, "warm": 0.0}
+    for origin in origins[1:]:
+        history = upto(origin)
+        recent = history[history["date"] > origin - pd.Timedelta(days=args.recent_days)]
+        test = feat_df[(feat_df["date"] >= origin) & (feat_df["date"] < origin + step)]
+
+        t0 = time.perf_counter()
+        full = build_regressor()
+        full.fit(history[FEATURE_COLUMNS], history[TARGET_COLUMN])
+        full_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        warm = fit_warm_start(warm, recent, args.trees)
+        warm_s = time.perf_counter() - t0
+
+        totals["full"] += full_s
+        totals["warm"] += warm_s
+        full_mae = evaluate_model(full, test)["mae"]
+        warm_mae = evaluate_model(warm, test)["mae"]
+        print(
+            f"{origin.date()!s:<11} {full_s:>7.2f} {warm_s:>7.2f} {full_s / warm_s:>7.1f}x "
+            f"{full_mae:>9.1f} {warm_mae:>9.1f} {(warm_mae / full_mae - 1) * 100:>8.1f}"
+        )
+
+    print(
+        f"total: full {totals['full']:.1f}s, warm {totals['warm']:.1f}s "
+        f"({totals['full'] / totals['warm']:.1f}x); "
+        f"final warm model has {warm.get_booster().num_boosted_rounds()} trees"
+    )
+
+
+if __name__ == "__main__":
+    main()
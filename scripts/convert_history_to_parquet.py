@@ -0,0 +1,50 @@
+"""
+One-time conversion of the raw history CSV into the partitioned Parquet
+history store (station_id=<id>/year_month=<YYYY-MM>/).
+
+The CSV is streamed in chunks and cleaned chunk by chunk, so files
+larger than memory can be converted.
+
+Point DATA_RAW_HISTORY_PATH in src/config.py at the output directory to
+make the pipeline and the API read from the store.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import (  # noqa: E402
+    CSV_INGEST_CHUNK_ROWS,
+    DATA_RAW_HISTORY_PATH,
+    HISTORY_STORE_DIR,
+)
+from src.data_pipeline import ingest_history_csv  # noqa: E402
+from src.history_store import history_dataset  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", default=DATA_RAW_HISTORY_PATH, help="raw history CSV")
+    parser.add_argument("--out", default=HISTORY_STORE_DIR, help="history store directory")
+    parser.add_argument(
+        "--chunk-rows", type=int, default=CSV_INGEST_CHUNK_ROWS, help="CSV rows per chunk"
+    )
+    args = parser.parse_args()
+
+    print(f"Streaming {args.csv} into {args.out}...")
+    stats = ingest_history_csv(args.csv, args.out, chunk_rows=args.chunk_rows)
+
+    n_files = len(history_dataset(args.out).files)
+    print(
+        f"Read {stats['rows_read']} rows in {stats['chunks']} chunks, "
+        f"kept {stats['rows_kept']} after cleaning ({n_files} partition files)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Memory report: inferred (float64/int64/object) vs compact dtype schema.
+
+Tiles the raw history across many synthetic stations, then reports the
+in-memory size of the raw, cleaned and feature tables under both
+layouts, plus the time to build an XGBoost DMatrix from the training
+matrix.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import xgboost as xgb
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import DATA_RAW_HISTORY_PATH, STATION_COLUMN  # noqa: E402
+from src.data_pipeline import clean_history, load_raw_history  # noqa: E402
+from src.features import FEATURE_COLUMNS, TARGET_COLUMN, build_feature_table  # noqa: E402
+
+N_RUNS = 5
+
+
+def _widen(df: pd.DataFrame) -> pd.DataFrame:
+    """The layout pandas infers without a schema: float64, int64, object."""
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = object
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float64"
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = "int64"
+    return df.astype(dtypes)
+
+
+def _mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def _dmatrix_ms(df: pd.DataFrame) -> float:
+    times = []
+    for _ in range(N_RUNS):
+        t0 = time.perf_counter()
+        xgb.DMatrix(df[FEATURE_COLUMNS], label=df[TARGET_COLUMN])
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stations", type=int, default=200, help="synthetic stations")
+    args = parser.parse_args()
+
+    base = pd.read_csv(DATA_RAW_HISTORY_PATH)
+    tiled = pd.concat(
+        [base.assign(**{STATION_COLUMN: f"s{i:05d}"}) for i in range(args.stations)],
+        ignore_index=True,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = str(Path(tmp) / "history.csv")
+        tiled.to_csv(csv_path, index=False)
+
+        inferred_raw = pd.read_csv(csv_path, parse_dates=["date"])
+        raw = load_raw_history(csv_path)
+
+    clean = clean_history(raw)
+    feats = build_feature_table(clean)
+    tables = [
+        ("raw", inferred_raw, raw),
+        ("clean", _widen(clean), clean),
+        ("features", _widen(feats), feats),
+    ]
+
+    print(f"{len(raw)} rows, {args.stations} stations")
+    print(f"{'table':<10} {'inferred MB':>12} {'schema MB':>10} {'ratio':>6}")
+    for name, inferred, compact in tables:
+        print(
+            f"{name:<10} {_mb(inferred):>12.1f} {_mb(compact):>10.1f} "
+            f"{_mb(compact) / _mb(inferred):>6.2f}"
+        )
+
+    inferred_ms = _dmatrix_ms(_widen(feats))
+    compact_ms = _dmatrix_ms(feats)
+    print(
+        f"DMatrix build (median of {N_RUNS}): inferred {inferred_ms:.1f} ms, "
+        f"schema {compact_ms:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Run the rolling-origin backtest of the volume model and write the
+per-fold report (metrics and timings) to Parquet.
+
+Uses the saved feature table when present, otherwise builds it from the
+raw history.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.backtest import rolling_origin_folds, run_backtest  # noqa: E402
+from src.config import (  # noqa: E402
+    BACKTEST_HORIZON_DAYS,
+    BACKTEST_MIN_TRAIN_DAYS,
+    BACKTEST_REPORT_PATH,
+    BACKTEST_STEP_DAYS,
+    FEATURES_PATH,
+)
+from src.data_pipeline import clean_history, load_raw_history  # noqa: E402
+from src.features import build_feature_table  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPUs)")
+    parser.add_argument("--min-train-days", type=int, default=BACKTEST_MIN_TRAIN_DAYS)
+    parser.add_argument("--step-days", type=int, default=BACKTEST_STEP_DAYS)
+    parser.add_argument("--horizon-days", type=int, default=BACKTEST_HORIZON_DAYS)
+    parser.add_argument(
+        "--window-days", type=int, default=None, help="sliding training window (default: expanding)"
+    )
+    parser.add_argument("--out", default=BACKTEST_REPORT_PATH, help="Parquet report path")
+    args = parser.parse_args()
+
+    if os.path.exists(FEATURES_PATH):
+        feat_df = pd.read_parquet(FEATURES_PATH)
+    else:
+        feat_df = build_feature_table(clean_history(load_raw_history()))
+
+    folds = rolling_origin_folds(
+        feat_df["date"],
+        min_train_days=args.min_train_days,
+        horizon_days=args.horizon_days,
+        step_days=args.step_days,
+        window_days=args.window_days,
+    )
+    print(f"Running {len(folds)} folds...")
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    report = run_backtest(feat_df, folds=folds, workers=args.workers, report_path=args.out)
+
+    print(
+        f"{len(report)} folds on {report.attrs['workers']} workers in "
+        f"{report.attrs['wall_s']:.1f}s (sum of fold times {report['fold_s'].sum():.1f}s)"
+    )
+    print(f"MAE  mean {report['mae'].mean():.1f}  median {report['mae'].median():.1f}")
+    print(f"RMSE mean {report['rmse'].mean():.1f}")
+    print(f"Saved report to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,42 +3,312 @@ CLI script to run the full pipeline:
 - load raw history
 - clean and feature-engineer
 - train volume model
+
+Pass --monotone to train with monotone price constraints.
+
+Pass --incremental to ingest only the rows appended to the raw CSV since
+the last incremental run (tracked by a watermark) into the history store
+and featurize just those rows; the first run, or a run after the CSV was
+rewritten, falls back to a full ingestion.
+
+Pass --warm-start to add a few trees fitted to recent data to the current
+model instead of retraining from scratch (a full retrain still happens
+every WARM_START_MAX_UPDATES updates, and whenever --monotone does not
+match the current model's constraints).
+
+Pass --tuned to train with the hyperparameters saved by
+scripts/run_tuning.py instead of XGB_PARAMS.
+
+Pass --external-memory to write the feature table as a partitioned
+Parquet dataset and train from it out of core (streamed in batches
+through an XGBoost external-memory DMatrix). Only training is out of
+core: the feature table is still built in memory first, so both the
+training and the pipeline-wide peak RSS are reported.
+
+Pass --dmatrix-cache to keep the training DMatrix in binary form under
+DMATRIX_CACHE_DIR, so retraining on unchanged features (e.g. with other
+hyperparameters) skips building it.
+
+Stage outputs are cached by a hash of their inputs (data fingerprint,
+relevant config values, code of the modules involved) under
+STAGE_CACHE_DIR, so unchanged stages are skipped. Pass --force STAGE to
+rerun STAGE and every stage after it regardless ("all" reruns everything).
 """
 
+import argparse
+import json
 import os
 import sys
 from pathlib import Path
 
+import pandas as pd
+import xgboost
+
 # Ensure project root is on sys.path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src import external_training, feature_store, model_store, modeling  # noqa: E402
 from src.data_pipeline import load_raw_history, clean_history  # noqa: E402
-from src.features import build_feature_table  # noqa: E402
-from src.modeling import train_volume_model  # noqa: E402
-from src.config import DATA_PROCESSED_DIR  # noqa: E402
+from src.features import FEATURE_COLUMNS, build_feature_table  # noqa: E402
+from src.modeling import train_volume_model, warm_start_volume_model  # noqa: E402
+from src.external_training import train_volume_model_external  # noqa: E402
+from src.feature_store import (  # noqa: E402
+    history_sha256,
+    write_feature_dataset,
+    write_history_snapshot,
+)
+from src.incremental_ingest import (  # noqa: E402
+    append_feature_rows,
+    ingest_full,
+    ingest_incremental,
+    reset_watermark,
+)
+from src.model_store import (  # noqa: E402
+    promote_model_release,
+    read_manifest,
+    release_manifest_path,
+)
+from src.tuning import load_tuned_params  # noqa: E402
+from src.stage_cache import (  # noqa: E402
+    cached_frame,
+    cached_record,
+    code_fingerprint,
+    data_stage_keys,
+    frame_fingerprint,
+    stage_key,
+)
+from src.config import (  # noqa: E402
+    DATA_PROCESSED_DIR,
+    DATA_RAW_HISTORY_PATH,
+    DMATRIX_CACHE_DIR,
+    FEATURES_PATH,
+    MONOTONE_DECREASING_FEATURES,
+    RANDOM_STATE,
+    TRAINING_METADATA_PATH,
+    VALIDATION_FRACTION,
+    XGB_PARAMS,
+)
+
+STAGES = ["load", "clean", "features", "train"]
+
+
+def build_features_incremental() -> tuple:
+    """
+    Extend the saved feature table with rows appended since the last run.
+    Returns (features, commit); call commit() once the table is saved.
+    """
+    ingested = ingest_incremental() if os.path.exists(FEATURES_PATH) else None
+    if ingested is None:
+        print("Full ingestion into the history store...")
+        clean_df, commit = ingest_full()
+        return build_feature_table(clean_df), commit
+
+    new_features, commit = ingested
+    print(f"Ingested {len(new_features)} new feature rows")
+    return append_feature_rows(pd.read_parquet(FEATURES_PATH), new_features), commit
+
+
+def _report(stage: str, hit: bool) -> None:
+    print(f"  [{stage}] {'cache hit' if hit else 'computed'}")
+
+
+def build_features_cached(force: set) -> tuple:
+    """
+    load -> clean -> features through the stage cache.
+
+    Keys chain from the raw data fingerprint, so a features hit skips
+    reading the raw history entirely. Returns (features, features_key).
+    """
+    load_key, clean_key, features_key = data_stage_keys(history_sha256(DATA_RAW_HISTORY_PATH))
+
+    def load() -> pd.DataFrame:
+        df, hit = cached_frame("load", load_key, load_raw_history, "load" in force)
+        _report("load", hit)
+        return df
+
+    def clean() -> pd.DataFrame:
+        df, hit = cached_frame(
+            "clean", clean_key, lambda: clean_history(load()), "clean" in force
+        )
+        _report("clean", hit)
+        return df
+
+    feat_df, hit = cached_frame(
+        "features", features_key, lambda: build_feature_table(clean()), "features" in force
+    )
+    _report("features", hit)
+    return feat_df, features_key
+
+
+def _current_model_sha() -> str:
+    try:
+        return read_manifest()["sha256"]
+    except (OSError, ValueError):
+        return ""
+
+
+def train_cached(
+    feat_df: pd.DataFrame,
+    features_key: str,
+    monotone: bool,
+    params: dict,
+    warm_start: bool,
+    force: set,
+    external_memory: bool = False,
+    dmatrix_cache: bool = False,
+) -> dict:
+    """Train through the stage cache; a hit re-promotes the cached release."""
+    train_key = stage_key(
+        "train",
+        upstream=features_key,
+        # A warm start continues whatever model is current.
+        warm_start_base=_current_model_sha() if warm_start else None,
+        external_memory=external_memory,
+        xgb_params=params,
+        monotone=monotone,
+        monotone_features=MONOTONE_DECREASING_FEATURES if monotone else None,
+        feature_columns=FEATURE_COLUMNS,
+        validation_fraction=VALIDATION_FRACTION,
+        random_state=RANDOM_STATE,
+        xgboost_version=xgboost.__version__,
+        code=code_fingerprint(modeling, model_store, external_training, feature_store),
+    )
+
+    def train() -> dict:
+        if external_memory:
+            write_feature_dataset(feat_df)
+            train_volume_model_external(monotone=monotone, params=params)
+        elif warm_start:
+            warm_start_volume_model(feat_df, params=params, monotone=monotone)
+        else:
+            train_volume_model(
+                feat_df,
+                monotone=monotone,
+                params=params,
+                dmatrix_cache_dir=DMATRIX_CACHE_DIR if dmatrix_cache else None,
+            )
+        with open(TRAINING_METADATA_PATH, "r") as f:
+            return json.load(f)
+
+    metadata, hit = cached_record(
+        "train",
+        train_key,
+        train,
+        "train" in force,
+        is_valid=lambda m: os.path.exists(release_manifest_path(m["model_version"])),
+    )
+    _report("train", hit)
+    if hit:
+        promote_model_release(metadata["model_version"])
+        with open(TRAINING_METADATA_PATH, "w") as f:
+            json.dump(metadata, f)
+    return metadata
 
 
 def main() -> None:
-    os.makedirs(DATA_PROCESSED_DIR, exist_ok=True)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--monotone",
+        action="store_true",
+        help="constrain predicted volume to be non-increasing in price",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only ingest and featurize rows appended since the last incremental run",
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="add trees fitted to recent data to the current model instead of a full retrain",
+    )
+    parser.add_argument(
+        "--tuned",
+        action="store_true",
+        help="train with the hyperparameters saved by scripts/run_tuning.py",
+    )
+    parser.add_argument(
+        "--external-memory",
+        action="store_true",
+        help="train out of core from a partitioned Parquet feature dataset",
+    )
+    parser.add_argument(
+        "--dmatrix-cache",
+        action="store_true",
+        help=f"cache the training DMatrix in binary form under {DMATRIX_CACHE_DIR}",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        choices=STAGES + ["all"],
+        metavar="STAGE",
+        help=f"rerun STAGE and later stages even if cached ({', '.join(STAGES)} or all)",
+    )
+    args = parser.parse_args()
+    if args.external_memory and args.warm_start:
+        parser.error("--external-memory and --warm-start cannot be combined")
+    forced = [STAGES.index(s) for s in args.force if s != "all"]
+    if "all" in args.force:
+        forced.append(0)
+    force = set(STAGES[min(forced):]) if forced else set()
 
-    print("Loading raw history...")
-    raw_df = load_raw_history()
+    os.makedirs(DATA_PROCESSED_DIR, exist_ok=True)
 
-    print("Cleaning history...")
-    clean_df = clean_history(raw_df)
+    commit_ingest = None
+    if args.incremental:
+        feat_df, commit_ingest = build_features_incremental()
+        features_key = stage_key("features", data=frame_fingerprint(feat_df))
+    else:
+        print("Building feature table (load -> clean -> features)...")
+        feat_df, features_key = build_features_cached(force)
+        # The table now also covers rows the watermark has not seen; the
+        # next --incremental run must start over with a full ingestion.
+        reset_watermark()
 
-    print("Building feature table...")
-    feat_df = build_feature_table(clean_df)
+    tmp_path = FEATURES_PATH + ".tmp"
+    feat_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, FEATURES_PATH)
+    print(f"Saved feature table to {FEATURES_PATH}")
+    if commit_ingest is not None:
+        # Only now may the watermark move past the ingested rows.
+        commit_ingest()
 
-    feat_path = Path(DATA_PROCESSED_DIR) / "features.parquet"
-    feat_df.to_parquet(feat_path, index=False)
-    print(f"Saved feature table to {feat_path}")
+    meta = write_history_snapshot(feat_df)
+    print(f"Saved {meta['n_rows_snapshot']}-row serving history snapshot")
 
     print("Training volume model...")
-    _, metrics = train_volume_model(feat_df)
-    print("Training complete. Validation metrics:", metrics)
+    params = load_tuned_params() if args.tuned else XGB_PARAMS
+    metadata = train_cached(
+        feat_df,
+        features_key,
+        args.monotone,
+        params,
+        args.warm_start,
+        force,
+        external_memory=args.external_memory,
+        dmatrix_cache=args.dmatrix_cache,
+    )
+    print("Training complete. Validation metrics:", metadata["metrics"])
+    if "external_memory" in metadata:
+        mem = metadata["external_memory"]
+        if mem.get("peak_rss_scope") == "training":
+            print(
+                f"Out-of-core training peak RSS: {mem['peak_rss_mb']:.0f} MiB "
+                f"({mem['peak_rss_mb'] - mem['rss_before_mb']:+.0f} MiB over the "
+                f"{mem['rss_before_mb']:.0f} MiB held before training)"
+            )
+            print(
+                f"Pipeline peak RSS (includes the in-memory feature table): "
+                f"{max(mem['peak_rss_mb'], mem.get('peak_rss_before_mb', 0.0)):.0f} MiB"
+            )
+        else:
+            print(
+                f"Process peak RSS (includes the in-memory feature table): "
+                f"{mem['peak_rss_mb']:.0f} MiB"
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+"""
+Search XGBoost hyperparameters for the volume model (successive halving
+over time-ordered validation folds), save the best configuration next to
+the model artifacts and write the per-trial report to Parquet.
+
+Train with the result via `python scripts/run_pipeline.py --tuned`.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import (  # noqa: E402
+    FEATURES_PATH,
+    TUNED_PARAMS_PATH,
+    TUNING_ETA,
+    TUNING_MAX_ROUNDS,
+    TUNING_N_TRIALS,
+    TUNING_REPORT_PATH,
+)
+from src.data_pipeline import clean_history, load_raw_history  # noqa: E402
+from src.features import build_feature_table  # noqa: E402
+from src.tuning import best_params, save_tuned_params, successive_halving  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=TUNING_N_TRIALS)
+    parser.add_argument("--eta", type=int, default=TUNING_ETA)
+    parser.add_argument("--max-rounds", type=int, default=TUNING_MAX_ROUNDS)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPUs)")
+    parser.add_argument("--out", default=TUNING_REPORT_PATH, help="Parquet report path")
+    args = parser.parse_args()
+
+    if os.path.exists(FEATURES_PATH):
+        feat_df = pd.read_parquet(FEATURES_PATH)
+    else:
+        feat_df = build_feature_table(clean_history(load_raw_history()))
+
+    t0 = time.perf_counter()
+    report = successive_halving(
+        feat_df,
+        n_trials=args.trials,
+        eta=args.eta,
+        max_rounds=args.max_rounds,
+        workers=args.workers,
+    )
+    search_wall_s = time.perf_counter() - t0
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    report.to_parquet(args.out, index=False)
+
+    print(f"{'rung':>4} {'trials':>6} {'rounds':>6} {'best rmse':>10} {'trial s':>8} {'rung s':>7}")
+    for rung, rows in report.groupby("rung"):
+        print(
+            f"{rung:>4} {len(rows):>6} {rows['num_boost_round'].iloc[0]:>6} "
+            f"{rows['val_rmse'].min():>10.1f} {rows['wall_s'].mean():>8.2f} "
+            f"{rows['rung_wall_s'].iloc[0]:>7.1f}"
+        )
+
+    params = best_params(report)
+    save_tuned_params(params, report, search_wall_s)
+    print(f"Best params: {params}")
+    print(f"Saved to {TUNED_PARAMS_PATH}; report in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
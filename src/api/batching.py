@@ -0,0 +1,80 @@
+"""
+Async micro-batching of requests that share one expensive batched call.
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+
+class MicroBatcher:
+    """
+    Coalesce items submitted within a short window into one batch call.
+
+    A batch is flushed when `max_batch_size` items are pending or when
+    `max_wait_s` has elapsed since the first pending item arrived. The
+    batch function runs in the default executor so the event loop keeps
+    accepting requests while the model is busy.
+
+    If the batch function raises, items are retried one at a time so a
+    single bad request cannot fail the requests it was batched with.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_s: float,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+
+        self._process_batch = process_batch
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max_wait_s
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue `item` for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait_s, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the task is not garbage-collected mid-flight.
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+
+        try:
+            results = await loop.run_in_executor(None, self._process_batch, items)
+        except Exception as exc:
+            if len(batch) > 1:
+                await asyncio.gather(*(self._run([entry]) for entry in batch))
+            else:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,103 @@
+"""
+In-process LRU + TTL cache for price recommendations.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from ..config import CACHE_PRICE_DECIMALS, DEFAULT_STATION_ID, STATION_COLUMN
+
+
+def recommendation_cache_key(
+    today: Dict, model_version: str, history_version: Hashable
+) -> Tuple:
+    """
+    Cache key for a 'today' payload.
+
+    Prices and cost are quantized to CACHE_PRICE_DECIMALS so payloads that
+    agree to the cent share an entry. The station, model and history
+    versions are part of the key, so a new model or history snapshot never
+    serves stale results.
+    """
+    return (
+        str(today.get(STATION_COLUMN) or DEFAULT_STATION_ID),
+        str(today["date"]),
+        round(float(today["price"]), CACHE_PRICE_DECIMALS),
+        round(float(today["cost"]), CACHE_PRICE_DECIMALS),
+        round(float(today["comp1_price"]), CACHE_PRICE_DECIMALS),
+        round(float(today["comp2_price"]), CACHE_PRICE_DECIMALS),
+        round(float(today["comp3_price"]), CACHE_PRICE_DECIMALS),
+        model_version,
+        history_version,
+    )
+
+
+class RecommendationCache:
+    """
+    Bounded mapping with least-recently-used eviction and per-entry TTL.
+
+    Expired entries are dropped lazily when looked up. Hit, miss,
+    eviction and expiry counts are kept for the metrics endpoint.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh `key`, evicting the least recently used entry if full."""
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_s": self._ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -2,25 +2,58 @@
 FastAPI app exposing the pricing engine as an HTTP API.
 """
 
-from typing import Any, List
+import asyncio
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from ..data_pipeline import load_raw_history, clean_history
-from ..features import build_feature_table
-from ..pricing import load_model_and_config, recommend_price_for_today
+from ..config import (
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+    BULK_INFERENCE_CHUNK_SIZE,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTL_S,
+    DEFAULT_STATION_ID,
+    MODEL_POLL_INTERVAL_S,
+    OBSERVATION_LOG_PATH,
+    OBSERVATION_POLL_INTERVAL_S,
+)
+from ..data_pipeline import clean_history
+from ..feature_store import load_history_engines
+from ..incremental_features import IncrementalFeatureEngine
+from ..model_store import current_manifest_path, read_manifest, release_manifest_path
+from ..pricing import HistoryContext, recommend_prices_batch
+from .batching import MicroBatcher
+from .cache import RecommendationCache, recommendation_cache_key
+from .model_reloader import ModelBundle, load_bundle
+from .observation_log import ObservationLog
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Fuel Price Optimizer", version="1.0.0")
 
-# Globals initialized at startup
-_history_features: pd.DataFrame | None = None
-_model: Any | None = None
-_feature_cols: List[str] | None = None
+# Globals initialized at startup. `_history_contexts` (station -> context)
+# and `_bundle` are immutable snapshots that /observe and model reloads
+# replace wholesale, so readers always see a consistent set of artifacts.
+_history_engines: Dict[str, IncrementalFeatureEngine] | None = None
+_history_lock = threading.Lock()
+_history_contexts: Dict[str, HistoryContext] | None = None
+_bundle: ModelBundle | None = None
+_reload_lock = threading.Lock()
+_watcher_task: Optional[asyncio.Task] = None
+_observation_log = ObservationLog(OBSERVATION_LOG_PATH)
+_observation_task: Optional[asyncio.Task] = None
 
 
 class TodayRequest(BaseModel):
+    station_id: str = Field(DEFAULT_STATION_ID, description="Station to price")
     date: str = Field(..., description="Date for which price is to be recommended")
     price: float = Field(..., description="Last observed company price (yesterday)")
     cost: float = Field(..., description="Today's cost per liter")
@@ -29,18 +62,187 @@ class TodayRequest(BaseModel):
     comp3_price: float
 
 
+class ObservationRequest(BaseModel):
+    station_id: str = Field(DEFAULT_STATION_ID, description="Station the outcome belongs to")
+    date: str = Field(..., description="Date of the realized outcome")
+    price: float = Field(..., description="Company price charged that day")
+    cost: float = Field(..., description="Cost per liter that day")
+    comp1_price: float
+    comp2_price: float
+    comp3_price: float
+    volume: int = Field(..., description="Realized volume sold that day (whole units)")
+
+
+class ReloadRequest(BaseModel):
+    version: Optional[str] = Field(
+        None, description="Release to load; defaults to the one CURRENT points at"
+    )
+
+
+def _score_batch(items: List[Tuple[Dict, HistoryContext, ModelBundle]]) -> List[Dict]:
+    """
+    Score a micro-batch of (today, history context, bundle) requests.
+
+    Each request is scored with the context and bundle it was keyed on at
+    submission, not whatever is loaded at flush time, so a model swap or
+    an /observe in between never caches a result under a stale key.
+    Requests are grouped by bundle, one inference pass per bundle.
+    """
+    by_bundle: Dict[int, List[int]] = {}
+    for i, (_, _, bundle) in enumerate(items):
+        by_bundle.setdefault(id(bundle), []).append(i)
+
+    results: List[Optional[Dict]] = [None] * len(items)
+    for indices in by_bundle.values():
+        bundle = items[indices[0]][2]
+        scored = recommend_prices_batch(
+            todays=[items[i][0] for i in indices],
+            history=[items[i][1] for i in indices],
+            model=bundle.model,
+            feature_cols=bundle.feature_cols,
+        )
+        for i, result in zip(indices, scored):
+            results[i] = result
+    return results
+
+
+_batcher = MicroBatcher(
+    _score_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_s=BATCH_MAX_WAIT_MS / 1000.0,
+)
+
+_cache = RecommendationCache(max_entries=CACHE_MAX_ENTRIES, ttl_s=CACHE_TTL_S)
+_singleflight = SingleFlight()
+
+
 @app.on_event("startup")
 def startup_load_artifacts() -> None:
     """
-    Load historical data, feature table, and the trained model into memory.
+    Load the history snapshot and the trained model into memory.
+
+    History comes from the compact parquet snapshot written by the
+    pipeline when it matches the raw data, otherwise it is rebuilt from
+    the CSV, and the observation log is replayed on top. Either way it is
+    reduced to a HistoryContext once here, so requests never touch the
+    full history.
+    """
+    global _history_engines, _history_contexts, _bundle
+
+    _history_engines = load_history_engines()
+    _history_contexts = {
+        station: engine.context() for station, engine in _history_engines.items()
+    }
+    replay_observations()
+
+    _bundle = load_bundle()
+    _cache.clear()
+
+
+def reload_model(manifest_path: Optional[str] = None) -> ModelBundle:
+    """
+    Load and warm a model release, then swap it in atomically.
+
+    Runs off the request path; requests keep using the previous bundle
+    until the reference swap, and in-flight ones finish on it. If loading
+    fails the previous model stays in service.
     """
-    global _history_features, _model, _feature_cols
+    global _bundle
+    with _reload_lock:
+        bundle = load_bundle(manifest_path)
+        previous, _bundle = _bundle, bundle
+    logger.info(
+        "Model swapped: %s -> %s", previous.version if previous else None, bundle.version
+    )
+    return bundle
+
+
+async def _watch_model_releases() -> None:
+    """
+    Poll the CURRENT release pointer and hot-swap when it changes.
+
+    Only changes of CURRENT trigger a reload, so a release pinned through
+    /admin/reload_model stays in service until the next promotion.
+    """
+    loop = asyncio.get_running_loop()
+    seen = _bundle.version if _bundle else None
+    while True:
+        await asyncio.sleep(MODEL_POLL_INTERVAL_S)
+        try:
+            path = current_manifest_path()
+            version = read_manifest(path)["sha256"]
+            if version != seen:
+                seen = version
+                await loop.run_in_executor(None, reload_model, path)
+        except Exception:
+            logger.exception("Model release check failed; keeping current model.")
+
+
+def _clean_observation(record: Dict) -> Optional[Dict]:
+    """The observation as a cleaned history row, or None if cleaning drops it."""
+    row_df = pd.DataFrame([record])
+    row_df["date"] = pd.to_datetime(row_df["date"], errors="coerce")
+    clean_df = clean_history(row_df)
+    return None if clean_df.empty else clean_df.iloc[0].to_dict()
+
+
+def _apply_observation(station_id: str, clean_row: Dict) -> IncrementalFeatureEngine:
+    """
+    Feed a cleaned row to the station's engine and publish the new
+    contexts. Call with `_history_lock` held; raises ValueError if the
+    row is not after the station's last date.
+    """
+    global _history_contexts
+    engine = _history_engines.setdefault(station_id, IncrementalFeatureEngine())
+    if engine.update(clean_row) is not None:
+        _history_contexts = {**_history_contexts, station_id: engine.context()}
+    return engine
+
+
+def replay_observations() -> int:
+    """
+    Apply observation log lines not seen yet (this worker's own, and any
+    already in the history, are skipped). Returns how many were applied.
+    """
+    applied = 0
+    for record in _observation_log.read_new():
+        try:
+            clean_row = _clean_observation(record)
+            if clean_row is None:
+                continue
+            with _history_lock:
+                _apply_observation(record["station_id"], clean_row)
+            applied += 1
+        except ValueError:
+            continue
+    return applied
+
 
-    raw_df = load_raw_history()
-    clean_df = clean_history(raw_df)
-    _history_features = build_feature_table(clean_df)
+async def _tail_observation_log() -> None:
+    """Periodically apply observations other workers appended to the log."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(OBSERVATION_POLL_INTERVAL_S)
+        try:
+            await loop.run_in_executor(None, replay_observations)
+        except Exception:
+            logger.exception("Observation log replay failed.")
 
-    _model, _feature_cols = load_model_and_config()
+
+@app.on_event("startup")
+async def start_model_watcher() -> None:
+    global _watcher_task, _observation_task
+    if MODEL_POLL_INTERVAL_S > 0:
+        _watcher_task = asyncio.get_running_loop().create_task(_watch_model_releases())
+    if OBSERVATION_POLL_INTERVAL_S > 0:
+        _observation_task = asyncio.get_running_loop().create_task(_tail_observation_log())
+
+
+@app.on_event("shutdown")
+async def stop_model_watcher() -> None:
+    for task in (_watcher_task, _observation_task):
+        if task is not None:
+            task.cancel()
 
 
 @app.get("/health")
@@ -49,22 +251,163 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics() -> dict:
+    """Serving counters (recommendation cache, in-flight deduplication, model)."""
+    return {
+        "cache": _cache.stats(),
+        "singleflight": _singleflight.stats(),
+        "model_version": _bundle.version if _bundle else None,
+    }
+
+
+@app.post("/admin/reload_model")
+def reload_model_endpoint(req: ReloadRequest) -> dict:
+    """
+    Hot-swap the served model without a restart.
+
+    Loads the given release (or the one CURRENT points at), warms it and
+    swaps it in; in-flight requests finish on the previous model. A pinned
+    release is replaced again only when CURRENT is next promoted.
+    """
+    path = release_manifest_path(req.version) if req.version else None
+    try:
+        bundle = reload_model(path)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {exc}") from exc
+    return {"status": "ok", "model_version": bundle.version, "manifest": bundle.manifest_path}
+
+
 @app.post("/recommend_price")
-def recommend_price_endpoint(req: TodayRequest) -> dict:
+async def recommend_price_endpoint(req: TodayRequest) -> dict:
     """
     Recommend the optimal price for the given 'today' context.
+
+    Repeated payloads (quantized to the cent) are served from the
+    recommendation cache, identical concurrent payloads share a single
+    in-flight computation, and the remaining calls are micro-batched into
+    a single model inference pass.
     """
-    if _history_features is None or _model is None or _feature_cols is None:
+    if _history_contexts is None or _bundle is None:
         raise HTTPException(status_code=500, detail="Model artifacts not loaded.")
 
+    today = req.dict()
+    # Pin the artifacts once: the request is keyed and scored with them.
+    bundle = _bundle
+    history = _history_contexts.get(req.station_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"No history for station '{req.station_id}'.")
+    # The station's HistoryContext snapshot is immutable and hashable, so
+    # it serves as its own version in the cache key.
+    key = recommendation_cache_key(today, bundle.version, history)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        result = recommend_price_for_today(
-            today=req.dict(),
-            history_features=_history_features,
-            model=_model,
-            feature_cols=_feature_cols,
-        )
+        result = await _singleflight.do(key, lambda: _batcher.submit((today, history, bundle)))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
+    _cache.put(key, result)
     return result
+
+
+def _iter_bulk_results(
+    todays: List[Dict], score: Callable[[List[Dict]], List[Dict]]
+) -> Iterator[str]:
+    """
+    Yield one NDJSON line per request, scoring BULK_INFERENCE_CHUNK_SIZE
+    requests per inference pass.
+
+    A chunk that fails is rescored request by request so errors are
+    reported only on the offending lines.
+    """
+    for start in range(0, len(todays), BULK_INFERENCE_CHUNK_SIZE):
+        chunk = todays[start : start + BULK_INFERENCE_CHUNK_SIZE]
+        try:
+            results: List[Dict] = score(chunk)
+        except Exception:
+            results = []
+            for today in chunk:
+                try:
+                    results.append(score([today])[0])
+                except Exception as exc:
+                    results.append({"error": str(exc)})
+
+        for offset, result in enumerate(results):
+            yield json.dumps({"index": start + offset, **result}) + "\n"
+
+
+@app.post("/recommend_prices")
+def recommend_prices_endpoint(reqs: List[TodayRequest]) -> StreamingResponse:
+    """
+    Recommend prices for many stations or days in one call.
+
+    Results are streamed back as NDJSON, one line per request in input
+    order, each tagged with its 'index' in the request list.
+    """
+    if _history_contexts is None or _bundle is None:
+        raise HTTPException(status_code=500, detail="Model artifacts not loaded.")
+
+    # Pin the artifacts for the whole stream so every line is scored
+    # against the same history snapshot and model.
+    history, bundle = _history_contexts, _bundle
+
+    def score(todays: List[Dict]) -> List[Dict]:
+        return recommend_prices_batch(todays, history, bundle.model, bundle.feature_cols)
+
+    todays = [req.dict() for req in reqs]
+    return StreamingResponse(
+        _iter_bulk_results(todays, score), media_type="application/x-ndjson"
+    )
+
+
+@app.post("/observe")
+def observe_endpoint(obs: ObservationRequest) -> dict:
+    """
+    Append a realized daily outcome to the live history.
+
+    The observation is validated with the `clean_history` rules, then the
+    station's incremental feature engine is updated in constant time and a
+    new station -> HistoryContext map is published with a single reference
+    swap. Recommendations in flight keep the snapshot they started with.
+    An unseen station starts a new engine; it becomes priceable once it
+    has enough history for a complete feature row.
+
+    Accepted observations are appended to the shared observation log,
+    from which the other workers pick them up and restarts replay them.
+    The log is written first: if the append fails, nothing is applied.
+    """
+    if _history_engines is None:
+        raise HTTPException(status_code=500, detail="History not loaded.")
+
+    record = obs.dict()
+    try:
+        clean_row = _clean_observation(record)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if clean_row is None:
+        raise HTTPException(
+            status_code=422, detail="Observation rejected by history cleaning rules."
+        )
+
+    with _history_lock:
+        contexts_before = _history_contexts
+        engine = _history_engines.get(obs.station_id)
+        if engine is not None:
+            try:
+                engine.check_next_date(pd.Timestamp(clean_row["date"]))
+            except ValueError as exc:
+                raise HTTPException(status_code=409, detail=str(exc)) from exc
+        _observation_log.append(record)
+        engine = _apply_observation(obs.station_id, clean_row)
+        features_updated = _history_contexts is not contexts_before
+        last_date = engine.last_date
+
+    return {
+        "status": "ok",
+        "station_id": obs.station_id,
+        "history_last_date": last_date.date().isoformat(),
+        "features_updated": features_updated,
+    }
@@ -0,0 +1,49 @@
+"""
+Loading, warming and hot-swapping the served model.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import numpy as np
+
+from ..config import BATCH_MAX_SIZE
+from ..model_store import current_manifest_path
+from ..pricing import load_model_with_manifest
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Everything a request needs from one model release.
+
+    The API publishes a bundle by swapping a single reference; requests
+    grab that reference once, so they never mix artifacts from two
+    releases. An old bundle is freed when the last request holding it
+    finishes.
+    """
+
+    model: Any
+    feature_cols: List[str]
+    version: str
+    manifest_path: str
+
+
+def warm_up(model: Any, n_features: int, n_rows: int = BATCH_MAX_SIZE) -> None:
+    """Run one throwaway prediction so lazy initialization happens off the request path."""
+    model.predict(np.zeros((n_rows, n_features)))
+
+
+def load_bundle(manifest_path: Optional[str] = None) -> ModelBundle:
+    """Load and warm the model at `manifest_path` (default: the current release)."""
+    if manifest_path is None:
+        manifest_path = current_manifest_path()
+
+    model, manifest = load_model_with_manifest(manifest_path=manifest_path)
+    warm_up(model, len(manifest["feature_columns"]))
+    return ModelBundle(
+        model=model,
+        feature_cols=manifest["feature_columns"],
+        version=manifest["sha256"],
+        manifest_path=manifest_path,
+    )
@@ -0,0 +1,50 @@
+"""
+Shared append-only log of observations accepted by /observe.
+
+Every accepted observation is appended as one JSON line. Each API worker
+tails the log and applies the lines it has not seen yet, so an
+observation posted to one worker reaches the others within
+OBSERVATION_POLL_INTERVAL_S, and a restarted worker replays the log on
+top of its history snapshot instead of losing it.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+class ObservationLog:
+    """Append to, and incrementally read, an NDJSON observation log."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Append one record. The line is written with a single O_APPEND
+        write, so lines from concurrent workers never interleave.
+        """
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(record) + "\n").encode())
+        finally:
+            os.close(fd)
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        """Records appended since the previous call (all of them on the first)."""
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return []
+            # A line still being written is left for the next call.
+            complete = data[: data.rfind(b"\n") + 1]
+            self._offset += len(complete)
+        return [json.loads(line) for line in complete.splitlines() if line.strip()]
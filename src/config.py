@@ -5,9 +5,63 @@ Global configuration for paths, business rules, and training settings.
 # Data paths (relative to project root)
 DATA_RAW_HISTORY_PATH = "data/raw/oil_retail_history.csv"
 DATA_PROCESSED_DIR = "data/processed"
+FEATURES_PATH = "data/processed/features.parquet"
 
-MODEL_PATH = "models/volume_model.pkl"
+# Partitioned Parquet history store (station_id=<id>/year_month=<YYYY-MM>/),
+# built from the raw CSV by scripts/convert_history_to_parquet.py. Any
+# loader taking a history path accepts this directory in place of the CSV.
+HISTORY_STORE_DIR = "data/processed/history_store"
+# Rows per chunk when streaming a CSV into the history store (bounds the
+# ingestion's peak memory independently of the file size).
+CSV_INGEST_CHUNK_ROWS = 100_000
+
+# Incremental ingestion (run_pipeline.py --incremental): watermark of the
+# CSV prefix and per-station dates already in the history store, and how
+# many days back to read when fetching each station's lag/rolling context.
+INGEST_WATERMARK_PATH = "data/processed/ingest_watermark.json"
+INGEST_TAIL_LOOKBACK_DAYS = 31
+
+# Content-addressed outputs of the run_pipeline.py stages
+STAGE_CACHE_DIR = "data/processed/stage_cache"
+
+# Out-of-core training (src/external_training.py): the feature table as a
+# station/month-partitioned Parquet dataset, streamed to XGBoost in
+# batches of EXTERNAL_MEMORY_BATCH_ROWS; XGBoost's quantized pages are
+# cached on disk under EXTERNAL_MEMORY_CACHE_DIR while training.
+FEATURE_DATASET_DIR = "data/processed/feature_dataset"
+EXTERNAL_MEMORY_BATCH_ROWS = 100_000
+EXTERNAL_MEMORY_CACHE_DIR = "data/processed/xgb_cache"
+
+# Binary training DMatrix files, keyed by a hash of the training arrays
+# (run_pipeline.py --dmatrix-cache), for repeated training experiments.
+DMATRIX_CACHE_DIR = "data/processed/dmatrix_cache"
+
+# Station dimension: histories without a station_id column are treated as
+# a single station with this id.
+STATION_COLUMN = "station_id"
+DEFAULT_STATION_ID = "default"
+
+# Compact last-N-days feature snapshot loaded by the API at startup, plus
+# metadata (raw data hash, first history date) used to validate it.
+HISTORY_SNAPSHOT_PATH = "data/processed/history_snapshot.parquet"
+HISTORY_SNAPSHOT_META_PATH = "data/processed/history_snapshot.json"
+HISTORY_SNAPSHOT_DAYS = 30
+
+# Native XGBoost model + manifest (the model file sits next to the manifest)
+MODEL_MANIFEST_PATH = "models/model_manifest.json"
+
+# Versioned model releases: each training run publishes
+# models/releases/<version>/ and then atomically repoints models/CURRENT.
+# When CURRENT is absent, MODEL_MANIFEST_PATH is used.
+MODEL_RELEASES_DIR = "models/releases"
+MODEL_CURRENT_POINTER_PATH = "models/CURRENT"
+# Releases kept when a new one is published (the promoted one is always kept)
+MODEL_RELEASES_KEEP = 5
+# How often the API checks CURRENT for a new release (0 disables polling)
+MODEL_POLL_INTERVAL_S = 5.0
 FEATURE_CONFIG_PATH = "models/feature_config.json"
+# Best hyperparameters found by src/tuning.py (used with run_pipeline.py --tuned)
+TUNED_PARAMS_PATH = "models/tuned_params.json"
 TRAINING_METADATA_PATH = "models/training_metadata.json"
 
 # Business rules for pricing
@@ -26,6 +80,89 @@ PRICE_GRID_STEP = 0.05
 MIN_PRICE = 50.0
 MAX_PRICE = 120.0
 
+# Price search strategy: "grid" (exhaustive), "coarse_to_fine", "golden" or
+# "monotone" (needs a monotone-constrained model; see src/price_search.py)
+PRICE_SEARCH_STRATEGY = "grid"
+# coarse_to_fine: coarse step, and how many coarse winners to refine around
+COARSE_PRICE_GRID_STEP = 0.25
+REFINE_TOP_K = 3
+# monotone: candidate intervals split per branch-and-bound round
+MONOTONE_SEARCH_FANOUT = 4
+
+# Inference engine used for serving: "xgboost" (XGBRegressor.predict) or
+# "numpy" (trees compiled to flat arrays, see src/tree_inference.py)
+INFERENCE_ENGINE = "xgboost"
+
+# API request micro-batching
+# --------------------------
+# Concurrent /recommend_price calls arriving within this window are scored
+# together with a single model.predict call.
+BATCH_MAX_WAIT_MS = 2.0
+BATCH_MAX_SIZE = 64
+
+# /observe: accepted observations are appended to this log, which every API
+# worker replays at startup and tails every OBSERVATION_POLL_INTERVAL_S
+# (0 disables tailing), so all workers converge on the same history.
+OBSERVATION_LOG_PATH = "data/processed/observations.ndjson"
+OBSERVATION_POLL_INTERVAL_S = 1.0
+
+# Bulk /recommend_prices: number of requests stacked into one inference pass.
+BULK_INFERENCE_CHUNK_SIZE = 5000
+
+# Recommendation cache (LRU + TTL) in front of the pricing engine
+CACHE_MAX_ENTRIES = 10000
+CACHE_TTL_S = 300.0
+# Request prices/costs are rounded to this many decimals to form cache keys
+CACHE_PRICE_DECIMALS = 2
+
 # Training configuration
 VALIDATION_FRACTION = 0.2  # last 20% of time series as validation
 RANDOM_STATE = 42
+
+# XGBRegressor hyperparameters for the volume model
+XGB_PARAMS = {
+    "n_estimators": 400,
+    "max_depth": 6,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+}
+
+# Warm-start retraining (run_pipeline.py --warm-start): add this many trees,
+# fitted to the most recent days of history, to the current model; after
+# WARM_START_MAX_UPDATES such updates the next retrain is a full one.
+WARM_START_N_TREES = 20
+WARM_START_RECENT_DAYS = 90
+WARM_START_MAX_UPDATES = 14
+
+# Rolling-origin backtest (src/backtest.py): first origin after
+# BACKTEST_MIN_TRAIN_DAYS, one refit every BACKTEST_STEP_DAYS, each
+# evaluated on the next BACKTEST_HORIZON_DAYS.
+BACKTEST_MIN_TRAIN_DAYS = 365
+BACKTEST_STEP_DAYS = 1
+BACKTEST_HORIZON_DAYS = 1
+BACKTEST_REPORT_PATH = "data/processed/backtest_report.parquet"
+
+# Hyperparameter search (src/tuning.py): random configurations pruned by
+# successive halving on the last TUNING_N_FOLDS validation windows of
+# TUNING_VAL_DAYS days, with early stopping on each window.
+TUNING_N_TRIALS = 27
+TUNING_ETA = 3
+TUNING_MAX_ROUNDS = 1000
+TUNING_EARLY_STOPPING_ROUNDS = 50
+TUNING_N_FOLDS = 3
+TUNING_VAL_DAYS = 30
+TUNING_REPORT_PATH = "data/processed/tuning_report.parquet"
+# A list is a set of choices, (low, high) a uniform range, (low, high, "log")
+# a log-uniform range.
+TUNING_SEARCH_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8],
+    "learning_rate": (0.01, 0.3, "log"),
+    "subsample": (0.6, 1.0),
+    "colsample_bytree": (0.6, 1.0),
+    "min_child_weight": [1, 3, 5, 10],
+}
+
+# Features constrained to be monotone non-increasing in predicted volume
+# when training with monotone=True (enables the "monotone" price search).
+MONOTONE_DECREASING_FEATURES = ["price", "price_gap_vs_avg"]
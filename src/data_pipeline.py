@@ -2,16 +2,48 @@
 Data ingestion and basic cleaning for oil retail history.
 """
 
-from typing import Optional
+import os
+import shutil
+from typing import Dict, Iterable, Optional
 
 import pandas as pd
 
-from .config import DATA_RAW_HISTORY_PATH
+from .config import (
+    CSV_INGEST_CHUNK_ROWS,
+    DATA_RAW_HISTORY_PATH,
+    DEFAULT_STATION_ID,
+    HISTORY_STORE_DIR,
+    STATION_COLUMN,
+)
+from .history_store import append_history_store, compact_history_store, load_history_store
+from .schema import CLEAN_HISTORY_DTYPES, HISTORY_DTYPES, apply_schema
 
+EXPECTED_COLUMNS = {
+    "date",
+    "price",
+    "cost",
+    "comp1_price",
+    "comp2_price",
+    "comp3_price",
+    "volume",
+}
 
-def load_raw_history(path: Optional[str] = None) -> pd.DataFrame:
+
+def _check_columns(df: pd.DataFrame) -> None:
+    missing = EXPECTED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing expected columns in history CSV: {missing}")
+
+
+def load_raw_history(
+    path: Optional[str] = None,
+    stations: Optional[Iterable[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> pd.DataFrame:
     """
-    Load raw daily fuel history from CSV.
+    Load raw daily fuel history from CSV, or from a partitioned Parquet
+    history store when `path` is a directory (see src/history_store.py).
 
     Expects at least the following columns:
         - date
@@ -19,27 +51,33 @@ def load_raw_history(path: Optional[str] = None) -> pd.DataFrame:
         - cost
         - comp1_price, comp2_price, comp3_price
         - volume
+    and optionally station_id (defaults to DEFAULT_STATION_ID, i.e. a
+    single-station history). Rows are sorted by station, then date, and
+    columns are cast to `schema.HISTORY_DTYPES`; a ValueError is raised if
+    any volume is fractional or outside the int32 range.
+
+    `stations` and the inclusive [`start`, `end`] date range restrict the
+    rows returned; a history store only reads the matching partitions.
     """
     if path is None:
         path = DATA_RAW_HISTORY_PATH
 
-    df = pd.read_csv(path, parse_dates=["date"])
-    df = df.sort_values("date").reset_index(drop=True)
-
-    expected_cols = {
-        "date",
-        "price",
-        "cost",
-        "comp1_price",
-        "comp2_price",
-        "comp3_price",
-        "volume",
-    }
-    missing = expected_cols - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing expected columns in history CSV: {missing}")
+    if os.path.isdir(path):
+        df = load_history_store(path, stations=stations, start=start, end=end)
+    else:
+        df = pd.read_csv(path, parse_dates=["date"], dtype={STATION_COLUMN: str})
+        if STATION_COLUMN not in df.columns:
+            df[STATION_COLUMN] = DEFAULT_STATION_ID
+        if stations is not None:
+            df = df[df[STATION_COLUMN].isin([str(s) for s in stations])]
+        if start is not None:
+            df = df[df["date"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["date"] <= pd.Timestamp(end)]
+    df = df.sort_values([STATION_COLUMN, "date"]).reset_index(drop=True)
 
-    return df
+    _check_columns(df)
+    return apply_schema(df, HISTORY_DTYPES)
 
 
 def clean_history(df: pd.DataFrame) -> pd.DataFrame:
@@ -48,9 +86,14 @@ def clean_history(df: pd.DataFrame) -> pd.DataFrame:
       - drop rows with missing critical fields
       - remove non-positive prices or costs
       - remove negative volumes
+    and casts the result to `schema.CLEAN_HISTORY_DTYPES`. Fractional or
+    out-of-range volumes raise a ValueError, as in `load_raw_history`.
     """
     # Drop rows with missing critical values
-    df = df.dropna(subset=["date", "price", "cost", "volume"])
+    critical = ["date", "price", "cost", "volume"]
+    if STATION_COLUMN in df.columns:
+        critical.append(STATION_COLUMN)
+    df = df.dropna(subset=critical)
 
     # Only keep rows with valid economic ranges
     df = df[df["price"] > 0]
@@ -59,4 +102,58 @@ def clean_history(df: pd.DataFrame) -> pd.DataFrame:
 
     # (Optional) more domain-specific checks could be added here
 
-    return df.reset_index(drop=True)
+    return apply_schema(df, CLEAN_HISTORY_DTYPES).reset_index(drop=True)
+
+
+def ingest_history_csv(
+    csv_path: Optional[str] = None,
+    store_root: str = HISTORY_STORE_DIR,
+    chunk_rows: int = CSV_INGEST_CHUNK_ROWS,
+) -> Dict[str, int]:
+    """
+    Stream a (possibly larger than memory) history CSV into the
+    partitioned history store.
+
+    The CSV is read `chunk_rows` rows at a time; each chunk is cleaned
+    with `clean_history` and appended to the store, so peak memory
+    depends on the chunk size, not the file size. The store is built in
+    a sibling directory and swapped in when complete, replacing any
+    previous store at `store_root`.
+
+    Each chunk writes one file per partition it touches, so a date-sorted
+    multi-station export would leave about chunks x stations small files.
+    Before the swap, every partition is therefore compacted into one
+    file. This costs one extra read and write of the data, holding one
+    (station, month) partition in memory at a time, and saves every later
+    scan from opening the small files.
+
+    Returns row, chunk and compacted-partition counts.
+    """
+    if csv_path is None:
+        csv_path = DATA_RAW_HISTORY_PATH
+
+    staging_root = store_root.rstrip("/\\") + ".tmp"
+    shutil.rmtree(staging_root, ignore_errors=True)
+    os.makedirs(staging_root)
+
+    stats = {"chunks": 0, "rows_read": 0, "rows_kept": 0, "partitions_compacted": 0}
+    reader = pd.read_csv(
+        csv_path, parse_dates=["date"], dtype={STATION_COLUMN: str}, chunksize=chunk_rows
+    )
+    for chunk in reader:
+        _check_columns(chunk)
+        if STATION_COLUMN not in chunk.columns:
+            chunk[STATION_COLUMN] = DEFAULT_STATION_ID
+        stats["rows_read"] += len(chunk)
+
+        chunk = clean_history(chunk)
+        if not chunk.empty:
+            append_history_store(chunk, staging_root, tag=f"chunk{stats['chunks']:06d}")
+        stats["rows_kept"] += len(chunk)
+        stats["chunks"] += 1
+
+    if stats["rows_kept"]:
+        stats["partitions_compacted"] = compact_history_store(staging_root)
+    shutil.rmtree(store_root, ignore_errors=True)
+    os.replace(staging_root, store_root)
+    return stats
@@ -0,0 +1,262 @@
+"""
+Out-of-core training of the volume model.
+
+`modeling.train_volume_model` needs the whole feature table in a pandas
+DataFrame. Here the feature table is read from the partitioned Parquet
+dataset written by `feature_store.write_feature_dataset`, one record
+batch at a time: an XGBoost `DataIter` hands the batches to an
+`ExtMemQuantileDMatrix`, which quantizes them into pages cached on disk,
+so resident memory is bounded by the batch size and the quantized pages
+rather than by the size of the dataset. Validation metrics are
+accumulated batch by batch as well. The peak RSS reached during
+training (not during whatever the process did before) is reported with
+the training metadata, next to the process peak before training.
+
+Only training is out of core: scripts/run_pipeline.py still builds the
+feature table in pandas before writing the dataset, so the pipeline as
+a whole needs the feature table to fit in memory.
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import xgboost as xgb
+
+from .config import (
+    EXTERNAL_MEMORY_BATCH_ROWS,
+    EXTERNAL_MEMORY_CACHE_DIR,
+    FEATURE_DATASET_DIR,
+    VALIDATION_FRACTION,
+    XGB_PARAMS,
+)
+from .features import FEATURE_COLUMNS, TARGET_COLUMN
+from .history_store import PARTITIONING
+from .modeling import publish_volume_model, train_params
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's peak RSS (Linux /proc/self/clear_refs), so
+    `peak_rss_mb` measures from now on. False if unsupported.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MiB (None without procfs)."""
+    return _proc_status_mb("VmRSS")
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS in MiB since the last `reset_peak_rss`, or since process start."""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def feature_dataset(root: str = FEATURE_DATASET_DIR) -> ds.Dataset:
+    """Open the partitioned feature dataset (no data is read)."""
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+
+def validation_cutoff(
+    dataset: ds.Dataset, validation_fraction: float = VALIDATION_FRACTION
+) -> pd.Timestamp:
+    """
+    First validation date: rows dated before it form the first
+    (1 - validation_fraction) of the rows in date order.
+
+    The date column is streamed batch by batch; only the per-date row
+    counts are held in memory. Unlike `modeling.time_based_split`, a date
+    is never split between train and validation.
+    """
+    counts = pd.Series(dtype="int64")
+    for batch in dataset.to_batches(columns=["date"]):
+        batch_counts = pc.value_counts(batch.column("date"))
+        counts = counts.add(
+            pd.Series(
+                batch_counts.field("counts").to_numpy(),
+                index=batch_counts.field("values").to_pandas(),
+            ),
+            fill_value=0,
+        )
+    if len(counts) < 2:
+        raise ValueError("Not enough data for a meaningful train/validation split.")
+    counts = counts.sort_index()
+    n_rows = counts.to_numpy()
+    n_before = np.cumsum(n_rows) - n_rows
+    n_train = n_rows.sum() * (1.0 - validation_fraction)
+    # Last date at which the rows before it still fit in the train share,
+    # but never the first date (train must not be empty).
+    idx = max(1, int(np.searchsorted(n_before, n_train, side="right")) - 1)
+    return pd.Timestamp(counts.index[idx])
+
+
+def iter_batches(
+    dataset: ds.Dataset,
+    filter: Optional[ds.Expression] = None,
+    batch_rows: int = EXTERNAL_MEMORY_BATCH_ROWS,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (X, y) per record batch: X a C-contiguous float32 matrix of
+    FEATURE_COLUMNS, y the float32 target. Only those columns are read.
+    """
+    for batch in dataset.to_batches(
+        columns=FEATURE_COLUMNS + [TARGET_COLUMN], filter=filter, batch_size=batch_rows
+    ):
+        if batch.num_rows == 0:
+            continue
+        X = np.empty((batch.num_rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+        for j, col in enumerate(FEATURE_COLUMNS):
+            X[:, j] = batch.column(col).to_numpy(zero_copy_only=False)
+        y = pc.cast(batch.column(TARGET_COLUMN), "float32").to_numpy(zero_copy_only=False)
+        yield X, y
+
+
+class ParquetBatchIter(xgb.DataIter):
+    """XGBoost data iterator over the record batches of a Parquet dataset."""
+
+    def __init__(
+        self,
+        dataset: ds.Dataset,
+        cache_prefix: str,
+        filter: Optional[ds.Expression] = None,
+        batch_rows: int = EXTERNAL_MEMORY_BATCH_ROWS,
+    ) -> None:
+        self._dataset = dataset
+        self._filter = filter
+        self._batch_rows = batch_rows
+        self._batches: Optional[Iterator[Tuple[np.ndarray, np.ndarray]]] = None
+        self.n_rows = 0
+        self.n_batches = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._batches is None:
+            self._batches = iter_batches(self._dataset, self._filter, self._batch_rows)
+            self.n_rows = self.n_batches = 0
+        try:
+            X, y = next(self._batches)
+        except StopIteration:
+            return False
+        input_data(data=X, label=y, feature_names=FEATURE_COLUMNS)
+        self.n_rows += len(y)
+        self.n_batches += 1
+        return True
+
+    def reset(self) -> None:
+        self._batches = None
+
+
+def fit_external_memory(
+    root: str = FEATURE_DATASET_DIR,
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+    batch_rows: int = EXTERNAL_MEMORY_BATCH_ROWS,
+    cache_dir: str = EXTERNAL_MEMORY_CACHE_DIR,
+) -> Tuple[xgb.Booster, Dict[str, Any]]:
+    """
+    Train on the feature dataset at `root` without loading it into memory.
+
+    Rows before `validation_cutoff` are streamed into an
+    ExtMemQuantileDMatrix (hist tree method, pages cached under
+    `cache_dir` and removed afterwards); the rest are scored batch by
+    batch. Returns the booster and a metadata dict with the validation
+    metrics, row counts, timings and memory: the process peak RSS and the
+    RSS on entry, and the peak RSS during this call (`peak_rss_scope` is
+    "training"), or the process-lifetime peak where it cannot be reset
+    ("process").
+    """
+    peak_rss_before = peak_rss_mb()
+    peak_rss_scope = "training" if reset_peak_rss() else "process"
+    rss_before = current_rss_mb()
+    t0 = time.perf_counter()
+    dataset = feature_dataset(root)
+    cutoff = validation_cutoff(dataset)
+    before_cutoff = ds.field("date") < cutoff.to_pydatetime()
+
+    params = dict(XGB_PARAMS if params is None else params)
+    booster_params_, num_boost_round = train_params(monotone, params)
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp:
+        it = ParquetBatchIter(dataset, os.path.join(tmp, "train"), before_cutoff, batch_rows)
+        dtrain = xgb.ExtMemQuantileDMatrix(it, nthread=booster_params_["nthread"])
+        t1 = time.perf_counter()
+        booster = xgb.train(booster_params_, dtrain, num_boost_round=num_boost_round)
+        del dtrain
+    t2 = time.perf_counter()
+
+    abs_err = sq_err = 0.0
+    n_val = 0
+    for X, y in iter_batches(dataset, ~before_cutoff, batch_rows):
+        errors = booster.inplace_predict(X).astype(np.float64) - y
+        abs_err += float(np.abs(errors).sum())
+        sq_err += float((errors**2).sum())
+        n_val += len(y)
+    if n_val == 0:
+        raise ValueError("Not enough data for a meaningful train/validation split.")
+
+    metadata = {
+        "metrics": {"mae": abs_err / n_val, "rmse": float(np.sqrt(sq_err / n_val))},
+        "n_train": it.n_rows,
+        "n_val": n_val,
+        "params": params,
+        "warm_start_updates": 0,
+        "external_memory": {
+            "batch_rows": batch_rows,
+            "n_train_batches": it.n_batches,
+            "validation_cutoff": cutoff.isoformat(),
+            "dmatrix_s": t1 - t0,
+            "train_s": t2 - t1,
+            "peak_rss_before_mb": peak_rss_before,
+            "rss_before_mb": rss_before,
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_scope": peak_rss_scope,
+        },
+    }
+    return booster, metadata
+
+
+def train_volume_model_external(
+    root: str = FEATURE_DATASET_DIR,
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+    batch_rows: int = EXTERNAL_MEMORY_BATCH_ROWS,
+) -> Tuple[xgb.Booster, Dict[str, Any]]:
+    """
+    Out-of-core counterpart of `modeling.train_volume_model`: train with
+    `fit_external_memory` and publish the model the same way. Returns the
+    booster and the saved training metadata.
+    """
+    booster, metadata = fit_external_memory(root, monotone, params, batch_rows)
+    version = publish_volume_model(booster, monotone, metadata)
+    return booster, {**metadata, "monotone": monotone, "model_version": version}
@@ -0,0 +1,186 @@
+"""
+Persisted feature tables and the compact history snapshot used for serving.
+
+The pipeline writes the full feature table plus a small snapshot of the
+last HISTORY_SNAPSHOT_DAYS rows of each station, tagged with a hash of the raw history it
+was built from. Serving loads the snapshot instead of re-reading and
+re-featurizing the raw CSV, and falls back to a rebuild when the snapshot
+is missing or stale. For out-of-core training the feature table can also
+be written as a station/month-partitioned Parquet dataset.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .config import (
+    DATA_RAW_HISTORY_PATH,
+    FEATURE_DATASET_DIR,
+    HISTORY_SNAPSHOT_DAYS,
+    HISTORY_SNAPSHOT_META_PATH,
+    HISTORY_SNAPSHOT_PATH,
+    STATION_COLUMN,
+)
+from .data_pipeline import clean_history, load_raw_history
+from .features import build_feature_table, ensure_station_column
+from .history_store import MONTH_PARTITION_COLUMN, PARTITIONING, store_fingerprint
+from .incremental_features import IncrementalFeatureEngine, engines_from_feature_table
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def history_sha256(path: str) -> str:
+    """Fingerprint of a raw history CSV or partitioned history store."""
+    return store_fingerprint(path) if os.path.isdir(path) else file_sha256(path)
+
+
+def write_feature_dataset(feature_df: pd.DataFrame, root: str = FEATURE_DATASET_DIR) -> None:
+    """
+    Replace the partitioned feature dataset at `root` with `feature_df`.
+
+    Uses the history store's station_id=<id>/year_month=<YYYY-MM>/ layout,
+    rows sorted by date within each file. The dataset is written to a
+    staging directory and swapped in, so readers never see a mix of old
+    and new files.
+    """
+    feature_df = ensure_station_column(feature_df)
+    table = pa.Table.from_pandas(
+        feature_df.assign(
+            **{
+                STATION_COLUMN: feature_df[STATION_COLUMN].astype(str),
+                MONTH_PARTITION_COLUMN: feature_df["date"].dt.strftime("%Y-%m"),
+            }
+        ).sort_values([STATION_COLUMN, "date"]),
+        preserve_index=False,
+    )
+
+    staging = root.rstrip("/\\") + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    ds.write_dataset(
+        table,
+        staging,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template="part-{i}.parquet",
+    )
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(staging, root)
+
+
+def write_history_snapshot(
+    feature_df: pd.DataFrame,
+    raw_path: str = DATA_RAW_HISTORY_PATH,
+    snapshot_path: str = HISTORY_SNAPSHOT_PATH,
+    meta_path: str = HISTORY_SNAPSHOT_META_PATH,
+    days: int = HISTORY_SNAPSHOT_DAYS,
+) -> Dict[str, Any]:
+    """
+    Write the last `days` rows of each station in `feature_df` and their
+    metadata.
+
+    The metadata records the raw history hash (to detect staleness) and
+    each station's first feature date (needed for trend_index).
+    """
+    feature_df = ensure_station_column(feature_df).sort_values([STATION_COLUMN, "date"])
+    by_station = feature_df.groupby(STATION_COLUMN, sort=False, observed=True)
+    snapshot = by_station.tail(days).reset_index(drop=True)
+
+    Path(snapshot_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path + ".tmp"
+    snapshot.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, snapshot_path)
+
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "raw_sha256": history_sha256(raw_path),
+        "date_min": {
+            str(station): pd.Timestamp(d).isoformat()
+            for station, d in by_station["date"].min().items()
+        },
+        "n_rows_total": int(len(feature_df)),
+        "n_rows_snapshot": int(len(snapshot)),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_history_snapshot(
+    raw_path: str = DATA_RAW_HISTORY_PATH,
+    snapshot_path: str = HISTORY_SNAPSHOT_PATH,
+    meta_path: str = HISTORY_SNAPSHOT_META_PATH,
+) -> Optional[pd.DataFrame]:
+    """
+    Load the snapshot if it exists and matches the current raw history.
+
+    Returns None when the snapshot is missing, unreadable or stale. The
+    returned frame carries each station's full-history first date in
+    `df.attrs["date_min"]` (a station -> Timestamp dict).
+    """
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            logger.info("History snapshot format changed; ignoring snapshot.")
+            return None
+        if meta.get("raw_sha256") != history_sha256(raw_path):
+            logger.info("Raw history changed since snapshot was written; ignoring snapshot.")
+            return None
+        snapshot = pd.read_parquet(snapshot_path)
+    except (OSError, ValueError) as exc:
+        logger.info("History snapshot unavailable (%s).", exc)
+        return None
+
+    if snapshot.empty:
+        return None
+    snapshot.attrs["date_min"] = {
+        station: pd.Timestamp(d) for station, d in meta["date_min"].items()
+    }
+    return snapshot
+
+
+def _load_serving_features(raw_path: str) -> pd.DataFrame:
+    snapshot = load_history_snapshot(raw_path)
+    if snapshot is not None:
+        return snapshot
+
+    logger.info("Rebuilding history features from %s.", raw_path)
+    feature_df = build_feature_table(clean_history(load_raw_history(raw_path)))
+    feature_df.attrs["date_min"] = {
+        str(station): pd.Timestamp(d)
+        for station, d in feature_df.groupby(STATION_COLUMN, observed=True)["date"].min().items()
+    }
+    return feature_df
+
+
+def load_history_engines(
+    raw_path: str = DATA_RAW_HISTORY_PATH,
+) -> Dict[str, IncrementalFeatureEngine]:
+    """
+    Seed one IncrementalFeatureEngine per station for live serving,
+    preferring the persisted snapshot and falling back to a rebuild from
+    the raw CSV.
+    """
+    feature_df = _load_serving_features(raw_path)
+    return engines_from_feature_table(feature_df, date_min=feature_df.attrs["date_min"])
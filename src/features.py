@@ -3,10 +3,19 @@ Feature engineering for fuel price optimization.
 
 This module builds features that capture competition, seasonality,
 and short-term demand patterns via lag and rolling-window statistics.
+
+Histories may hold many stations (station_id column); lag, rolling and
+trend features are computed per station with vectorized groupby
+operations.
 """
 
+from typing import Mapping, Optional
+
 import pandas as pd
 
+from .config import DEFAULT_STATION_ID, STATION_COLUMN
+from .schema import FEATURE_DTYPES, apply_schema
+
 # Feature and target names used across training and inference.
 FEATURE_COLUMNS = [
     "price",
@@ -31,8 +40,9 @@ TARGET_COLUMN = "volume"
 def add_competitor_features(df: pd.DataFrame) -> pd.DataFrame:
     """Add average competitor price and price gap vs average."""
     comp_cols = ["comp1_price", "comp2_price", "comp3_price"]
-    df["avg_comp_price"] = df[comp_cols].mean(axis=1)
-    df["price_gap_vs_avg"] = df["price"] - df["avg_comp_price"]
+    # Computed in float64 and narrowed once by the feature schema.
+    df["avg_comp_price"] = df[comp_cols].astype("float64").mean(axis=1)
+    df["price_gap_vs_avg"] = df["price"].astype("float64") - df["avg_comp_price"]
     return df
 
 
@@ -43,38 +53,71 @@ def add_calendar_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def ensure_station_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Add a constant station_id column to single-station histories."""
+    if STATION_COLUMN not in df.columns:
+        df[STATION_COLUMN] = DEFAULT_STATION_ID
+    return df
+
+
 def add_lag_features(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Add lag and rolling-window volume/price features.
-    Assumes df['date'] is datetime and df is sorted by date.
+    Add lag and rolling-window volume/price features, per station.
+    Assumes df['date'] is datetime; rows are sorted by station and date.
     """
-    df = df.sort_values("date")
-    df["lag1_volume"] = df["volume"].shift(1)
-    df["lag7_volume"] = df["volume"].shift(7)
-    df["rolling_7d_vol_mean"] = df["volume"].rolling(7).mean()
-    df["rolling_7d_price_mean"] = df["price"].rolling(7).mean()
+    df = ensure_station_column(df)
+    df = df.sort_values([STATION_COLUMN, "date"])
+    by_station = df.groupby(STATION_COLUMN, sort=False, observed=True)
+
+    df["lag1_volume"] = by_station["volume"].shift(1)
+    df["lag7_volume"] = by_station["volume"].shift(7)
+    # groupby().rolling() returns a (station, row) index; drop the station
+    # level to align with df.
+    df["rolling_7d_vol_mean"] = (
+        by_station["volume"].rolling(7).mean().reset_index(level=0, drop=True)
+    )
+    df["rolling_7d_price_mean"] = (
+        by_station["price"].rolling(7).mean().reset_index(level=0, drop=True)
+    )
     return df
 
 
-def add_trend_feature(df: pd.DataFrame) -> pd.DataFrame:
-    """Add a simple time index from the first date."""
-    df["trend_index"] = (df["date"] - df["date"].min()).dt.days
+def add_trend_feature(
+    df: pd.DataFrame, trend_origin: Optional[Mapping[str, pd.Timestamp]] = None
+) -> pd.DataFrame:
+    """
+    Add a simple time index from each station's first date.
+
+    `trend_origin` (station -> first date) overrides the first date seen
+    in `df`, for tables holding only the tail of a station's history.
+    """
+    df = ensure_station_column(df)
+    first_date = df.groupby(STATION_COLUMN, sort=False, observed=True)["date"].transform("min")
+    if trend_origin:
+        known = df[STATION_COLUMN].map(
+            {station: pd.Timestamp(d) for station, d in trend_origin.items()}
+        )
+        first_date = known.fillna(first_date).astype(first_date.dtype)
+    df["trend_index"] = (df["date"] - first_date).dt.days
     return df
 
 
-def build_feature_table(df: pd.DataFrame) -> pd.DataFrame:
+def build_feature_table(
+    df: pd.DataFrame, trend_origin: Optional[Mapping[str, pd.Timestamp]] = None
+) -> pd.DataFrame:
     """
     Full feature engineering pipeline for historical data.
 
     Returns a DataFrame that still contains:
       - original 'date' and 'volume' columns
       - all engineered feature columns
+    cast to `schema.FEATURE_DTYPES`.
     """
     df = add_competitor_features(df)
     df = add_calendar_features(df)
     df = add_lag_features(df)
-    df = add_trend_feature(df)
+    df = add_trend_feature(df, trend_origin)
 
     # Drop rows where lag/rolling features are not available
     df = df.dropna().reset_index(drop=True)
-    return df
+    return apply_schema(df, FEATURE_DTYPES)
@@ -0,0 +1,200 @@
+"""
+Partitioned Parquet store for daily station history.
+
+History is kept as a pyarrow dataset laid out as
+    <root>/station_id=<id>/year_month=<YYYY-MM>/part-0.parquet
+so loaders can push station and date-range filters down to the
+partition directories (and to Parquet row-group statistics inside them)
+and read only the columns they need, instead of parsing one large CSV.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .config import DEFAULT_STATION_ID, HISTORY_STORE_DIR, STATION_COLUMN
+
+# Hive partition keys. Both are strings so station ids like "007" keep
+# their leading zeros and months compare lexicographically.
+MONTH_PARTITION_COLUMN = "year_month"
+PARTITIONING = ds.partitioning(
+    pa.schema([(STATION_COLUMN, pa.string()), (MONTH_PARTITION_COLUMN, pa.string())]),
+    flavor="hive",
+)
+
+HISTORY_COLUMNS = [
+    "date",
+    "price",
+    "cost",
+    "comp1_price",
+    "comp2_price",
+    "comp3_price",
+    "volume",
+]
+
+# Fixed file schema, so files written from separate chunks (where pandas
+# may infer int or float for the same column) always agree.
+# Stored rows are cleaned, so volume is never missing.
+FILE_SCHEMA = pa.schema(
+    [("date", pa.timestamp("ns"))]
+    + [(col, pa.float32()) for col in HISTORY_COLUMNS[1:-1]]
+    + [("volume", pa.int32())]
+    + [(STATION_COLUMN, pa.string()), (MONTH_PARTITION_COLUMN, pa.string())]
+)
+
+
+def _to_store_table(df: pd.DataFrame) -> pa.Table:
+    df = df[[c for c in HISTORY_COLUMNS if c in df.columns]].assign(
+        **{
+            STATION_COLUMN: (
+                df[STATION_COLUMN].astype(str)
+                if STATION_COLUMN in df.columns
+                else DEFAULT_STATION_ID
+            ),
+            MONTH_PARTITION_COLUMN: df["date"].dt.strftime("%Y-%m"),
+        }
+    )
+    # Date-sorted files give tight row-group min/max statistics.
+    df = df.sort_values([STATION_COLUMN, "date"])
+    return pa.Table.from_pandas(df, schema=FILE_SCHEMA, preserve_index=False)
+
+
+def write_history_store(df: pd.DataFrame, root: str = HISTORY_STORE_DIR) -> None:
+    """
+    Write history rows into the partitioned store.
+
+    Every (station, month) partition present in `df` is replaced as a
+    whole; other partitions are left untouched, so `df` must hold the
+    complete rows of each month it covers.
+    """
+    ds.write_dataset(
+        _to_store_table(df),
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+
+
+def append_history_store(df: pd.DataFrame, root: str, tag: str) -> None:
+    """
+    Add history rows to the store as new files named after `tag`.
+
+    Existing files are kept, so a partition may end up with several files
+    (one per call); `tag` must be unique per call.
+    """
+    ds.write_dataset(
+        _to_store_table(df),
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"{tag}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def compact_history_store(root: str = HISTORY_STORE_DIR) -> int:
+    """
+    Rewrite every partition that holds several files (one per
+    `append_history_store` call) as a single date-sorted file. Returns
+    the number of partitions rewritten.
+
+    One partition is read at a time, so memory is bounded by the largest
+    (station, month) partition. A partition is deleted before it is
+    rewritten, so only compact a store no one reads yet (e.g. a staging
+    directory).
+    """
+    dataset = history_dataset(root)
+    files: Dict[Tuple[str, str], int] = {}
+    for fragment in dataset.get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        key = (keys[STATION_COLUMN], keys[MONTH_PARTITION_COLUMN])
+        files[key] = files.get(key, 0) + 1
+
+    compacted = 0
+    for (station, month), n_files in sorted(files.items()):
+        if n_files < 2:
+            continue
+        partition = (ds.field(STATION_COLUMN) == station) & (
+            ds.field(MONTH_PARTITION_COLUMN) == month
+        )
+        write_history_store(dataset.to_table(filter=partition).to_pandas(), root)
+        compacted += 1
+    return compacted
+
+
+def store_fingerprint(root: str = HISTORY_STORE_DIR) -> str:
+    """Hex SHA-256 over the relative paths and contents of the store's files."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(root).rglob("*.parquet")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def history_dataset(root: str = HISTORY_STORE_DIR) -> ds.Dataset:
+    """Open the store as a pyarrow dataset (no data is read)."""
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+
+def history_filter(
+    stations: Optional[Iterable[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Optional[ds.Expression]:
+    """
+    Dataset filter for a station list and an inclusive date range.
+
+    Date bounds are applied to the month partition key as well, so whole
+    months outside the range are pruned without opening their files.
+    """
+    conditions: List[ds.Expression] = []
+    if stations is not None:
+        conditions.append(ds.field(STATION_COLUMN).isin([str(s) for s in stations]))
+    if start is not None:
+        start_ts = pd.Timestamp(start)
+        conditions.append(ds.field(MONTH_PARTITION_COLUMN) >= start_ts.strftime("%Y-%m"))
+        conditions.append(ds.field("date") >= start_ts.to_pydatetime())
+    if end is not None:
+        end_ts = pd.Timestamp(end)
+        conditions.append(ds.field(MONTH_PARTITION_COLUMN) <= end_ts.strftime("%Y-%m"))
+        conditions.append(ds.field("date") <= end_ts.to_pydatetime())
+
+    if not conditions:
+        return None
+    expr = conditions[0]
+    for condition in conditions[1:]:
+        expr = expr & condition
+    return expr
+
+
+def load_history_store(
+    root: str = HISTORY_STORE_DIR,
+    stations: Optional[Iterable[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Load history rows from the store, sorted by station and date.
+
+    Only the partitions matching `stations` and the inclusive
+    [`start`, `end`] date range are read, and only `columns` (default:
+    HISTORY_COLUMNS) plus date and station_id are materialized.
+    """
+    columns = list(HISTORY_COLUMNS if columns is None else columns)
+    if "date" not in columns:
+        columns.insert(0, "date")
+    if STATION_COLUMN not in columns:
+        columns.append(STATION_COLUMN)
+
+    table = history_dataset(root).to_table(
+        columns=columns, filter=history_filter(stations, start, end)
+    )
+    df = table.to_pandas()
+    return df.sort_values([STATION_COLUMN, "date"]).reset_index(drop=True)
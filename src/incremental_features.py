@@ -0,0 +1,217 @@
+"""
+Incremental (streaming) feature computation.
+
+`build_feature_table` recomputes shift/rolling statistics over the whole
+history. `IncrementalFeatureEngine` keeps only the short windows those
+features need and updates them in constant time per new daily
+observation, producing the same feature values row by row.
+
+An engine tracks a single station; multi-station histories use one
+engine per station_id.
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import STATION_COLUMN
+from .features import ensure_station_column
+from .pricing import HistoryContext
+from .schema import FEATURE_DTYPES, apply_schema
+
+# Longest look-back used by the lag/rolling features (lag7 needs 7 prior rows).
+LAG_LONG = 7
+ROLLING_WINDOW = 7
+
+_COMP_COLS = ["comp1_price", "comp2_price", "comp3_price"]
+
+# Features computed in float64 and narrowed like `build_feature_table` does.
+_FLOAT32_FEATURES = [col for col, dtype in FEATURE_DTYPES.items() if dtype == "float32"]
+
+
+class IncrementalFeatureEngine:
+    """
+    Constant-time daily feature updates from ring buffers.
+
+    State:
+      - the last LAG_LONG + 1 volumes (lag1, lag7, 7-day volume mean)
+      - the last ROLLING_WINDOW prices (7-day price mean)
+      - the first observed date (origin of trend_index), the date of the
+        first emitted feature row (HistoryContext.date_min) and the last
+        observed date
+      - the last emitted feature row (for HistoryContext snapshots)
+
+    Observations (for one station) must arrive in strictly increasing date
+    order and already satisfy the `clean_history` rules.
+    """
+
+    def __init__(self) -> None:
+        self._volumes: deque = deque(maxlen=LAG_LONG + 1)
+        self._prices: deque = deque(maxlen=ROLLING_WINDOW)
+        self.trend_origin: Optional[pd.Timestamp] = None
+        self.first_feature_date: Optional[pd.Timestamp] = None
+        self.last_date: Optional[pd.Timestamp] = None
+        self.last_row: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_feature_table(
+        cls,
+        feature_df: pd.DataFrame,
+        date_min: Optional[pd.Timestamp] = None,
+    ) -> "IncrementalFeatureEngine":
+        """
+        Seed the engine from the tail of a feature table (or snapshot).
+
+        Pass `date_min` (the first date of the full feature table) when
+        `feature_df` is only a tail snapshot. Assumes the tail rows are
+        consecutive cleaned observations, i.e. no row in the last
+        LAG_LONG + 1 was dropped for missing values.
+        """
+        if feature_df.empty:
+            raise ValueError("Cannot seed an IncrementalFeatureEngine from an empty table.")
+
+        tail = feature_df.sort_values("date").tail(LAG_LONG + 1)
+        engine = cls()
+        engine.first_feature_date = pd.Timestamp(
+            feature_df["date"].min() if date_min is None else date_min
+        )
+        engine._volumes.extend(float(v) for v in tail["volume"])
+        engine._prices.extend(float(p) for p in tail["price"].tail(ROLLING_WINDOW))
+        engine.last_row = tail.iloc[-1].to_dict()
+        engine.last_date = pd.Timestamp(engine.last_row["date"])
+        # trend_index counts days from the first observation, so recover it.
+        engine.trend_origin = engine.last_date - pd.Timedelta(
+            days=int(engine.last_row["trend_index"])
+        )
+        return engine
+
+    def check_next_date(self, date: pd.Timestamp) -> None:
+        """Raise ValueError unless `date` is after the last observed date."""
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(
+                f"Observation date {date.date()} is not after last date {self.last_date.date()}."
+            )
+
+    def update(self, observation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Add one day's observation and return its feature row.
+
+        Returns None while fewer than LAG_LONG prior rows are available or
+        when the row has missing values, matching the rows
+        `build_feature_table` drops. The observation still enters the
+        windows in both cases.
+        """
+        date = pd.Timestamp(observation["date"])
+        self.check_next_date(date)
+
+        volume = float(observation["volume"])
+        price = float(observation["price"])
+        comps = [float(observation[c]) for c in _COMP_COLS]
+
+        if self.trend_origin is None:
+            self.trend_origin = date
+
+        # Values of the window *before* this observation is appended.
+        lag1 = self._volumes[-1] if self._volumes else math.nan
+        lag7 = self._volumes[-LAG_LONG] if len(self._volumes) >= LAG_LONG else math.nan
+
+        self._volumes.append(volume)
+        self._prices.append(price)
+        self.last_date = date
+
+        valid_comps = [c for c in comps if not math.isnan(c)]
+        avg_comp = sum(valid_comps) / len(valid_comps) if valid_comps else math.nan
+
+        row = dict(observation)
+        row.update(
+            {
+                "date": date,
+                "avg_comp_price": avg_comp,
+                "price_gap_vs_avg": price - avg_comp,
+                "day_of_week": date.dayofweek,
+                "month": date.month,
+                "lag1_volume": lag1,
+                "lag7_volume": lag7,
+                "rolling_7d_vol_mean": self._window_mean(self._volumes, ROLLING_WINDOW),
+                "rolling_7d_price_mean": self._window_mean(self._prices, ROLLING_WINDOW),
+                "trend_index": (date - self.trend_origin).days,
+            }
+        )
+
+        if any(isinstance(v, float) and math.isnan(v) for v in row.values()):
+            return None
+        for col in _FLOAT32_FEATURES:
+            row[col] = float(np.float32(row[col]))
+
+        if self.first_feature_date is None:
+            self.first_feature_date = date
+        self.last_row = row
+        return row
+
+    @staticmethod
+    def _window_mean(values: deque, window: int) -> float:
+        if len(values) < window:
+            return math.nan
+        # Fixed-size window: summing `window` items is constant time.
+        return sum(list(values)[-window:]) / window
+
+    def update_many(self, observations: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply `update` to each observation and return the emitted rows."""
+        rows = []
+        for obs in observations:
+            row = self.update(obs)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def context(self) -> HistoryContext:
+        """HistoryContext for scoring the day after the last emitted row."""
+        if self.last_row is None or self.first_feature_date is None:
+            raise ValueError("No complete feature row yet; feed more observations.")
+        return HistoryContext(
+            last_volume=float(self.last_row["volume"]),
+            lag7_volume=float(self.last_row["lag7_volume"]),
+            rolling_7d_vol_mean=float(self.last_row["rolling_7d_vol_mean"]),
+            rolling_7d_price_mean=float(self.last_row["rolling_7d_price_mean"]),
+            date_min=self.first_feature_date,
+        )
+
+
+def engines_from_feature_table(
+    feature_df: pd.DataFrame,
+    date_min: Optional[Mapping[str, pd.Timestamp]] = None,
+) -> Dict[str, IncrementalFeatureEngine]:
+    """
+    Seed one engine per station from a (multi-station) feature table.
+
+    `date_min` optionally maps station -> first feature date for tables
+    holding only each station's tail.
+    """
+    feature_df = ensure_station_column(feature_df)
+    return {
+        str(station): IncrementalFeatureEngine.from_feature_table(
+            group, date_min=(date_min or {}).get(str(station))
+        )
+        for station, group in feature_df.groupby(STATION_COLUMN, sort=False, observed=True)
+    }
+
+
+def build_feature_table_incremental(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Batch equivalent of `build_feature_table` driven by incremental engines
+    (one per station).
+
+    Expects cleaned history; returns the same rows and feature values.
+    """
+    df = ensure_station_column(df).sort_values([STATION_COLUMN, "date"])
+    engines: Dict[str, IncrementalFeatureEngine] = {}
+    rows = []
+    for obs in df.to_dict("records"):
+        engine = engines.setdefault(obs[STATION_COLUMN], IncrementalFeatureEngine())
+        row = engine.update(obs)
+        if row is not None:
+            rows.append(row)
+    return apply_schema(pd.DataFrame(rows), FEATURE_DTYPES).reset_index(drop=True)
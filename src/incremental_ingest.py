@@ -0,0 +1,307 @@
+"""
+Incremental ingestion of an append-only history CSV.
+
+A watermark file records how far the CSV has been ingested (byte offset
+of the last complete line plus a hash of that prefix) and, per station,
+the first and last ingested dates. When the CSV has only grown since the
+last run, just the appended bytes are parsed and cleaned, appended to the
+history store, and featurized together with the few preceding rows the
+lag/rolling windows need. Any other change to the file (rewrite,
+truncation, edited rows) requires a full re-ingestion.
+
+The watermark only advances once the caller has saved the feature rows:
+both ingestion functions return a `commit` callable for that, so a run
+that fails in between reads the same rows again next time.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .config import (
+    DATA_RAW_HISTORY_PATH,
+    DEFAULT_STATION_ID,
+    HISTORY_STORE_DIR,
+    INGEST_TAIL_LOOKBACK_DAYS,
+    INGEST_WATERMARK_PATH,
+    STATION_COLUMN,
+)
+from .data_pipeline import clean_history, ingest_history_csv, load_raw_history
+from .features import build_feature_table
+from .history_store import append_history_store, load_history_store
+from .incremental_features import LAG_LONG
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_FORMAT_VERSION = 1
+
+
+def _complete_prefix(path: str) -> tuple:
+    """(length, sha256) of the file up to and including its last newline."""
+    digest = hashlib.sha256()
+    length = 0
+    pending = b""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            chunk = pending + chunk
+            cut = chunk.rfind(b"\n") + 1
+            digest.update(chunk[:cut])
+            length += cut
+            pending = chunk[cut:]
+    return length, digest.hexdigest()
+
+
+def _prefix_sha256(path: str, n_bytes: int) -> Optional[str]:
+    """sha256 of the first `n_bytes` of the file, or None if it is shorter."""
+    digest = hashlib.sha256()
+    remaining = n_bytes
+    with open(path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def read_watermark(path: str = INGEST_WATERMARK_PATH) -> Optional[Dict[str, Any]]:
+    """Load the watermark, or None if it is missing or from another format."""
+    try:
+        with open(path, "r") as f:
+            watermark = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if watermark.get("format_version") != WATERMARK_FORMAT_VERSION:
+        return None
+    return watermark
+
+
+def write_watermark(
+    csv_path: str,
+    station_dates: pd.DataFrame,
+    path: str = INGEST_WATERMARK_PATH,
+    n_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Atomically record the CSV prefix ingested so far and each station's
+    date range.
+
+    `station_dates` has one row per station with first_date and last_date.
+    The prefix is the first `n_bytes` of the CSV (default: up to its last
+    newline).
+    """
+    if n_bytes is None:
+        length, sha = _complete_prefix(csv_path)
+    else:
+        length, sha = n_bytes, _prefix_sha256(csv_path, n_bytes)
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    watermark = {
+        "format_version": WATERMARK_FORMAT_VERSION,
+        "source": os.path.abspath(csv_path),
+        "bytes_ingested": length,
+        "prefix_sha256": sha,
+        "header": header,
+        "stations": {
+            str(station): {
+                "first_date": pd.Timestamp(row["first_date"]).isoformat(),
+                "last_date": pd.Timestamp(row["last_date"]).isoformat(),
+            }
+            for station, row in station_dates.iterrows()
+        },
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(tmp_path, path)
+    return watermark
+
+
+def reset_watermark(path: str = INGEST_WATERMARK_PATH) -> None:
+    """
+    Forget the watermark, so the next `ingest_incremental` requests a full
+    ingestion. Call this whenever the feature table is rebuilt by other
+    means: the saved table and the watermark must cover the same rows.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def append_feature_rows(feature_df: pd.DataFrame, new_features: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the rows returned by `ingest_incremental` to a saved feature table,
+    sorted by station and date. A (station, date) already in the table is
+    replaced by the new row, so rows ingested twice are never duplicated.
+    """
+    combined = pd.concat([feature_df, new_features], ignore_index=True)
+    combined = combined.drop_duplicates(subset=[STATION_COLUMN, "date"], keep="last")
+    return combined.sort_values([STATION_COLUMN, "date"]).reset_index(drop=True)
+
+
+def _station_dates(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(STATION_COLUMN, observed=True)["date"].agg(
+        first_date="min", last_date="max"
+    )
+
+
+def read_new_rows(
+    csv_path: str, watermark: Dict[str, Any]
+) -> Optional[Tuple[pd.DataFrame, int]]:
+    """
+    Parse the lines appended to the CSV since the watermark. Returns the
+    rows and the byte offset just past the last one.
+
+    Returns None when the already-ingested prefix changed (full
+    re-ingestion needed). A trailing line without a newline is left for
+    the next run.
+    """
+    if watermark.get("source") != os.path.abspath(csv_path):
+        return None
+    offset = watermark["bytes_ingested"]
+    if _prefix_sha256(csv_path, offset) != watermark["prefix_sha256"]:
+        return None
+
+    with open(csv_path, "rb") as f:
+        f.seek(offset)
+        appended = f.read()
+    appended = appended[: appended.rfind(b"\n") + 1]
+    end = offset + len(appended)
+    if not appended.strip():
+        return pd.DataFrame(columns=watermark["header"]), end
+
+    df = pd.read_csv(
+        io.BytesIO(appended),
+        header=None,
+        names=watermark["header"],
+        parse_dates=["date"],
+        dtype={STATION_COLUMN: str},
+    )
+    if STATION_COLUMN not in df.columns:
+        df[STATION_COLUMN] = DEFAULT_STATION_ID
+    return df, end
+
+
+def _tail_rows(
+    store_root: str, stations: Dict[str, Dict[str, str]]
+) -> pd.DataFrame:
+    """
+    The last LAG_LONG stored rows of each station in `stations`.
+
+    Reads only the last INGEST_TAIL_LOOKBACK_DAYS of those stations, and
+    the station's full history only if that window is too short.
+    """
+    if not stations:
+        return pd.DataFrame()
+
+    last_dates = {s: pd.Timestamp(d["last_date"]) for s, d in stations.items()}
+    start = min(last_dates.values()) - pd.Timedelta(days=INGEST_TAIL_LOOKBACK_DAYS)
+    recent = load_history_store(store_root, stations=list(stations), start=start)
+    tails = []
+    for station, info in stations.items():
+        rows = recent[recent[STATION_COLUMN] == station]
+        if len(rows) < LAG_LONG and pd.Timestamp(info["first_date"]) < start:
+            rows = load_history_store(store_root, stations=[station])
+        tails.append(rows.tail(LAG_LONG))
+    return pd.concat(tails, ignore_index=True)
+
+
+def ingest_incremental(
+    csv_path: str = DATA_RAW_HISTORY_PATH,
+    store_root: str = HISTORY_STORE_DIR,
+    watermark_path: str = INGEST_WATERMARK_PATH,
+) -> Optional[Tuple[pd.DataFrame, Callable[[], None]]]:
+    """
+    Ingest the rows appended to `csv_path` since the last run.
+
+    Cleans the new rows and returns their feature rows (computed with
+    each station's stored tail as lag/rolling context and its first date
+    as trend origin) with a `commit` callable. Rows not after a station's
+    last ingested date are skipped.
+
+    `commit()` appends the rows to the history store and advances the
+    watermark; call it once the feature rows are saved. Until then
+    neither is touched.
+
+    Returns None when there is no usable watermark or the
+    already-ingested part of the CSV changed; call `ingest_full` then.
+    """
+    watermark = read_watermark(watermark_path)
+    if watermark is None:
+        logger.info("No ingestion watermark; full ingestion required.")
+        return None
+    read = read_new_rows(csv_path, watermark)
+    if read is None:
+        logger.info("%s changed before the watermark; full ingestion required.", csv_path)
+        return None
+    new_df, end = read
+
+    known = watermark["stations"]
+    if not new_df.empty:
+        last_date = new_df[STATION_COLUMN].map(
+            {s: pd.Timestamp(d["last_date"]) for s, d in known.items()}
+        )
+        stale = last_date.notna() & (new_df["date"] <= last_date)
+        if stale.any():
+            logger.warning("Skipping %d rows not after their station's watermark.", stale.sum())
+        new_df = clean_history(new_df[~stale])
+
+    features = pd.DataFrame()
+    if not new_df.empty:
+        stations = new_df[STATION_COLUMN].unique()
+        context = _tail_rows(store_root, {s: known[s] for s in stations if s in known})
+        combined = pd.concat([context, new_df], ignore_index=True)
+        origins = {s: pd.Timestamp(known[s]["first_date"]) for s in stations if s in known}
+        features = build_feature_table(combined, trend_origin=origins)
+
+        new_keys = pd.MultiIndex.from_frame(new_df[[STATION_COLUMN, "date"]])
+        is_new = pd.MultiIndex.from_frame(features[[STATION_COLUMN, "date"]]).isin(new_keys)
+        features = features[is_new].reset_index(drop=True)
+
+    station_dates = pd.DataFrame.from_dict(known, orient="index").apply(pd.to_datetime)
+    if not new_df.empty:
+        station_dates = (
+            pd.concat([station_dates, _station_dates(new_df)])
+            .groupby(level=0)
+            .agg({"first_date": "min", "last_date": "max"})
+        )
+
+    def commit() -> None:
+        if not new_df.empty:
+            tag = "inc-" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            append_history_store(new_df, store_root, tag=tag)
+        write_watermark(csv_path, station_dates, watermark_path, n_bytes=end)
+
+    return features, commit
+
+
+def ingest_full(
+    csv_path: str = DATA_RAW_HISTORY_PATH,
+    store_root: str = HISTORY_STORE_DIR,
+    watermark_path: str = INGEST_WATERMARK_PATH,
+) -> Tuple[pd.DataFrame, Callable[[], None]]:
+    """
+    Re-ingest the whole CSV into the history store. Returns the cleaned
+    history and a `commit` callable that writes the new watermark; call
+    it once the features built from the history are saved. The old
+    watermark is removed first, so an interrupted run falls back to a
+    full ingestion again.
+    """
+    reset_watermark(watermark_path)
+    n_bytes, _ = _complete_prefix(csv_path)
+    ingest_history_csv(csv_path, store_root)
+    clean_df = load_raw_history(store_root)
+    station_dates = _station_dates(clean_df)
+
+    def commit() -> None:
+        write_watermark(csv_path, station_dates, watermark_path, n_bytes=n_bytes)
+
+    return clean_df, commit
@@ -0,0 +1,260 @@
+"""
+Native (pickle-free) persistence of the volume model.
+
+Models are stored in XGBoost's own UBJSON format next to a JSON manifest
+that records the feature schema and a checksum of the model file. The
+manifest is validated before the model bytes are handed to XGBoost.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import xgboost
+from xgboost import XGBRegressor
+
+from .config import (
+    MODEL_CURRENT_POINTER_PATH,
+    MODEL_MANIFEST_PATH,
+    MODEL_RELEASES_DIR,
+    MODEL_RELEASES_KEEP,
+)
+from .features import FEATURE_COLUMNS
+
+MANIFEST_VERSION = 1
+MODEL_FORMAT = "ubj"
+
+# Manifest keys and the types they must have.
+_MANIFEST_SCHEMA = {
+    "manifest_version": int,
+    "format": str,
+    "model_file": str,
+    "sha256": str,
+    "feature_columns": list,
+    "target_column": str,
+    "xgboost_version": str,
+    "created_at": str,
+}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def validate_manifest(manifest: Dict[str, Any]) -> None:
+    """
+    Check a manifest against the expected schema.
+
+    Raises ValueError on missing keys, wrong types, an unsupported format
+    or feature columns unknown to this code version.
+    """
+    missing = set(_MANIFEST_SCHEMA) - set(manifest)
+    if missing:
+        raise ValueError(f"Missing keys in model manifest: {sorted(missing)}")
+
+    for key, expected_type in _MANIFEST_SCHEMA.items():
+        if not isinstance(manifest[key], expected_type):
+            raise ValueError(
+                f"Model manifest key '{key}' should be {expected_type.__name__}, "
+                f"got {type(manifest[key]).__name__}"
+            )
+
+    if manifest["manifest_version"] != MANIFEST_VERSION:
+        raise ValueError(
+            f"Unsupported model manifest version: {manifest['manifest_version']}"
+        )
+    if manifest["format"] != MODEL_FORMAT:
+        raise ValueError(f"Unsupported model format: {manifest['format']}")
+
+    unknown = set(manifest["feature_columns"]) - set(FEATURE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Model manifest has unknown feature columns: {sorted(unknown)}")
+
+
+def save_model_artifacts(
+    model: Union[XGBRegressor, xgboost.Booster],
+    feature_columns: List[str],
+    target_column: str,
+    manifest_path: str = MODEL_MANIFEST_PATH,
+    monotone_constraints: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Save `model` in native UBJSON format and write its manifest.
+
+    `model` may be a bare Booster (e.g. from `xgboost.train`); the saved
+    file loads into an XGBRegressor either way.
+
+    `monotone_constraints` (feature -> +1/-1) records any monotone
+    constraints the model was trained with.
+
+    The model file lives next to the manifest. Both are written to a
+    temporary name first and renamed into place, so readers never see a
+    half-written artifact.
+    """
+    manifest_dir = Path(manifest_path).parent
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+
+    booster = model if isinstance(model, xgboost.Booster) else model.get_booster()
+    model_bytes = bytes(booster.save_raw(raw_format=MODEL_FORMAT))
+    model_file = f"volume_model.{MODEL_FORMAT}"
+
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "format": MODEL_FORMAT,
+        "model_file": model_file,
+        "sha256": _sha256(model_bytes),
+        "feature_columns": list(feature_columns),
+        "target_column": target_column,
+        "xgboost_version": xgboost.__version__,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "monotone_constraints": dict(monotone_constraints or {}),
+    }
+    validate_manifest(manifest)
+
+    model_path = manifest_dir / model_file
+    tmp_model_path = model_path.with_suffix(model_path.suffix + ".tmp")
+    tmp_model_path.write_bytes(model_bytes)
+    os.replace(tmp_model_path, model_path)
+
+    tmp_manifest_path = Path(str(manifest_path) + ".tmp")
+    with open(tmp_manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest_path, manifest_path)
+
+    return manifest
+
+
+def is_monotone_decreasing_in_price(manifest: Dict[str, Any]) -> bool:
+    """
+    True if predicted volume is constrained non-increasing in every
+    price-dependent feature the model uses ('price', 'price_gap_vs_avg').
+    """
+    constraints = manifest.get("monotone_constraints", {})
+    price_features = {"price", "price_gap_vs_avg"} & set(manifest["feature_columns"])
+    return all(constraints.get(col) == -1 for col in price_features)
+
+
+def publish_model_release(
+    model: Union[XGBRegressor, xgboost.Booster],
+    feature_columns: List[str],
+    target_column: str,
+    monotone_constraints: Optional[Dict[str, int]] = None,
+    releases_dir: str = MODEL_RELEASES_DIR,
+) -> str:
+    """
+    Write a new immutable model release and return its version id.
+
+    Artifacts are written into a staging directory that is renamed into
+    `releases_dir/<version>` in one step. The release is not served until
+    `promote_model_release` points CURRENT at it.
+    """
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    staging_dir = Path(releases_dir) / f".staging-{version}"
+    save_model_artifacts(
+        model,
+        feature_columns,
+        target_column,
+        manifest_path=str(staging_dir / Path(MODEL_MANIFEST_PATH).name),
+        monotone_constraints=monotone_constraints,
+    )
+    os.replace(staging_dir, Path(releases_dir) / version)
+    return version
+
+
+def release_manifest_path(version: str, releases_dir: str = MODEL_RELEASES_DIR) -> str:
+    return str(Path(releases_dir) / version / Path(MODEL_MANIFEST_PATH).name)
+
+
+def promote_model_release(
+    version: str,
+    pointer_path: str = MODEL_CURRENT_POINTER_PATH,
+    releases_dir: str = MODEL_RELEASES_DIR,
+) -> None:
+    """Atomically point CURRENT at an existing, valid release."""
+    read_manifest(release_manifest_path(version, releases_dir))
+
+    tmp_pointer = pointer_path + ".tmp"
+    with open(tmp_pointer, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp_pointer, pointer_path)
+
+
+def prune_model_releases(
+    keep: int = MODEL_RELEASES_KEEP,
+    pointer_path: str = MODEL_CURRENT_POINTER_PATH,
+    releases_dir: str = MODEL_RELEASES_DIR,
+) -> List[str]:
+    """
+    Delete all but the `keep` newest releases, never the one CURRENT
+    points at. Returns the deleted versions.
+
+    Version ids are UTC timestamps, so name order is publication order.
+    Servers that already loaded a deleted release keep serving it from
+    memory.
+    """
+    try:
+        with open(pointer_path, "r") as f:
+            current = f.read().strip()
+    except FileNotFoundError:
+        current = None
+
+    root = Path(releases_dir)
+    if not root.is_dir():
+        return []
+    versions = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    stale = [v for v in versions[: max(0, len(versions) - keep)] if v != current]
+    for version in stale:
+        shutil.rmtree(root / version, ignore_errors=True)
+    return stale
+
+
+def current_manifest_path(
+    pointer_path: str = MODEL_CURRENT_POINTER_PATH,
+    releases_dir: str = MODEL_RELEASES_DIR,
+) -> str:
+    """Manifest path of the promoted release, or MODEL_MANIFEST_PATH if none."""
+    try:
+        with open(pointer_path, "r") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return MODEL_MANIFEST_PATH
+    return release_manifest_path(version, releases_dir)
+
+
+def read_manifest(manifest_path: Optional[str] = None) -> Dict[str, Any]:
+    """Read and validate a model manifest (default: the current release)."""
+    if manifest_path is None:
+        manifest_path = current_manifest_path()
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    validate_manifest(manifest)
+    return manifest
+
+
+def load_model_artifacts(
+    manifest_path: Optional[str] = None,
+) -> Tuple[XGBRegressor, Dict[str, Any]]:
+    """
+    Load a natively serialized model described by `manifest_path`
+    (default: the currently promoted release).
+
+    The model file is read, checksummed and loaded by XGBoost from its
+    native format; no pickle step is involved.
+    """
+    if manifest_path is None:
+        manifest_path = current_manifest_path()
+    manifest = read_manifest(manifest_path)
+    model_path = Path(manifest_path).parent / manifest["model_file"]
+
+    raw = model_path.read_bytes()
+    if _sha256(raw) != manifest["sha256"]:
+        raise ValueError(f"Checksum mismatch for model file {model_path}")
+
+    model = XGBRegressor()
+    # load_model takes a bytearray (not bytes) for an in-memory model.
+    model.load_model(bytearray(raw))
+    return model, manifest
@@ -1,24 +1,45 @@
 """
 Model training and evaluation for volume prediction.
+
+Models are trained with `xgb.train` (hist tree method) on DMatrix objects
+built straight from C-contiguous float32 arrays, so XGBoost does not copy
+and convert pandas frames; the trained booster is handed back as an
+XGBRegressor.
 """
 
+import hashlib
 import json
-import pickle
-from typing import Tuple
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import xgboost as xgb
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-from xgboost import XGBRegressor
+from xgboost import Booster, XGBRegressor
 
 from .config import (
-    MODEL_PATH,
     FEATURE_CONFIG_PATH,
     TRAINING_METADATA_PATH,
     VALIDATION_FRACTION,
     RANDOM_STATE,
+    MONOTONE_DECREASING_FEATURES,
+    WARM_START_MAX_UPDATES,
+    WARM_START_N_TREES,
+    WARM_START_RECENT_DAYS,
+    XGB_PARAMS,
 )
 from .features import FEATURE_COLUMNS, TARGET_COLUMN
+from .model_store import (
+    load_model_artifacts,
+    promote_model_release,
+    prune_model_releases,
+    publish_model_release,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def time_based_split(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -38,35 +59,140 @@ def time_based_split(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     return train_df, val_df
 
 
-def train_volume_model(feature_df: pd.DataFrame):
+def monotone_constraints_for(feature_cols) -> Dict[str, int]:
+    """Monotone constraint per feature: -1 for MONOTONE_DECREASING_FEATURES, else 0."""
+    return {col: (-1 if col in MONOTONE_DECREASING_FEATURES else 0) for col in feature_cols}
+
+
+def build_regressor(
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> XGBRegressor:
+    """XGBRegressor with the project's hyperparameters (default XGB_PARAMS)."""
+    constraints = monotone_constraints_for(FEATURE_COLUMNS) if monotone else {}
+    return XGBRegressor(
+        monotone_constraints=(
+            tuple(constraints[col] for col in FEATURE_COLUMNS) if monotone else None
+        ),
+        random_state=RANDOM_STATE,
+        n_jobs=-1,
+        **(XGB_PARAMS if params is None else params),
+    )
+
+
+def booster_params(params: Dict[str, Any], nthread: int) -> tuple:
+    """Split XGBRegressor-style params into (xgb.train params, num_boost_round)."""
+    params = dict(params)
+    num_boost_round = int(params.pop("n_estimators", 100))
+    params.setdefault("seed", RANDOM_STATE)
+    params["nthread"] = nthread
+    params.setdefault("objective", "reg:squarederror")
+    return params, num_boost_round
+
+
+def train_params(
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], int]:
     """
-    Train an XGBoost regression model to predict daily volume.
+    `xgb.train` params for XGBRegressor-style `params` (default
+    XGB_PARAMS), with the hist tree method and all cores, and the number
+    of boosting rounds.
+    """
+    booster, num_boost_round = booster_params(
+        XGB_PARAMS if params is None else params, os.cpu_count() or 1
+    )
+    booster["tree_method"] = "hist"
+    if monotone:
+        constraints = monotone_constraints_for(FEATURE_COLUMNS)
+        booster["monotone_constraints"] = tuple(constraints[col] for col in FEATURE_COLUMNS)
+    return booster, num_boost_round
 
-    Saves:
-      - trained model (MODEL_PATH)
-      - feature configuration (FEATURE_CONFIG_PATH)
-      - training metadata & metrics (TRAINING_METADATA_PATH)
+
+def feature_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """FEATURE_COLUMNS as a C-contiguous float32 matrix, and the float32 target."""
+    X = np.ascontiguousarray(df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.float32)
+    return X, y
+
+
+def training_matrix(df: pd.DataFrame, cache_dir: Optional[str] = None) -> xgb.DMatrix:
     """
-    train_df, val_df = time_based_split(feature_df)
+    Training matrix of `df` built from `feature_arrays`.
 
-    X_train = train_df[FEATURE_COLUMNS]
-    y_train = train_df[TARGET_COLUMN]
-    X_val = val_df[FEATURE_COLUMNS]
-    y_val = val_df[TARGET_COLUMN]
+    Without `cache_dir` this is a QuantileDMatrix (quantized once while
+    building, no full-precision copy). With `cache_dir`, a DMatrix is
+    saved there in XGBoost's binary format, named after a hash of the
+    arrays, and later calls on the same data load that file instead;
+    XGBoost can only save plain DMatrix objects.
+    """
+    X, y = feature_arrays(df)
+    if cache_dir is None:
+        return xgb.QuantileDMatrix(X, label=y, feature_names=FEATURE_COLUMNS, nthread=-1)
 
-    model = XGBRegressor(
-        n_estimators=400,
-        max_depth=6,
-        learning_rate=0.05,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        random_state=RANDOM_STATE,
-        n_jobs=-1,
+    digest = hashlib.sha256(json.dumps(FEATURE_COLUMNS).encode())
+    digest.update(X.tobytes())
+    digest.update(y.tobytes())
+    path = Path(cache_dir) / f"{digest.hexdigest()[:32]}.dmatrix"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        xgb.DMatrix(X, label=y, feature_names=FEATURE_COLUMNS, nthread=-1).save_binary(
+            str(tmp_path), silent=True
+        )
+        os.replace(tmp_path, path)
+    return xgb.DMatrix(str(path), nthread=-1)
+
+
+def regressor_from_booster(booster: Booster) -> XGBRegressor:
+    """Wrap a trained booster in an XGBRegressor (through its native model bytes)."""
+    model = XGBRegressor()
+    model.load_model(bytearray(booster.save_raw(raw_format="ubj")))
+    return model
+
+
+def fit_regressor(
+    train_df: pd.DataFrame,
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+    base_model: Optional[XGBRegressor] = None,
+    dmatrix_cache_dir: Optional[str] = None,
+) -> XGBRegressor:
+    """
+    Fit the volume model on `train_df` with `xgb.train`; boosting
+    continues from `base_model` when given (the base model is not
+    modified). See `training_matrix` for `dmatrix_cache_dir`.
+    """
+    booster_params_, num_boost_round = train_params(monotone, params)
+    booster = xgb.train(
+        booster_params_,
+        training_matrix(train_df, dmatrix_cache_dir),
+        num_boost_round=num_boost_round,
+        xgb_model=None if base_model is None else base_model.get_booster(),
     )
+    return regressor_from_booster(booster)
+
+
+def fit_warm_start(
+    base_model: XGBRegressor,
+    recent_df: pd.DataFrame,
+    n_trees: int = WARM_START_N_TREES,
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> XGBRegressor:
+    """
+    Continue boosting `base_model` with `n_trees` more trees fitted to
+    `recent_df` (XGBoost `xgb_model` continuation). The base model is not
+    modified; its trees are kept as they are.
+    """
+    params = {**(XGB_PARAMS if params is None else params), "n_estimators": n_trees}
+    return fit_regressor(recent_df, monotone, params, base_model=base_model)
 
-    model.fit(X_train, y_train)
 
-    y_pred = model.predict(X_val)
+def evaluate_model(model: XGBRegressor, val_df: pd.DataFrame) -> Dict[str, float]:
+    """MAE and RMSE of `model` on `val_df`."""
+    y_val = val_df[TARGET_COLUMN]
+    y_pred = model.predict(val_df[FEATURE_COLUMNS])
 
     mae = mean_absolute_error(y_val, y_pred)
 
@@ -74,11 +200,28 @@ def train_volume_model(feature_df: pd.DataFrame):
     mse = mean_squared_error(y_val, y_pred)
     rmse = float(np.sqrt(mse))
 
-    metrics = {"mae": float(mae), "rmse": rmse}
+    return {"mae": float(mae), "rmse": rmse}
 
-    # Persist model
-    with open(MODEL_PATH, "wb") as f:
-        pickle.dump(model, f)
+
+def publish_volume_model(
+    model: Union[XGBRegressor, Booster], monotone: bool, metadata: Dict[str, Any]
+) -> str:
+    """
+    Publish `model` as a new promoted release and write the feature
+    config and training metadata. Returns the release version.
+    """
+    constraints = monotone_constraints_for(FEATURE_COLUMNS) if monotone else {}
+
+    # Persist model (native UBJSON + manifest, no pickle) as a new release
+    # and promote it; running APIs pick it up without a restart.
+    version = publish_model_release(
+        model,
+        FEATURE_COLUMNS,
+        TARGET_COLUMN,
+        monotone_constraints={col: c for col, c in constraints.items() if c},
+    )
+    promote_model_release(version)
+    prune_model_releases()
 
     # Persist feature configuration
     with open(FEATURE_CONFIG_PATH, "w") as f:
@@ -88,12 +231,112 @@ def train_volume_model(feature_df: pd.DataFrame):
         )
 
     # Persist training metadata
-    metadata = {
-        "metrics": metrics,
-        "n_train": int(len(X_train)),
-        "n_val": int(len(X_val)),
-    }
     with open(TRAINING_METADATA_PATH, "w") as f:
-        json.dump(metadata, f)
+        json.dump({**metadata, "monotone": monotone, "model_version": version}, f)
+    return version
+
 
+def train_volume_model(
+    feature_df: pd.DataFrame,
+    monotone: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+    dmatrix_cache_dir: Optional[str] = None,
+):
+    """
+    Train an XGBoost regression model to predict daily volume.
+
+    `params` overrides the XGBRegressor hyperparameters (default
+    XGB_PARAMS), e.g. with the output of src/tuning.py. With
+    `dmatrix_cache_dir`, the training DMatrix is cached there in binary
+    form and reused when the same data is trained on again.
+
+    With `monotone=True`, predicted volume is constrained to be
+    non-increasing in the price-related features, which lets the
+    "monotone" price search bound the profit maximum exactly.
+
+    Saves:
+      - trained model in native format + manifest, published as a new
+        release under MODEL_RELEASES_DIR and promoted to CURRENT
+      - feature configuration (FEATURE_CONFIG_PATH)
+      - training metadata & metrics (TRAINING_METADATA_PATH)
+    """
+    train_df, val_df = time_based_split(feature_df)
+
+    model = fit_regressor(train_df, monotone, params, dmatrix_cache_dir=dmatrix_cache_dir)
+
+    metrics = evaluate_model(model, val_df)
+
+    publish_volume_model(
+        model,
+        monotone,
+        {
+            "metrics": metrics,
+            "n_train": int(len(train_df)),
+            "n_val": int(len(val_df)),
+            "params": XGB_PARAMS if params is None else params,
+            "warm_start_updates": 0,
+        },
+    )
+    return model, metrics
+
+
+def warm_start_volume_model(
+    feature_df: pd.DataFrame,
+    n_trees: int = WARM_START_N_TREES,
+    recent_days: int = WARM_START_RECENT_DAYS,
+    max_updates: int = WARM_START_MAX_UPDATES,
+    params: Optional[Dict[str, Any]] = None,
+    monotone: Optional[bool] = None,
+):
+    """
+    Incrementally retrain: add `n_trees` trees, fitted to the last
+    `recent_days` of the training split, to the currently promoted model.
+
+    Falls back to a full `train_volume_model` when there is no usable
+    previous model, its feature schema differs, it already has
+    `max_updates` warm-start updates since the last full retrain, or
+    `monotone` differs from whether it is monotone-constrained. With
+    `monotone=None` the previous model's constraints are kept. Validation
+    and the saved artifacts are the same as for a full retrain.
+    """
+    try:
+        with open(TRAINING_METADATA_PATH, "r") as f:
+            previous = json.load(f)
+        base_model, manifest = load_model_artifacts()
+    except (OSError, ValueError, KeyError) as exc:
+        logger.info("No previous model to warm-start from (%s); full retrain.", exc)
+        previous, manifest = None, None
+
+    base_monotone = bool(manifest and manifest.get("monotone_constraints"))
+    if monotone is None:
+        monotone = base_monotone
+    if manifest is None or manifest["feature_columns"] != FEATURE_COLUMNS:
+        return train_volume_model(feature_df, monotone=monotone, params=params)
+    if monotone != base_monotone:
+        logger.info("Monotone constraints changed; full retrain.")
+        return train_volume_model(feature_df, monotone=monotone, params=params)
+    updates = int(previous.get("warm_start_updates", max_updates))
+    if updates >= max_updates:
+        logger.info("%d warm-start updates since the last full retrain; full retrain.", updates)
+        return train_volume_model(feature_df, monotone=monotone, params=params)
+
+    train_df, val_df = time_based_split(feature_df)
+    recent_df = train_df[train_df["date"] > train_df["date"].max() - pd.Timedelta(days=recent_days)]
+
+    model = fit_warm_start(base_model, recent_df, n_trees, monotone, params)
+    metrics = evaluate_model(model, val_df)
+
+    publish_volume_model(
+        model,
+        monotone,
+        {
+            "metrics": metrics,
+            "n_train": int(len(recent_df)),
+            "n_val": int(len(val_df)),
+            "params": previous.get("params"),
+            "warm_start_updates": updates + 1,
+            "warm_start_trees": n_trees,
+            "base_model_version": previous.get("model_version"),
+        },
+    )
     return model, metrics
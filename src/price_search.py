@@ -0,0 +1,206 @@
+"""
+Search strategies over a candidate price grid.
+
+Exhaustive scoring of every grid point is exact but its cost grows with
+the grid resolution. The strategies here score only a subset of the grid:
+
+  - "grid": score every candidate (exact, the default)
+  - "coarse_to_fine": score a coarse sub-grid, then every fine point
+    around the best coarse candidates
+  - "golden": golden-section search over grid indices; exact only when
+    the predicted profit curve is unimodal in price
+  - "monotone": branch and bound that is exact when predicted volume is
+    non-increasing in price (models trained with monotone constraints)
+"""
+
+import heapq
+from typing import Any, Dict
+
+import numpy as np
+
+from .config import (
+    COARSE_PRICE_GRID_STEP,
+    MONOTONE_SEARCH_FANOUT,
+    PRICE_GRID_STEP,
+    REFINE_TOP_K,
+)
+
+_INV_PHI = (np.sqrt(5.0) - 1.0) / 2.0
+
+
+class CandidateScorer:
+    """
+    Lazily scores rows of a precomputed candidate feature matrix.
+
+    Each `score` call predicts only the candidates not scored before, in
+    one `model.predict` call, so strategies can revisit points for free.
+    """
+
+    def __init__(self, prices: np.ndarray, X: np.ndarray, cost: float, model: Any) -> None:
+        self.prices = np.asarray(prices, dtype=float)
+        self.X = X
+        self.cost = float(cost)
+        self.model = model
+        self.volumes = np.full(len(self.prices), np.nan)
+
+    @property
+    def num_evaluated(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.volumes)))
+
+    def score(self, indices: Any) -> np.ndarray:
+        """Return predicted profits for grid `indices`, predicting new ones."""
+        indices = np.unique(np.clip(np.asarray(indices, dtype=int), 0, len(self.prices) - 1))
+        new = indices[np.isnan(self.volumes[indices])]
+        if len(new):
+            self.volumes[new] = np.asarray(self.model.predict(self.X[new]), dtype=float)
+        return (self.prices[indices] - self.cost) * self.volumes[indices]
+
+    def profit(self, index: int) -> float:
+        return float(self.score([index])[0])
+
+    def best(self) -> Dict:
+        """Best candidate among those scored so far."""
+        scored = np.flatnonzero(~np.isnan(self.volumes))
+        profits = (self.prices[scored] - self.cost) * self.volumes[scored]
+        best_idx = int(scored[np.argmax(profits)])
+        return {
+            "recommended_price": float(self.prices[best_idx]),
+            "expected_volume": float(self.volumes[best_idx]),
+            "expected_profit": float(np.max(profits)),
+            "num_candidates_evaluated": self.num_evaluated,
+        }
+
+
+def search_grid(scorer: CandidateScorer) -> Dict:
+    """Score every candidate."""
+    scorer.score(np.arange(len(scorer.prices)))
+    return scorer.best()
+
+
+def search_coarse_to_fine(
+    scorer: CandidateScorer,
+    stride: int,
+    top_k: int = REFINE_TOP_K,
+) -> Dict:
+    """
+    Score every `stride`-th candidate (plus the last one), then every
+    candidate within one stride of the `top_k` best coarse points.
+    """
+    n = len(scorer.prices)
+    stride = max(1, stride)
+
+    coarse = np.unique(np.append(np.arange(0, n, stride), n - 1))
+    coarse_profits = scorer.score(coarse)
+
+    best_coarse = coarse[np.argsort(coarse_profits)[::-1][:top_k]]
+    windows = [np.arange(i - stride + 1, i + stride) for i in best_coarse]
+    scorer.score(np.concatenate(windows))
+    return scorer.best()
+
+
+def search_golden(scorer: CandidateScorer) -> Dict:
+    """
+    Golden-section search for the profit maximum over grid indices.
+
+    Shrinks the bracket until at most four candidates remain, then scores
+    them all. Only guaranteed to find the grid optimum when the profit
+    curve is unimodal.
+    """
+    lo, hi = 0, len(scorer.prices) - 1
+    while hi - lo > 3:
+        m1 = hi - int(round((hi - lo) * _INV_PHI))
+        m2 = lo + int(round((hi - lo) * _INV_PHI))
+        if m1 >= m2:
+            m1, m2 = (lo + hi) // 2, (lo + hi) // 2 + 1
+        p1, p2 = scorer.score([m1, m2])
+        if p1 < p2:
+            lo = m1
+        else:
+            hi = m2
+    scorer.score(np.arange(lo, hi + 1))
+    return scorer.best()
+
+
+def _monotone_upper_bound(scorer: CandidateScorer, i: int, j: int) -> float:
+    """
+    Upper bound on profit strictly between grid indices i < j, given that
+    volume is non-increasing in price and every margin is positive.
+    """
+    v_i = scorer.volumes[i]
+    if v_i >= 0:
+        return float((scorer.prices[j] - scorer.cost) * v_i)
+    # All volumes in (i, j) are <= v_i < 0, so profit can only get worse.
+    return float((scorer.prices[i] - scorer.cost) * v_i)
+
+
+def search_monotone(scorer: CandidateScorer, fanout: int = MONOTONE_SEARCH_FANOUT) -> Dict:
+    """
+    Exact branch-and-bound search for models whose predicted volume is
+    non-increasing in price.
+
+    For an interval [i, j] with scored endpoints, profit inside is at most
+    (p_j - cost) * v_i. Intervals are split best-bound first into `fanout`
+    pieces and discarded once their bound cannot beat the best profit
+    found, which typically takes a logarithmic number of evaluations.
+
+    Falls back to the exhaustive grid if any candidate has a non-positive
+    margin, where the bound does not hold.
+    """
+    n = len(scorer.prices)
+    if n <= 2 or np.any(scorer.prices <= scorer.cost):
+        return search_grid(scorer)
+
+    fanout = max(2, fanout)
+    scorer.score([0, n - 1])
+    best = max(scorer.profit(0), scorer.profit(n - 1))
+
+    heap = [(-_monotone_upper_bound(scorer, 0, n - 1), 0, n - 1)]
+    while heap:
+        neg_bound, i, j = heapq.heappop(heap)
+        if -neg_bound <= best:
+            break
+        if j - i <= 1:
+            continue
+
+        cuts = np.unique(np.linspace(i, j, fanout + 1).round().astype(int))
+        best = max(best, float(np.max(scorer.score(cuts[1:-1]))))
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            if b - a > 1:
+                heapq.heappush(heap, (-_monotone_upper_bound(scorer, a, b), int(a), int(b)))
+
+    return scorer.best()
+
+
+SEARCH_STRATEGIES = ("grid", "coarse_to_fine", "golden", "monotone")
+
+
+def run_search(
+    strategy: str,
+    prices: np.ndarray,
+    X: np.ndarray,
+    cost: float,
+    model: Any,
+    grid_step: float = PRICE_GRID_STEP,
+) -> Dict:
+    """
+    Find the profit-maximizing candidate with the given search strategy.
+
+    `num_candidates_evaluated` in the result counts the candidates the
+    strategy actually scored.
+    """
+    if len(prices) == 0:
+        raise RuntimeError("No candidate prices to search.")
+
+    scorer = CandidateScorer(prices, X, cost, model)
+    if strategy == "grid":
+        return search_grid(scorer)
+    if strategy == "coarse_to_fine":
+        stride = int(round(COARSE_PRICE_GRID_STEP / grid_step))
+        return search_coarse_to_fine(scorer, stride)
+    if strategy == "golden":
+        return search_golden(scorer)
+    if strategy == "monotone":
+        return search_monotone(scorer)
+    raise ValueError(
+        f"Unknown price search strategy '{strategy}'. Expected one of {SEARCH_STRATEGIES}."
+    )
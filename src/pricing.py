@@ -3,9 +3,8 @@ Pricing engine: uses the trained volume model to recommend a daily price
 that maximizes predicted profit under business constraints.
 """
 
-from typing import Any, Dict, List, Tuple
-import json
-import pickle
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -17,33 +16,71 @@ from .config import (
     PRICE_GRID_STEP,
     MIN_PRICE,
     MAX_PRICE,
-    MODEL_PATH,
-    FEATURE_CONFIG_PATH,
+    INFERENCE_ENGINE,
+    PRICE_SEARCH_STRATEGY,
+    DEFAULT_STATION_ID,
+    STATION_COLUMN,
 )
-from .features import FEATURE_COLUMNS
+from .model_store import is_monotone_decreasing_in_price, load_model_artifacts
+from .price_search import run_search
+from .tree_inference import compile_model
 
 
-def load_model_and_config() -> Tuple[Any, List[str]]:
+def load_model_with_manifest(
+    engine: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+) -> Tuple[Any, Dict[str, Any]]:
     """
-    Load the trained model and feature configuration from disk.
+    Load the trained model and its schema-checked manifest from disk
+    (by default the currently promoted release).
+
+    `engine` (default INFERENCE_ENGINE) selects the predictor returned:
+    "xgboost" for the XGBRegressor itself, "numpy" for a compiled
+    tree ensemble with the same `predict` interface.
+
+    Raises if PRICE_SEARCH_STRATEGY is "monotone" but the model was not
+    trained with monotone price constraints.
     """
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
+    engine = engine or INFERENCE_ENGINE
+    if engine not in ("xgboost", "numpy"):
+        raise ValueError(f"Unknown inference engine: {engine}")
+
+    model, manifest = load_model_artifacts(manifest_path)
+    if PRICE_SEARCH_STRATEGY == "monotone" and not is_monotone_decreasing_in_price(manifest):
+        raise ValueError(
+            "PRICE_SEARCH_STRATEGY='monotone' requires a model trained with "
+            "train_volume_model(..., monotone=True)."
+        )
+    if engine == "numpy":
+        model = compile_model(model)
+    return model, manifest
 
-    with open(FEATURE_CONFIG_PATH, "r") as f:
-        cfg = json.load(f)
 
-    feature_cols = cfg.get("feature_columns", FEATURE_COLUMNS)
-    return model, feature_cols
+def load_model_and_config(engine: Optional[str] = None) -> Tuple[Any, List[str]]:
+    """
+    Load the trained model and feature configuration from disk.
+
+    The feature columns come from the schema-checked model manifest.
+    See `load_model_with_manifest` for `engine`.
+    """
+    model, manifest = load_model_with_manifest(engine)
+    return model, manifest["feature_columns"]
 
 
-def build_price_grid(today_cost: float, last_price: float, avg_comp: float) -> np.ndarray:
+def build_price_grid(
+    today_cost: float,
+    last_price: float,
+    avg_comp: float,
+    step: float = PRICE_GRID_STEP,
+) -> np.ndarray:
     """
     Build a candidate price grid constrained by:
       - overall min/max allowed price
       - max absolute change vs last company price
       - minimum margin vs cost
       - maximum allowed gap above avg competitor price
+
+    Candidates are spaced `step` apart (default PRICE_GRID_STEP).
     """
     low = max(
         MIN_PRICE,
@@ -59,14 +96,125 @@ def build_price_grid(today_cost: float, last_price: float, avg_comp: float) -> n
 
     if low >= high:
         # Degenerate case: collapse to a single point and extend slightly
-        high = low + PRICE_GRID_STEP
+        high = low + step
 
-    prices = np.arange(low, high + PRICE_GRID_STEP, PRICE_GRID_STEP)
+    prices = np.arange(low, high + step, step)
     return np.round(prices, 2)
 
 
+@dataclass(frozen=True)
+class HistoryContext:
+    """
+    Snapshot of the history statistics needed to score candidate prices.
+
+    Built once from the feature table (e.g. at API startup or whenever
+    history changes) so per-request work does not depend on history length.
+    """
+
+    last_volume: float
+    lag7_volume: float
+    rolling_7d_vol_mean: float
+    rolling_7d_price_mean: float
+    date_min: pd.Timestamp
+
+    @classmethod
+    def from_feature_table(
+        cls,
+        history_features: pd.DataFrame,
+        date_min: Optional[pd.Timestamp] = None,
+    ) -> "HistoryContext":
+        """
+        Capture the latest lag/rolling stats and first date of a feature table.
+
+        Pass `date_min` when the table is only the tail of the history
+        (e.g. a snapshot), so trend_index stays anchored to the first date.
+        The table must hold a single station; see `build_history_contexts`.
+        """
+        if history_features.empty:
+            raise ValueError("Cannot build a HistoryContext from an empty feature table.")
+        if (
+            STATION_COLUMN in history_features.columns
+            and history_features[STATION_COLUMN].nunique() > 1
+        ):
+            raise ValueError(
+                "Feature table holds several stations; use build_history_contexts."
+            )
+
+        dates = history_features["date"]
+        last_row = history_features.loc[dates.idxmax()]
+
+        return cls(
+            last_volume=float(last_row["volume"]),
+            lag7_volume=float(last_row["lag7_volume"]),
+            rolling_7d_vol_mean=float(last_row["rolling_7d_vol_mean"]),
+            rolling_7d_price_mean=float(last_row["rolling_7d_price_mean"]),
+            date_min=pd.Timestamp(dates.min() if date_min is None else date_min),
+        )
+
+
+def build_history_contexts(
+    history_features: pd.DataFrame,
+    date_min: Optional[Mapping[str, pd.Timestamp]] = None,
+) -> Dict[str, HistoryContext]:
+    """
+    Build one HistoryContext per station of a (multi-station) feature table.
+
+    `date_min` optionally maps station -> first feature date, for tables
+    that only hold the tail of each station's history.
+    """
+    if history_features.empty:
+        raise ValueError("Cannot build HistoryContexts from an empty feature table.")
+
+    df = history_features
+    if STATION_COLUMN not in df.columns:
+        df = df.assign(**{STATION_COLUMN: DEFAULT_STATION_ID})
+
+    by_station = df.groupby(STATION_COLUMN, sort=False, observed=True)["date"]
+    last_rows = df.loc[by_station.idxmax()]
+    first_dates = by_station.min().to_dict()
+    if date_min is not None:
+        first_dates.update(date_min)
+
+    return {
+        str(row[STATION_COLUMN]): HistoryContext(
+            last_volume=float(row["volume"]),
+            lag7_volume=float(row["lag7_volume"]),
+            rolling_7d_vol_mean=float(row["rolling_7d_vol_mean"]),
+            rolling_7d_price_mean=float(row["rolling_7d_price_mean"]),
+            date_min=pd.Timestamp(first_dates[row[STATION_COLUMN]]),
+        )
+        for row in last_rows.to_dict("records")
+    }
+
+
+# A single station's context or feature table, or a station -> context map.
+HistoryLike = Union[HistoryContext, pd.DataFrame, Mapping[str, HistoryContext]]
+
+
+def history_for_today(today: Dict, history: HistoryLike) -> HistoryContext:
+    """
+    Resolve the HistoryContext for the station in `today` (station_id,
+    default DEFAULT_STATION_ID) from any HistoryLike.
+    """
+    if isinstance(history, HistoryContext):
+        return history
+
+    station_id = str(today.get(STATION_COLUMN) or DEFAULT_STATION_ID)
+    if isinstance(history, pd.DataFrame):
+        if STATION_COLUMN in history.columns:
+            history = history[history[STATION_COLUMN] == station_id]
+            if history.empty:
+                raise ValueError(f"No history for station '{station_id}'.")
+        return HistoryContext.from_feature_table(history)
+
+    try:
+        return history[station_id]
+    except KeyError:
+        raise ValueError(f"No history for station '{station_id}'.") from None
+
+
 def build_feature_row_for_candidate(
-    today: Dict, candidate_price: float, history_features: pd.DataFrame
+    today: Dict, candidate_price: float, history: HistoryLike
 ) -> Dict:
     """
     Build a feature-row for a single candidate price on 'today'.
@@ -74,11 +222,9 @@ def build_feature_row_for_candidate(
     We reuse the latest historical lag/rolling statistics and adjust
     the features that depend on today's price and date.
     """
-    history_sorted = history_features.sort_values("date").reset_index(drop=True)
-    last_row = history_sorted.iloc[-1]
+    ctx = history_for_today(today, history)
 
     date_today = pd.to_datetime(today["date"])
-    date_min = history_sorted["date"].min()
 
     avg_comp_price = float(
         np.mean(
@@ -101,26 +247,45 @@ def build_feature_row_for_candidate(
         "day_of_week": float(date_today.dayofweek),
         "month": float(date_today.month),
         # For lag/rolling features we reuse latest available stats.
-        "lag1_volume": float(last_row["volume"]),
-        "lag7_volume": float(last_row["lag7_volume"]),
-        "rolling_7d_vol_mean": float(last_row["rolling_7d_vol_mean"]),
-        "rolling_7d_price_mean": float(last_row["rolling_7d_price_mean"]),
-        "trend_index": float((date_today - date_min).days),
+        "lag1_volume": ctx.last_volume,
+        "lag7_volume": ctx.lag7_volume,
+        "rolling_7d_vol_mean": ctx.rolling_7d_vol_mean,
+        "rolling_7d_price_mean": ctx.rolling_7d_price_mean,
+        "trend_index": float((date_today - ctx.date_min).days),
     }
 
     return feature_row
 
 
-def recommend_price_for_today(
+def build_candidate_matrix(
     today: Dict,
-    history_features: pd.DataFrame,
-    model: Any,
+    prices: np.ndarray,
+    history: HistoryLike,
     feature_cols: List[str],
-) -> Dict:
+) -> np.ndarray:
     """
-    Recommend the best price for 'today' using a preloaded model
-    and historical feature table.
+    Build the feature matrix for a whole grid of candidate prices at once.
+
+    Only 'price' and 'price_gap_vs_avg' vary across candidates, so the
+    shared feature row is built once and broadcast over the grid.
+    Returns an array of shape (len(prices), len(feature_cols)).
     """
+    prices = np.asarray(prices, dtype=float)
+    base_row = build_feature_row_for_candidate(today, 0.0, history)
+
+    X = np.empty((len(prices), len(feature_cols)), dtype=float)
+    for j, col in enumerate(feature_cols):
+        if col == "price":
+            X[:, j] = prices
+        elif col == "price_gap_vs_avg":
+            X[:, j] = prices - base_row["avg_comp_price"]
+        else:
+            X[:, j] = base_row[col]
+    return X
+
+
+def candidate_prices_for_today(today: Dict, step: float = PRICE_GRID_STEP) -> np.ndarray:
+    """Build the guardrail-constrained candidate price grid for 'today'."""
     last_price = float(today["price"])
     today_cost = float(today["cost"])
 
@@ -134,43 +299,111 @@ def recommend_price_for_today(
         )
     )
 
-    prices = build_price_grid(today_cost, last_price, avg_comp)
-
-    candidates: List[Dict] = []
-
-    for p in prices:
-        feat_row = build_feature_row_for_candidate(today, float(p), history_features)
-        X = pd.DataFrame([feat_row])[feature_cols]
-        pred_volume = float(model.predict(X)[0])
-        pred_profit = (float(p) - today_cost) * pred_volume
+    prices = build_price_grid(today_cost, last_price, avg_comp, step)
+    if len(prices) == 0:
+        raise RuntimeError("No candidate prices generated for today.")
+    return prices
 
-        candidates.append(
-            {
-                "price": float(p),
-                "predicted_volume": pred_volume,
-                "predicted_profit": pred_profit,
-            }
-        )
 
-    if not candidates:
-        raise RuntimeError("No candidate prices generated for today.")
+def select_best_candidate(
+    prices: np.ndarray, today_cost: float, pred_volumes: np.ndarray
+) -> Dict:
+    """Pick the profit-maximizing candidate from scored prices."""
+    pred_volumes = np.asarray(pred_volumes, dtype=float)
+    pred_profits = (prices - today_cost) * pred_volumes
 
-    best = max(candidates, key=lambda x: x["predicted_profit"])
+    best_idx = int(np.argmax(pred_profits))
 
     return {
-        "recommended_price": best["price"],
-        "expected_volume": best["predicted_volume"],
-        "expected_profit": best["predicted_profit"],
-        "num_candidates_evaluated": len(candidates),
+        "recommended_price": float(prices[best_idx]),
+        "expected_volume": float(pred_volumes[best_idx]),
+        "expected_profit": float(pred_profits[best_idx]),
+        "num_candidates_evaluated": int(len(prices)),
     }
 
 
-def recommend_price(today: Dict, history_features: pd.DataFrame) -> Dict:
+def recommend_price_for_today(
+    today: Dict,
+    history: HistoryLike,
+    model: Any,
+    feature_cols: List[str],
+    strategy: Optional[str] = None,
+    grid_step: float = PRICE_GRID_STEP,
+) -> Dict:
+    """
+    Recommend the best price for 'today' using a preloaded model
+    and a HistoryContext (or the historical feature table it is built from).
+
+    `strategy` (default PRICE_SEARCH_STRATEGY) picks how the candidate grid
+    is searched; "grid" scores the whole grid with a single `model.predict`
+    call. See src/price_search.py for the alternatives.
+    """
+    strategy = strategy or PRICE_SEARCH_STRATEGY
+    prices = candidate_prices_for_today(today, grid_step)
+    X = build_candidate_matrix(today, prices, history, feature_cols)
+
+    if strategy == "grid":
+        return select_best_candidate(prices, float(today["cost"]), model.predict(X))
+    return run_search(strategy, prices, X, float(today["cost"]), model, grid_step)
+
+
+def recommend_prices_batch(
+    todays: List[Dict],
+    history: Union[HistoryLike, List[HistoryContext]],
+    model: Any,
+    feature_cols: List[str],
+    strategy: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Recommend prices for several 'today' contexts with one inference pass.
+
+    All candidate grids are stacked into a single feature matrix, scored
+    with one `model.predict` call and split back per request. Non-grid
+    search strategies need several dependent rounds per request, so they
+    are run request by request instead.
+
+    `history` may also be a list holding each request's HistoryContext.
+    """
+    if not todays:
+        return []
+
+    if isinstance(history, list):
+        contexts = history
+    else:
+        if isinstance(history, pd.DataFrame):
+            history = build_history_contexts(history)
+        contexts = [history_for_today(today, history) for today in todays]
+
+    strategy = strategy or PRICE_SEARCH_STRATEGY
+    if strategy != "grid":
+        return [
+            recommend_price_for_today(today, ctx, model, feature_cols, strategy)
+            for today, ctx in zip(todays, contexts)
+        ]
+
+    grids = [candidate_prices_for_today(today) for today in todays]
+    X = np.vstack(
+        [
+            build_candidate_matrix(today, prices, ctx, feature_cols)
+            for today, prices, ctx in zip(todays, grids, contexts)
+        ]
+    )
+    pred_volumes = np.asarray(model.predict(X), dtype=float)
+
+    offsets = np.cumsum([len(prices) for prices in grids])[:-1]
+    return [
+        select_best_candidate(prices, float(today["cost"]), volumes)
+        for today, prices, volumes in zip(todays, grids, np.split(pred_volumes, offsets))
+    ]
+
+
+def recommend_price(today: Dict, history: HistoryLike) -> Dict:
     """
     Convenience wrapper: loads model from disk and computes recommendation.
 
     Useful for CLI/demo scripts. For high-throughput serving, prefer
-    preloading the model and using `recommend_price_for_today`.
+    preloading the model and a HistoryContext and using
+    `recommend_price_for_today`.
     """
     model, feature_cols = load_model_and_config()
-    return recommend_price_for_today(today, history_features, model, feature_cols)
+    return recommend_price_for_today(today, history, model, feature_cols)
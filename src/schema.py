@@ -0,0 +1,74 @@
+"""
+Explicit, compact dtypes for history and feature tables.
+
+`pd.read_csv` infers float64/int64 for every numeric column. Prices fit
+comfortably in float32 (XGBoost trains on float32 anyway), volumes in
+int32, calendar fields in int8, and the station id is a low-cardinality
+category, which roughly halves the memory of both tables. Volumes must
+therefore be whole numbers within the int32 range; anything else is
+rejected with a ValueError rather than silently truncated.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .config import STATION_COLUMN
+
+PRICE_COLUMNS = ["price", "cost", "comp1_price", "comp2_price", "comp3_price"]
+
+# Raw/cleaned history. Volume is nullable until `clean_history` has
+# dropped missing values; after that it is a plain int32.
+HISTORY_DTYPES: Dict[str, str] = {
+    **{col: "float32" for col in PRICE_COLUMNS},
+    "volume": "Int32",
+    STATION_COLUMN: "category",
+}
+CLEAN_HISTORY_DTYPES: Dict[str, str] = {**HISTORY_DTYPES, "volume": "int32"}
+
+# Engineered features (on top of CLEAN_HISTORY_DTYPES).
+FEATURE_DTYPES: Dict[str, str] = {
+    **CLEAN_HISTORY_DTYPES,
+    "avg_comp_price": "float32",
+    "price_gap_vs_avg": "float32",
+    "day_of_week": "int8",
+    "month": "int8",
+    "lag1_volume": "float32",
+    "lag7_volume": "float32",
+    "rolling_7d_vol_mean": "float32",
+    "rolling_7d_price_mean": "float32",
+    "trend_index": "int32",
+}
+
+
+def check_volume(volume: pd.Series) -> None:
+    """
+    Raise ValueError unless every non-missing volume is a whole number
+    that fits in int32.
+    """
+    values = pd.to_numeric(volume).dropna().astype("float64")
+    fractional = values[values != np.floor(values)]
+    if len(fractional):
+        raise ValueError(
+            f"volume must be a whole number; {len(fractional)} fractional value(s), "
+            f"e.g. {fractional.iloc[0]}"
+        )
+    info = np.iinfo(np.int32)
+    out_of_range = values[(values < info.min) | (values > info.max)]
+    if len(out_of_range):
+        raise ValueError(
+            f"volume must fit in int32; {len(out_of_range)} value(s) out of range, "
+            f"e.g. {out_of_range.iloc[0]:.0f}"
+        )
+
+
+def apply_schema(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """
+    Cast the columns of `df` present in `dtypes`; other columns are kept as is.
+
+    Volume is validated with `check_volume` first.
+    """
+    if "volume" in dtypes and "volume" in df.columns:
+        check_volume(df["volume"])
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
@@ -0,0 +1,127 @@
+"""
+Content-addressed caching of pipeline stage outputs.
+
+Each stage's output is stored under a key hashed from everything that
+determines it: the upstream stage's key (or the raw data fingerprint),
+the config values the stage reads, and the source code of the modules it
+runs. Rerunning the pipeline with unchanged inputs reuses the stored
+output; changing, say, only XGB_PARAMS reruns only the training stage.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from . import config, data_pipeline, features, history_store, schema
+from .config import STAGE_CACHE_DIR
+
+
+def code_fingerprint(*modules: ModuleType) -> str:
+    """Hex SHA-256 of the source files of `modules`."""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(Path(inspect.getsourcefile(module)).read_bytes())
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hex SHA-256 of a DataFrame's column names and row contents."""
+    digest = hashlib.sha256(json.dumps(list(map(str, df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, **inputs: Any) -> str:
+    """Hex SHA-256 of a stage name and its JSON-serializable inputs."""
+    payload = json.dumps({"stage": stage, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def data_stage_keys(data: str) -> Tuple[str, str, str]:
+    """
+    Keys of the load, clean and features stages for raw data with
+    fingerprint `data`, chained so each key covers its upstream.
+
+    Each key covers the config values the stage reads, not all of
+    config.py, so editing e.g. XGB_PARAMS leaves these stages cached.
+    """
+    station = {
+        "station_column": config.STATION_COLUMN,
+        "default_station_id": config.DEFAULT_STATION_ID,
+    }
+    load_key = stage_key(
+        "load",
+        data=data,
+        config=station,
+        code=code_fingerprint(data_pipeline, history_store, schema),
+    )
+    clean_key = stage_key(
+        "clean", upstream=load_key, config=station, code=code_fingerprint(data_pipeline, schema)
+    )
+    features_key = stage_key(
+        "features", upstream=clean_key, config=station, code=code_fingerprint(features, schema)
+    )
+    return load_key, clean_key, features_key
+
+
+def _entry_path(cache_dir: str, stage: str, key: str, suffix: str) -> Path:
+    return Path(cache_dir) / f"{stage}-{key}{suffix}"
+
+
+def cached_frame(
+    stage: str,
+    key: str,
+    compute: Callable[[], pd.DataFrame],
+    force: bool = False,
+    cache_dir: str = STAGE_CACHE_DIR,
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Return the stage's DataFrame output for `key`, computing and storing
+    it on a miss (or when `force`). The flag is True on a cache hit.
+    """
+    path = _entry_path(cache_dir, stage, key, ".parquet")
+    if not force and path.exists():
+        return pd.read_parquet(path), True
+
+    df = compute()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = str(path) + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return df, False
+
+
+def cached_record(
+    stage: str,
+    key: str,
+    compute: Callable[[], Dict[str, Any]],
+    force: bool = False,
+    is_valid: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    cache_dir: str = STAGE_CACHE_DIR,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    JSON counterpart of `cached_frame` for stages whose output lives
+    elsewhere (e.g. a model release) and is described by a small record.
+
+    `is_valid` can reject a stored record whose external output is gone.
+    """
+    path = _entry_path(cache_dir, stage, key, ".json")
+    if not force and path.exists():
+        with open(path, "r") as f:
+            record = json.load(f)
+        if is_valid is None or is_valid(record):
+            return record, True
+
+    record = compute()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, path)
+    return record, False
@@ -0,0 +1,187 @@
+"""
+Pure-NumPy inference for trained XGBoost tree ensembles.
+
+For the small candidate grids scored per request, the fixed per-call
+overhead of `XGBRegressor.predict` is comparable to the tree traversal
+itself. This module exports the booster's trees into flat arrays laid out
+as perfect binary trees and walks all trees for all rows at once, one
+tree level per step, with pure index arithmetic.
+"""
+
+import json
+from typing import Any
+
+import numpy as np
+from xgboost import Booster
+
+# Objectives whose prediction is the raw margin (identity link).
+_SUPPORTED_OBJECTIVES = {"reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror"}
+
+# Perfect-tree layout needs 2**depth slots per tree; refuse anything deeper.
+MAX_COMPILED_DEPTH = 12
+
+
+def _parse_base_score(value: str) -> float:
+    # Newer XGBoost versions store a vector, e.g. "[1.3971343E4]".
+    return float(value.strip("[]"))
+
+
+def _tree_depth(left_children: list, right_children: list) -> int:
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, d = stack.pop()
+        if left_children[node] == -1:
+            depth = max(depth, d)
+        else:
+            stack.append((left_children[node], d + 1))
+            stack.append((right_children[node], d + 1))
+    return depth
+
+
+class CompiledTreeEnsemble:
+    """
+    Flat-array representation of a gbtree regression model.
+
+    Every tree is padded to a perfect binary tree of depth `depth`: the
+    children of internal slot p are 2p+1 and 2p+2. Leaves that sit above
+    the bottom level are pushed down through dummy splits that always go
+    left, so traversal is exactly `depth` steps for every tree and row.
+
+    Arrays:
+      - feature, threshold, default_left: shape (n_trees, 2**depth - 1)
+      - leaf_value: shape (n_trees, 2**depth)
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        default_left: np.ndarray,
+        leaf_value: np.ndarray,
+        base_score: float,
+        num_features: int,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.base_score = base_score
+        self.num_features = num_features
+
+        self.n_trees, n_leaves = leaf_value.shape
+        self.depth = int(np.log2(n_leaves))
+
+        # Flattened copies for cheap 1D `take` calls during traversal.
+        self._feature = feature.ravel().astype(np.int64)
+        self._threshold = threshold.ravel()
+        self._default_left = default_left.ravel()
+        self._leaf_value = leaf_value.ravel()
+
+    @classmethod
+    def from_booster(cls, booster: Booster) -> "CompiledTreeEnsemble":
+        """Export a trained booster's trees into flat arrays."""
+        learner = json.loads(bytes(booster.save_raw(raw_format="json")))["learner"]
+
+        objective = learner["objective"]["name"]
+        if objective not in _SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for compiled inference: {objective}")
+
+        gbm = learner["gradient_booster"]
+        if gbm["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster for compiled inference: {gbm['name']}")
+
+        model_param = learner["learner_model_param"]
+        if int(model_param.get("num_target", "1")) != 1:
+            raise ValueError("Compiled inference supports single-target models only.")
+
+        trees = gbm["model"]["trees"]
+        if not trees:
+            raise ValueError("Booster has no trees to compile.")
+        if any(any(t["split_type"]) for t in trees):
+            raise ValueError("Categorical splits are not supported by compiled inference.")
+
+        depth = max(_tree_depth(t["left_children"], t["right_children"]) for t in trees)
+        if depth > MAX_COMPILED_DEPTH:
+            raise ValueError(
+                f"Tree depth {depth} exceeds MAX_COMPILED_DEPTH={MAX_COMPILED_DEPTH}."
+            )
+
+        n_internal = 2**depth - 1
+        feature = np.zeros((len(trees), n_internal), dtype=np.int32)
+        # Dummy splits: x < +inf is always true, and missing values go left too.
+        threshold = np.full((len(trees), n_internal), np.inf, dtype=np.float32)
+        default_left = np.ones((len(trees), n_internal), dtype=bool)
+        leaf_value = np.zeros((len(trees), 2**depth), dtype=np.float64)
+
+        for i, tree in enumerate(trees):
+            lc = tree["left_children"]
+            rc = tree["right_children"]
+            # For leaves, split_conditions holds the leaf weight.
+            cond = tree["split_conditions"]
+
+            stack = [(0, 0)]  # (xgboost node id, perfect-tree slot)
+            while stack:
+                node, slot = stack.pop()
+                if slot >= n_internal:
+                    leaf_value[i, slot - n_internal] = cond[node]
+                elif lc[node] == -1:
+                    stack.append((node, 2 * slot + 1))
+                    stack.append((node, 2 * slot + 2))
+                else:
+                    feature[i, slot] = tree["split_indices"][node]
+                    threshold[i, slot] = cond[node]
+                    default_left[i, slot] = bool(tree["default_left"][node])
+                    stack.append((lc[node], 2 * slot + 1))
+                    stack.append((rc[node], 2 * slot + 2))
+
+        return cls(
+            feature=feature,
+            threshold=threshold,
+            default_left=default_left,
+            leaf_value=leaf_value,
+            base_score=_parse_base_score(model_param["base_score"]),
+            num_features=int(model_param["num_feature"]),
+        )
+
+    def predict(self, X: Any) -> np.ndarray:
+        """
+        Predict for a 2D feature matrix (same column order as training).
+
+        Splits follow XGBoost semantics: go left when x < threshold in
+        float32, and follow the default direction for missing values.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.num_features:
+            raise ValueError(
+                f"Expected a 2D array with {self.num_features} features, got shape {X.shape}"
+            )
+
+        n_rows = X.shape[0]
+        X_flat = X.ravel()
+        has_missing = bool(np.isnan(X_flat).any())
+
+        # One cursor per (tree, row); `slot` is the position inside its tree.
+        tree_ids = np.repeat(np.arange(self.n_trees, dtype=np.int64), n_rows)
+        internal_base = tree_ids * (2**self.depth - 1)
+        row_base = np.tile(np.arange(n_rows, dtype=np.int64) * self.num_features, self.n_trees)
+        slot = np.zeros(self.n_trees * n_rows, dtype=np.int64)
+
+        for _ in range(self.depth):
+            idx = internal_base + slot
+            x = X_flat.take(row_base + self._feature.take(idx))
+            go_right = ~(x < self._threshold.take(idx))
+            if has_missing:
+                missing = np.isnan(x)
+                go_right[missing] = ~self._default_left.take(idx[missing])
+            slot = 2 * slot + 1 + go_right
+
+        leaf_idx = tree_ids * 2**self.depth + (slot - (2**self.depth - 1))
+        leaves = self._leaf_value.take(leaf_idx).reshape(self.n_trees, n_rows)
+        return self.base_score + leaves.sum(axis=0)
+
+
+def compile_model(model: Any) -> CompiledTreeEnsemble:
+    """Compile an XGBRegressor or Booster into a CompiledTreeEnsemble."""
+    booster = model if isinstance(model, Booster) else model.get_booster()
+    return CompiledTreeEnsemble.from_booster(booster)
@@ -0,0 +1,236 @@
+"""
+Hyperparameter search for the volume model.
+
+Random configurations from TUNING_SEARCH_SPACE are scored on
+time-ordered validation folds (train on everything before a fold, early
+stopping against the fold) and pruned by successive halving: every rung
+keeps the best 1/TUNING_ETA of the configurations and multiplies their
+boosting-round budget by TUNING_ETA. Trials run concurrently in a
+process pool with XGBoost threads pinned per trial. The best
+configuration is persisted next to the model artifacts, and a per-trial
+report (including wall-clock cost) is written to Parquet.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from .backtest import rolling_origin_folds
+from .config import (
+    RANDOM_STATE,
+    TUNED_PARAMS_PATH,
+    TUNING_EARLY_STOPPING_ROUNDS,
+    TUNING_ETA,
+    TUNING_MAX_ROUNDS,
+    TUNING_N_FOLDS,
+    TUNING_N_TRIALS,
+    TUNING_SEARCH_SPACE,
+    TUNING_VAL_DAYS,
+)
+from .features import FEATURE_COLUMNS, TARGET_COLUMN
+from .modeling import booster_params
+
+# Per-worker data, set once by `_init_worker`; fold DMatrices are built
+# lazily and reused by every trial the worker runs.
+_X: Optional[np.ndarray] = None
+_y: Optional[np.ndarray] = None
+_day: Optional[np.ndarray] = None
+_folds: List[Dict[str, int]] = []
+_nthread = 1
+_fold_matrices: Dict[int, Tuple[xgb.DMatrix, xgb.DMatrix]] = {}
+
+
+def sample_params(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    """
+    Draw one configuration from a search space.
+
+    A list is a set of choices; a (low, high) tuple is a uniform range and
+    (low, high, "log") a log-uniform one.
+    """
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            params[name] = spec[int(rng.integers(len(spec)))]
+        elif len(spec) == 3 and spec[2] == "log":
+            params[name] = float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]))))
+        else:
+            params[name] = float(rng.uniform(spec[0], spec[1]))
+    return params
+
+
+def tuning_folds(
+    dates: pd.Series, n_folds: int = TUNING_N_FOLDS, val_days: int = TUNING_VAL_DAYS
+) -> List[Dict[str, int]]:
+    """The last `n_folds` consecutive `val_days` windows, each trained on all prior days."""
+    span = int((pd.to_datetime(dates).max() - pd.to_datetime(dates).min()).days) + 1
+    first_origin = span - n_folds * val_days
+    if first_origin <= 0:
+        raise ValueError("History too short for the requested tuning folds.")
+    return rolling_origin_folds(
+        dates, min_train_days=first_origin, horizon_days=val_days, step_days=val_days
+    )
+
+
+def _init_worker(
+    X: np.ndarray, y: np.ndarray, day: np.ndarray, folds: List[Dict[str, int]], nthread: int
+) -> None:
+    global _X, _y, _day, _folds, _nthread
+    _X, _y, _day, _folds, _nthread = X, y, day, folds, nthread
+    _fold_matrices.clear()
+
+
+def _matrices(fold: Dict[str, int]) -> Tuple[xgb.DMatrix, xgb.DMatrix]:
+    if fold["fold"] not in _fold_matrices:
+        train = (_day >= fold["train_start"]) & (_day < fold["origin"])
+        val = (_day >= fold["origin"]) & (_day < fold["test_end"])
+        _fold_matrices[fold["fold"]] = (
+            xgb.DMatrix(_X[train], label=_y[train], nthread=_nthread),
+            xgb.DMatrix(_X[val], label=_y[val], nthread=_nthread),
+        )
+    return _fold_matrices[fold["fold"]]
+
+
+def _run_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    params, _ = booster_params(task["params"], _nthread)
+    params["eval_metric"] = "rmse"
+
+    scores, best_rounds = [], []
+    for fold in _folds:
+        dtrain, dval = _matrices(fold)
+        booster = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=task["num_boost_round"],
+            evals=[(dval, "val")],
+            early_stopping_rounds=TUNING_EARLY_STOPPING_ROUNDS,
+            verbose_eval=False,
+        )
+        scores.append(booster.best_score)
+        best_rounds.append(booster.best_iteration + 1)
+
+    return {
+        "trial": task["trial"],
+        "rung": task["rung"],
+        "num_boost_round": task["num_boost_round"],
+        "val_rmse": float(np.mean(scores)),
+        "best_n_estimators": int(round(np.mean(best_rounds))),
+        "params": json.dumps(task["params"], sort_keys=True),
+        "wall_s": time.perf_counter() - t0,
+        "worker_pid": os.getpid(),
+    }
+
+
+def successive_halving(
+    feature_df: pd.DataFrame,
+    n_trials: int = TUNING_N_TRIALS,
+    eta: int = TUNING_ETA,
+    max_rounds: int = TUNING_MAX_ROUNDS,
+    space: Optional[Dict[str, Any]] = None,
+    folds: Optional[List[Dict[str, int]]] = None,
+    workers: Optional[int] = None,
+    seed: int = RANDOM_STATE,
+) -> pd.DataFrame:
+    """
+    Run the search and return one report row per (trial, rung).
+
+    Rungs run one after another; the trials of a rung run concurrently on
+    `workers` processes (default: one per CPU; 1 runs in-process). The
+    last rung gets `max_rounds` boosting rounds, each earlier rung 1/eta
+    of the next. With n_trials <= eta this is plain random search.
+
+    `wall_s` is each trial's own run time; `rung_wall_s` is the
+    wall-clock time of its whole rung, which is less than the sum of
+    its trials when they run concurrently.
+    """
+    space = TUNING_SEARCH_SPACE if space is None else space
+    folds = tuning_folds(feature_df["date"]) if folds is None else folds
+    rng = np.random.default_rng(seed)
+    candidates = {i: sample_params(space, rng) for i in range(n_trials)}
+
+    n_rungs = 1
+    while n_trials // eta ** n_rungs >= 1 and max_rounds // eta ** n_rungs >= 1:
+        n_rungs += 1
+
+    cpus = os.cpu_count() or 1
+    workers = min(workers or cpus, n_trials)
+    nthread = max(1, cpus // workers)
+
+    X = np.ascontiguousarray(feature_df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+    y = feature_df[TARGET_COLUMN].to_numpy(dtype=np.float64)
+    day = (feature_df["date"] - feature_df["date"].min()).dt.days.to_numpy(dtype=np.int32)
+    init_args = (X, y, day, folds, nthread)
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args)
+    else:
+        _init_worker(*init_args)
+
+    rows: List[Dict[str, Any]] = []
+    try:
+        for rung in range(n_rungs):
+            rounds = max(1, max_rounds // eta ** (n_rungs - 1 - rung))
+            tasks = [
+                {"trial": i, "rung": rung, "params": p, "num_boost_round": rounds}
+                for i, p in candidates.items()
+            ]
+            t0 = time.perf_counter()
+            results = list(pool.map(_run_trial, tasks) if pool else map(_run_trial, tasks))
+            rung_wall_s = time.perf_counter() - t0
+            rows.extend({**r, "rung_wall_s": rung_wall_s} for r in results)
+
+            keep = max(1, len(results) // eta)
+            survivors = sorted(results, key=lambda r: r["val_rmse"])[:keep]
+            candidates = {r["trial"]: candidates[r["trial"]] for r in survivors}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return pd.DataFrame(rows)
+
+
+def best_params(report: pd.DataFrame) -> Dict[str, Any]:
+    """XGBRegressor params of the best trial in the last rung."""
+    last = report[report["rung"] == report["rung"].max()]
+    best = last.loc[last["val_rmse"].idxmin()]
+    return {**json.loads(best["params"]), "n_estimators": int(best["best_n_estimators"])}
+
+
+def save_tuned_params(
+    params: Dict[str, Any],
+    report: pd.DataFrame,
+    search_wall_s: float,
+    path: str = TUNED_PARAMS_PATH,
+) -> None:
+    """
+    Persist the chosen params with their validation score, the wall-clock
+    time of the whole search and the summed run time of its trials.
+    """
+    last = report[report["rung"] == report["rung"].max()]
+    record = {
+        "params": params,
+        "val_rmse": float(last["val_rmse"].min()),
+        "n_trials": int(report["trial"].nunique()),
+        "search_wall_s": search_wall_s,
+        "trial_seconds_total": float(report["wall_s"].sum()),
+        "xgboost_version": xgb.__version__,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_tuned_params(path: str = TUNED_PARAMS_PATH) -> Dict[str, Any]:
+    """The params saved by `save_tuned_params`."""
+    with open(path, "r") as f:
+        return json.load(f)["params"]
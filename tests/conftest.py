@@ -0,0 +1,45 @@
+"""
+Shared fixtures: a deterministic synthetic history and small XGBoost
+hyperparameters for fast training in tests.
+"""
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def synthetic_history() -> Callable[..., pd.DataFrame]:
+    """
+    Factory for a single-station daily history of `n_days` days whose
+    (whole-number) volume falls as price rises above the competitors.
+    """
+
+    def make(n_days: int = 120) -> pd.DataFrame:
+        rng = np.random.default_rng(0)
+        dates = pd.date_range("2024-01-01", periods=n_days, freq="D")
+        cost = 85.0 + rng.normal(0, 1, n_days)
+        comps = 95.0 + rng.normal(0, 1, (n_days, 3))
+        price = comps.mean(axis=1) + rng.normal(0, 0.5, n_days)
+        volume = np.round(15000 - 800 * (price - comps.mean(axis=1)) + rng.normal(0, 200, n_days))
+        return pd.DataFrame(
+            {
+                "date": dates,
+                "price": price,
+                "cost": cost,
+                "comp1_price": comps[:, 0],
+                "comp2_price": comps[:, 1],
+                "comp3_price": comps[:, 2],
+                "volume": volume,
+            }
+        )
+
+    return make
+
+
+@pytest.fixture
+def small_params() -> dict:
+    """XGBoost params small enough to train in milliseconds."""
+    return {"n_estimators": 20, "max_depth": 3}
@@ -0,0 +1,288 @@
+"""
+Tests for the HTTP API, served from a small model trained on synthetic
+history (no artifacts on disk; startup events are not run).
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.api.batching import MicroBatcher
+from src.api.cache import recommendation_cache_key
+from src.api.model_reloader import ModelBundle
+from src.api.observation_log import ObservationLog
+from src.features import FEATURE_COLUMNS, build_feature_table
+from src.incremental_features import engines_from_feature_table
+from src.model_store import (
+    current_manifest_path,
+    promote_model_release,
+    publish_model_release,
+    release_manifest_path,
+)
+from src.modeling import fit_regressor
+
+OBSERVATION = {
+    "date": "2024-04-30",
+    "price": 95.0,
+    "cost": 85.0,
+    "comp1_price": 95.1,
+    "comp2_price": 95.3,
+    "comp3_price": 94.8,
+    "volume": 14000,
+}
+
+
+@pytest.fixture
+def feature_df(synthetic_history):
+    return build_feature_table(synthetic_history())
+
+
+def _load_history(monkeypatch, feature_df, log_path) -> None:
+    """Fresh engines from `feature_df`, as at worker startup."""
+    engines = engines_from_feature_table(feature_df)
+    monkeypatch.setattr(main, "_history_engines", engines)
+    monkeypatch.setattr(
+        main, "_history_contexts", {s: e.context() for s, e in engines.items()}
+    )
+    monkeypatch.setattr(main, "_observation_log", ObservationLog(log_path))
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, feature_df, small_params):
+    _load_history(monkeypatch, feature_df, str(tmp_path / "observations.ndjson"))
+    bundle = ModelBundle(
+        model=fit_regressor(feature_df, params=small_params),
+        feature_cols=FEATURE_COLUMNS,
+        version="test",
+        manifest_path="unused",
+    )
+    monkeypatch.setattr(main, "_bundle", bundle)
+    main._cache.clear()
+    return TestClient(main.app)
+
+
+def test_observe_rejects_fractional_volume(client):
+    response = client.post("/observe", json={**OBSERVATION, "volume": 14000.9})
+    assert response.status_code == 422
+    assert client.post("/observe", json=OBSERVATION).status_code == 200
+
+
+def test_observe_updates_the_station_context(client):
+    before = main._history_contexts["default"]
+
+    response = client.post("/observe", json=OBSERVATION)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "ok",
+        "station_id": "default",
+        "history_last_date": "2024-04-30",
+        "features_updated": True,
+    }
+    after = main._history_contexts["default"]
+    assert after != before
+    assert after.last_volume == 14000
+
+
+def test_observe_rejects_invalid_and_out_of_order_observations(client):
+    assert client.post("/observe", json={**OBSERVATION, "price": -1.0}).status_code == 422
+    assert client.post("/observe", json={**OBSERVATION, "date": "not a date"}).status_code == 422
+
+    assert client.post("/observe", json=OBSERVATION).status_code == 200
+    assert client.post("/observe", json=OBSERVATION).status_code == 409
+    assert client.post("/observe", json={**OBSERVATION, "date": "2024-04-01"}).status_code == 409
+
+
+def test_observe_starts_a_new_station(client):
+    response = client.post("/observe", json={**OBSERVATION, "station_id": "new"})
+
+    assert response.status_code == 200
+    assert response.json()["features_updated"] is False
+    assert "new" in main._history_engines
+    # Not priceable until it has a complete feature row.
+    today = {k: v for k, v in OBSERVATION.items() if k != "volume"}
+    response = client.post("/recommend_price", json={**today, "station_id": "new"})
+    assert response.status_code == 404
+
+
+def test_observations_are_replayed_after_restart(client, monkeypatch, tmp_path, feature_df):
+    client.post("/observe", json=OBSERVATION)
+    client.post("/observe", json={**OBSERVATION, "date": "2024-05-01", "volume": 14500})
+    client.post("/observe", json={**OBSERVATION, "station_id": "new"})
+    observed = main._history_contexts
+
+    # A restarted (or another) worker starts from the snapshot and the log.
+    _load_history(monkeypatch, feature_df, str(tmp_path / "observations.ndjson"))
+    assert main.replay_observations() == 3
+    assert main._history_contexts == observed
+    assert main._history_engines["new"].last_date == pd.Timestamp("2024-04-30")
+    # Lines already applied are not read again.
+    assert main.replay_observations() == 0
+
+
+def test_failed_log_append_leaves_history_unchanged(client, monkeypatch):
+    log = main._observation_log
+    contexts, engine = main._history_contexts, main._history_engines["default"]
+    last_date = engine.last_date
+
+    def append(record):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(log, "append", append)
+        response = TestClient(main.app, raise_server_exceptions=False).post(
+            "/observe", json=OBSERVATION
+        )
+
+    assert response.status_code == 500
+    assert main._history_contexts is contexts
+    assert engine.last_date == last_date
+
+    assert client.post("/observe", json=OBSERVATION).status_code == 200
+    assert client.post("/observe", json=OBSERVATION).status_code == 409
+    assert len(log.read_new()) == 1
+
+
+def test_batched_request_is_scored_with_the_artifacts_it_was_keyed_on(
+    client, monkeypatch, feature_df
+):
+    today = {k: v for k, v in OBSERVATION.items() if k != "volume"}
+    expected = client.post("/recommend_price", json=today).json()
+    key = recommendation_cache_key(today, main._bundle.version, main._history_contexts["default"])
+    main._cache.clear()
+
+    class _NoDemand:
+        def predict(self, X):
+            return [0.0] * len(X)
+
+    swapped = ModelBundle(
+        model=_NoDemand(), feature_cols=FEATURE_COLUMNS, version="swapped", manifest_path="unused"
+    )
+
+    def swap_then_score(items):
+        # A hot swap and an /observe land between enqueue and flush.
+        monkeypatch.setattr(main, "_bundle", swapped)
+        monkeypatch.setattr(main, "_history_contexts", {})
+        return main._score_batch(items)
+
+    monkeypatch.setattr(main, "_batcher", MicroBatcher(swap_then_score, 1, 0.0))
+
+    assert client.post("/recommend_price", json=today).json() == expected
+    assert main._cache.get(key) == expected
+
+
+def _bulk(client, todays):
+    response = client.post("/recommend_prices", json=todays)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_bulk_results_are_ordered_and_match_single_requests(client, monkeypatch):
+    monkeypatch.setattr(main, "BULK_INFERENCE_CHUNK_SIZE", 2)
+    today = {k: v for k, v in OBSERVATION.items() if k != "volume"}
+    todays = [{**today, "price": 94.0 + 0.4 * i} for i in range(5)]
+
+    lines = _bulk(client, todays)
+
+    assert [line["index"] for line in lines] == list(range(5))
+    for line, req in zip(lines, todays):
+        single = client.post("/recommend_price", json=req).json()
+        assert {k: v for k, v in line.items() if k != "index"} == single
+
+
+def test_bulk_failure_is_reported_on_the_offending_line_only(client, monkeypatch):
+    monkeypatch.setattr(main, "BULK_INFERENCE_CHUNK_SIZE", 3)
+    today = {k: v for k, v in OBSERVATION.items() if k != "volume"}
+    todays = [today, {**today, "station_id": "unknown"}, today, today]
+
+    lines = _bulk(client, todays)
+
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert "error" in lines[1]
+    assert all("recommended_price" in lines[i] for i in (0, 2, 3))
+    assert lines[0] == {**lines[2], "index": 0}
+
+
+@pytest.fixture
+def releases(monkeypatch, tmp_path, feature_df, small_params):
+    """Two published releases in tmp_path; the first is promoted and served."""
+    releases_dir = str(tmp_path / "releases")
+    pointer_path = str(tmp_path / "CURRENT")
+    versions = [
+        publish_model_release(
+            fit_regressor(feature_df, params={**small_params, "max_depth": depth}),
+            FEATURE_COLUMNS,
+            "volume",
+            releases_dir=releases_dir,
+        )
+        for depth in (2, 3)
+    ]
+    promote_model_release(versions[0], pointer_path=pointer_path, releases_dir=releases_dir)
+    monkeypatch.setattr(
+        main, "current_manifest_path", lambda: current_manifest_path(pointer_path, releases_dir)
+    )
+    monkeypatch.setattr(
+        main, "release_manifest_path", lambda v: release_manifest_path(v, releases_dir)
+    )
+    main.reload_model(main.current_manifest_path())
+    return versions, pointer_path, releases_dir
+
+
+def test_reload_swaps_the_model_version_in_metrics(client, releases):
+    versions, _, releases_dir = releases
+    before = client.get("/metrics").json()["model_version"]
+
+    response = client.post("/admin/reload_model", json={"version": versions[1]})
+
+    assert response.status_code == 200
+    after = client.get("/metrics").json()["model_version"]
+    assert after == response.json()["model_version"] != before
+    assert main._bundle.manifest_path == release_manifest_path(versions[1], releases_dir)
+
+
+def test_failed_reload_keeps_the_previous_model(client, releases):
+    versions, _, releases_dir = releases
+    bundle = main._bundle
+    model_file = Path(release_manifest_path(versions[1], releases_dir)).with_name(
+        "volume_model.ubj"
+    )
+    model_file.write_bytes(b"corrupted")
+
+    response = client.post("/admin/reload_model", json={"version": versions[1]})
+    assert response.status_code == 500
+    response = client.post("/admin/reload_model", json={"version": "missing"})
+    assert response.status_code == 500
+
+    assert main._bundle is bundle
+    assert client.get("/metrics").json()["model_version"] == bundle.version
+    today = {k: v for k, v in OBSERVATION.items() if k != "volume"}
+    assert client.post("/recommend_price", json=today).status_code == 200
+
+
+def test_watcher_reloads_when_current_is_repointed(client, releases, monkeypatch):
+    versions, pointer_path, releases_dir = releases
+    monkeypatch.setattr(main, "MODEL_POLL_INTERVAL_S", 0.01)
+    before = main._bundle.version
+
+    async def promote_and_wait() -> None:
+        watcher = asyncio.get_running_loop().create_task(main._watch_model_releases())
+        try:
+            await asyncio.sleep(0.05)
+            assert main._bundle.version == before
+            promote_model_release(versions[1], pointer_path=pointer_path, releases_dir=releases_dir)
+            for _ in range(500):
+                if main._bundle.version != before:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            watcher.cancel()
+
+    asyncio.run(promote_and_wait())
+
+    assert main._bundle.manifest_path == release_manifest_path(versions[1], releases_dir)
+    assert client.get("/metrics").json()["model_version"] == main._bundle.version != before
@@ -0,0 +1,56 @@
+"""
+Tests for the rolling-origin backtest engine.
+"""
+
+import pandas as pd
+
+from src.backtest import rolling_origin_folds, run_backtest
+from src.features import build_feature_table
+
+
+def test_folds_never_train_on_the_test_window():
+    dates = pd.Series(pd.date_range("2024-01-01", periods=100, freq="D"))
+    expanding = rolling_origin_folds(dates, min_train_days=60, horizon_days=7, step_days=10)
+    sliding = rolling_origin_folds(
+        dates, min_train_days=60, horizon_days=7, step_days=10, window_days=30
+    )
+
+    assert [f["origin"] for f in expanding] == [60, 70, 80, 90]
+    assert [f["test_end"] for f in expanding] == [67, 77, 87, 97]
+    assert all(f["train_start"] == 0 for f in expanding)
+    assert [f["train_start"] for f in sliding] == [30, 40, 50, 60]
+
+
+def test_folds_with_an_empty_window_are_skipped(synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    start = feature_df["date"].min()
+    gap = (feature_df["date"] >= start + pd.Timedelta(days=80)) & (
+        feature_df["date"] < start + pd.Timedelta(days=100)
+    )
+    feature_df = feature_df[~gap]
+
+    folds = rolling_origin_folds(
+        feature_df["date"], min_train_days=60, horizon_days=10, step_days=10
+    )
+    assert [f["origin"] for f in folds] == [60, 70, 100, 110]
+    assert [f["fold"] for f in folds] == [0, 1, 2, 3]
+
+    report = run_backtest(feature_df, folds, small_params, workers=1)
+    assert (report["n_test"] > 0).all()
+    assert report[["mae", "rmse"]].notna().all().all()
+
+def test_parallel_backtest_matches_serial(tmp_path, synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    folds = rolling_origin_folds(
+        feature_df["date"], min_train_days=60, horizon_days=10, step_days=20
+    )
+
+    serial = run_backtest(feature_df, folds, small_params, workers=1)
+    report_path = str(tmp_path / "report.parquet")
+    parallel = run_backtest(feature_df, folds, small_params, workers=2, report_path=report_path)
+
+    cols = ["fold", "origin", "n_train", "n_test", "mae", "rmse"]
+    pd.testing.assert_frame_equal(parallel[cols], serial[cols])
+    assert serial["n_train"].is_monotonic_increasing
+    assert (serial["origin"] > feature_df["date"].min()).all()
+    pd.testing.assert_frame_equal(pd.read_parquet(report_path)[cols], parallel[cols])
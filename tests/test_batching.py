@@ -0,0 +1,59 @@
+"""
+Tests for the API micro-batcher and in-flight deduplication.
+"""
+
+import asyncio
+
+from src.api.batching import MicroBatcher
+from src.api.singleflight import SingleFlight
+
+
+def test_concurrent_submissions_share_one_batch_call():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=100, max_wait_s=0.01)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_failing_item_does_not_fail_its_batch():
+    def process(items):
+        if any(item < 0 for item in items):
+            raise ValueError("negative item")
+        return [item + 1 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait_s=0.01)
+        return await asyncio.gather(
+            *(batcher.submit(i) for i in (1, -1, 2)), return_exceptions=True
+        )
+
+    ok_a, failed, ok_b = asyncio.run(run())
+    assert (ok_a, ok_b) == (2, 3)
+    assert isinstance(failed, ValueError)
+
+
+def test_identical_concurrent_calls_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("same-key", compute) for _ in range(10)))
+        return results, flight.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert stats == {"in_flight": 0, "started": 1, "coalesced": 9}
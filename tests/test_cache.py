@@ -0,0 +1,40 @@
+"""
+Tests for the recommendation cache.
+"""
+
+from src.api.cache import RecommendationCache, recommendation_cache_key
+
+TODAY = {
+    "date": "2024-12-31",
+    "price": 94.45,
+    "cost": 85.77,
+    "comp1_price": 95.01,
+    "comp2_price": 95.7,
+    "comp3_price": 95.21,
+}
+
+
+def test_lru_eviction_and_ttl_expiry():
+    now = [0.0]
+    cache = RecommendationCache(max_entries=2, ttl_s=10.0, clock=lambda: now[0])
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert (stats["evictions"], stats["expirations"]) == (1, 1)
+
+
+def test_key_quantizes_prices_and_tracks_versions():
+    near = {**TODAY, "cost": TODAY["cost"] + 0.001}
+    assert recommendation_cache_key(TODAY, "m1", "h1") == recommendation_cache_key(near, "m1", "h1")
+    assert recommendation_cache_key(TODAY, "m1", "h1") != recommendation_cache_key(TODAY, "m2", "h1")
+    assert recommendation_cache_key(TODAY, "m1", "h1") != recommendation_cache_key(TODAY, "m1", "h2")
@@ -0,0 +1,48 @@
+"""
+Tests for out-of-core training from the partitioned feature dataset.
+"""
+
+import numpy as np
+
+from src.external_training import feature_dataset, fit_external_memory, validation_cutoff
+from src.feature_store import write_feature_dataset
+from src.features import FEATURE_COLUMNS, build_feature_table
+from src.model_store import load_model_artifacts, save_model_artifacts
+from src.modeling import build_regressor, evaluate_model, time_based_split
+
+
+def test_external_memory_training_matches_in_memory_fit(
+    tmp_path, synthetic_history, small_params
+):
+    feature_df = build_feature_table(synthetic_history())
+    root = str(tmp_path / "features")
+    write_feature_dataset(feature_df, root)
+
+    train_df, val_df = time_based_split(feature_df)
+    assert validation_cutoff(feature_dataset(root)) == val_df["date"].min()
+
+    booster, metadata = fit_external_memory(
+        root, params=small_params, batch_rows=16, cache_dir=str(tmp_path / "cache")
+    )
+
+    assert metadata["n_train"] == len(train_df)
+    assert metadata["n_val"] == len(val_df)
+    assert metadata["external_memory"]["n_train_batches"] > 1
+    memory = metadata["external_memory"]
+    assert memory["peak_rss_mb"] > 0
+    assert memory["peak_rss_before_mb"] > 0
+    if memory["peak_rss_scope"] == "training":
+        assert memory["peak_rss_mb"] >= memory["rss_before_mb"]
+    assert list((tmp_path / "cache").iterdir()) == []
+
+    model = build_regressor(params=small_params)
+    model.fit(train_df[FEATURE_COLUMNS], train_df["volume"])
+    expected = evaluate_model(model, val_df)
+    np.testing.assert_allclose(metadata["metrics"]["mae"], expected["mae"], rtol=1e-3)
+
+    # A bare booster saves to a model file that loads as an XGBRegressor.
+    manifest_path = str(tmp_path / "model_manifest.json")
+    save_model_artifacts(booster, FEATURE_COLUMNS, "volume", manifest_path)
+    loaded, _ = load_model_artifacts(manifest_path)
+    X = val_df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(loaded.predict(X), booster.inplace_predict(X), rtol=1e-6)
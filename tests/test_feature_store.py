@@ -0,0 +1,30 @@
+"""
+Tests for the persisted serving history snapshot.
+"""
+
+from src.data_pipeline import clean_history, load_raw_history
+from src.feature_store import load_history_snapshot, write_history_snapshot
+from src.features import build_feature_table
+from src.pricing import build_history_contexts
+
+
+def test_snapshot_round_trip_and_staleness_check(tmp_path, synthetic_history):
+    raw_path = str(tmp_path / "history.csv")
+    synthetic_history().to_csv(raw_path, index=False)
+    paths = dict(
+        snapshot_path=str(tmp_path / "snapshot.parquet"),
+        meta_path=str(tmp_path / "snapshot.json"),
+    )
+
+    feature_df = build_feature_table(clean_history(load_raw_history(raw_path)))
+    write_history_snapshot(feature_df, raw_path, days=10, **paths)
+
+    snapshot = load_history_snapshot(raw_path, **paths)
+    assert len(snapshot) == 10
+    assert build_history_contexts(
+        snapshot, date_min=snapshot.attrs["date_min"]
+    ) == build_history_contexts(feature_df)
+
+    with open(raw_path, "a") as f:
+        f.write("2024-12-31,95.0,85.0,95.0,95.0,95.0,15000\n")
+    assert load_history_snapshot(raw_path, **paths) is None
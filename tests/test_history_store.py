@@ -0,0 +1,76 @@
+"""
+Tests for the partitioned Parquet history store.
+"""
+
+import pandas as pd
+import pytest
+
+from src.data_pipeline import clean_history, ingest_history_csv, load_raw_history
+from src.history_store import history_dataset, history_filter, write_history_store
+
+
+@pytest.fixture
+def two_station_history(synthetic_history) -> pd.DataFrame:
+    return pd.concat(
+        [
+            synthetic_history().assign(station_id="007"),
+            synthetic_history(60).assign(station_id="b"),
+        ],
+        ignore_index=True,
+    )
+
+
+def test_store_round_trip_matches_csv_loader(tmp_path, two_station_history):
+    csv_path = str(tmp_path / "history.csv")
+    store_path = str(tmp_path / "store")
+    two_station_history.to_csv(csv_path, index=False)
+    write_history_store(load_raw_history(csv_path), store_path)
+
+    pd.testing.assert_frame_equal(
+        load_raw_history(store_path), load_raw_history(csv_path), check_dtype=False
+    )
+
+    filters = dict(stations=["007"], start="2024-02-10", end="2024-03-05")
+    pd.testing.assert_frame_equal(
+        load_raw_history(store_path, **filters),
+        load_raw_history(csv_path, **filters),
+        check_dtype=False,
+    )
+
+
+def test_filters_prune_partitions(tmp_path, two_station_history):
+    store_path = str(tmp_path / "store")
+    write_history_store(two_station_history, store_path)
+    dataset = history_dataset(store_path)
+
+    # 4 months for station "007" (120 days) + 2 months for "b" (60 days).
+    assert len(dataset.files) == 6
+    fragments = dataset.get_fragments(
+        filter=history_filter(stations=["007"], start="2024-02-10", end="2024-03-05")
+    )
+    assert len(list(fragments)) == 2
+
+
+def test_chunked_csv_ingestion_matches_in_memory_cleaning(tmp_path, two_station_history):
+    raw = two_station_history.copy()
+    raw.loc[[3, 50, 130], "price"] = -1.0
+    raw.loc[[7, 140], "volume"] = None
+    csv_path = str(tmp_path / "history.csv")
+    store_path = str(tmp_path / "store")
+    raw.to_csv(csv_path, index=False)
+
+    stats = ingest_history_csv(csv_path, store_path, chunk_rows=25)
+
+    assert {k: stats[k] for k in ("chunks", "rows_read", "rows_kept")} == {
+        "chunks": 8,
+        "rows_read": 180,
+        "rows_kept": 175,
+    }
+    # Partitions split across chunks are compacted to one file each.
+    assert stats["partitions_compacted"] > 0
+    assert len(history_dataset(store_path).files) == 6
+    pd.testing.assert_frame_equal(
+        load_raw_history(store_path),
+        clean_history(load_raw_history(csv_path)),
+        check_dtype=False,
+    )
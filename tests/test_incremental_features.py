@@ -0,0 +1,38 @@
+"""
+Tests for the incremental feature engine.
+"""
+
+import pandas as pd
+import pytest
+
+from src.data_pipeline import clean_history
+from src.features import build_feature_table
+from src.incremental_features import (
+    IncrementalFeatureEngine,
+    build_feature_table_incremental,
+)
+from src.pricing import HistoryContext
+
+
+def test_incremental_features_match_batch_feature_table(synthetic_history):
+    clean_df = clean_history(synthetic_history())
+    expected = build_feature_table(clean_df.copy())
+
+    got = build_feature_table_incremental(clean_df)
+
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False)
+
+
+def test_engine_seeded_from_snapshot_continues_history(synthetic_history):
+    clean_df = clean_history(synthetic_history())
+    full = build_feature_table(clean_df.copy())
+    head = build_feature_table(clean_df.iloc[:-5].copy())
+
+    engine = IncrementalFeatureEngine.from_feature_table(head.tail(10), date_min=head["date"].min())
+    rows = engine.update_many(clean_df.tail(5).to_dict("records"))
+
+    assert [r["trend_index"] for r in rows] == list(full["trend_index"].tail(5))
+    assert engine.context() == HistoryContext.from_feature_table(full)
+
+    with pytest.raises(ValueError, match="not after"):
+        engine.update(clean_df.iloc[-1].to_dict())
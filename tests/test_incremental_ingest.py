@@ -0,0 +1,87 @@
+"""
+Tests for watermark-based incremental ingestion.
+"""
+
+import pandas as pd
+
+from src.data_pipeline import clean_history, load_raw_history
+from src.features import build_feature_table
+from src.incremental_ingest import (
+    append_feature_rows,
+    ingest_full,
+    ingest_incremental,
+    reset_watermark,
+)
+
+
+def _write_csv(df: pd.DataFrame, path: str, append: bool = False) -> None:
+    df = df.assign(date=df["date"].dt.strftime("%Y-%m-%d"))
+    df.to_csv(path, index=False, mode="a" if append else "w", header=not append)
+
+
+def test_incremental_ingest_matches_full_rebuild(tmp_path, synthetic_history):
+    history = pd.concat(
+        [
+            synthetic_history().assign(station_id="a"),
+            synthetic_history(100).assign(station_id="b"),
+        ],
+        ignore_index=True,
+    )
+    old = history[history["date"] < "2024-03-20"]
+    new = history[history["date"] >= "2024-03-20"]
+    paths = dict(
+        csv_path=str(tmp_path / "history.csv"),
+        store_root=str(tmp_path / "store"),
+        watermark_path=str(tmp_path / "watermark.json"),
+    )
+
+    assert ingest_incremental(**paths) is None
+    _write_csv(old, paths["csv_path"])
+    old_history, commit = ingest_full(**paths)
+    old_features = build_feature_table(old_history)
+    commit()
+    old_store = load_raw_history(paths["store_root"])
+
+    _write_csv(new, paths["csv_path"], append=True)
+    # Until committed, neither the store nor the watermark moves, so an
+    # interrupted run reads the same rows again.
+    uncommitted, _ = ingest_incremental(**paths)
+    pd.testing.assert_frame_equal(load_raw_history(paths["store_root"]), old_store)
+    new_features, commit = ingest_incremental(**paths)
+    pd.testing.assert_frame_equal(new_features, uncommitted)
+    commit()
+
+    expected = build_feature_table(clean_history(load_raw_history(paths["csv_path"])))
+    got = pd.concat([old_features, new_features], ignore_index=True)
+    got = got.sort_values(["station_id", "date"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False)
+    pd.testing.assert_frame_equal(
+        load_raw_history(paths["store_root"]),
+        load_raw_history(paths["csv_path"]),
+        check_dtype=False,
+    )
+
+    # Nothing appended: nothing new; a rewritten prefix needs a full ingest.
+    assert ingest_incremental(**paths)[0].empty
+    _write_csv(history.iloc[1:], paths["csv_path"])
+    assert ingest_incremental(**paths) is None
+
+
+def test_reingested_rows_replace_saved_feature_rows(tmp_path, synthetic_history):
+    features = build_feature_table(synthetic_history())
+    tail = features.tail(5).assign(volume=lambda d: d["volume"] + 1)
+
+    merged = append_feature_rows(features, tail)
+
+    assert len(merged) == len(features)
+    pd.testing.assert_frame_equal(
+        merged.tail(5).reset_index(drop=True), tail.reset_index(drop=True)
+    )
+
+    watermark_path = str(tmp_path / "watermark.json")
+    csv_path = str(tmp_path / "history.csv")
+    _write_csv(synthetic_history(), csv_path)
+    ingest_full(csv_path, str(tmp_path / "store"), watermark_path)[1]()
+    reset_watermark(watermark_path)
+    reset_watermark(watermark_path)
+    assert ingest_incremental(csv_path, str(tmp_path / "store"), watermark_path) is None
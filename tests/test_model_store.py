@@ -0,0 +1,86 @@
+"""
+Tests for native model persistence.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from xgboost import XGBRegressor
+
+from src.model_store import (
+    current_manifest_path,
+    load_model_artifacts,
+    promote_model_release,
+    prune_model_releases,
+    publish_model_release,
+    save_model_artifacts,
+)
+
+
+def _tiny_model() -> XGBRegressor:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 2))
+    y = X[:, 0] * 3 + rng.normal(size=50)
+    return XGBRegressor(n_estimators=5, max_depth=2).fit(X, y)
+
+
+def test_native_round_trip_preserves_predictions(tmp_path):
+    model = _tiny_model()
+    manifest_path = str(tmp_path / "model_manifest.json")
+    save_model_artifacts(model, ["price", "cost"], "volume", manifest_path)
+
+    loaded, manifest = load_model_artifacts(manifest_path)
+
+    X = np.array([[0.5, -1.0], [2.0, 0.0]])
+    np.testing.assert_allclose(loaded.predict(X), model.predict(X))
+    assert manifest["feature_columns"] == ["price", "cost"]
+
+
+def test_manifest_checksum_and_schema_are_enforced(tmp_path):
+    manifest_path = tmp_path / "model_manifest.json"
+    save_model_artifacts(_tiny_model(), ["price"], "volume", str(manifest_path))
+
+    (tmp_path / "volume_model.ubj").write_bytes(b"corrupted")
+    with pytest.raises(ValueError, match="Checksum"):
+        load_model_artifacts(str(manifest_path))
+
+    manifest = json.loads(manifest_path.read_text())
+    manifest["feature_columns"] = ["not_a_feature"]
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="unknown feature"):
+        load_model_artifacts(str(manifest_path))
+
+
+def test_publish_and_promote_release(tmp_path):
+    releases_dir = str(tmp_path / "releases")
+    pointer_path = str(tmp_path / "CURRENT")
+
+    version = publish_model_release(
+        _tiny_model(), ["price"], "volume", releases_dir=releases_dir
+    )
+    assert not any(p.name.startswith(".staging") for p in (tmp_path / "releases").iterdir())
+
+    promote_model_release(version, pointer_path=pointer_path, releases_dir=releases_dir)
+    manifest_path = current_manifest_path(pointer_path=pointer_path, releases_dir=releases_dir)
+    _, manifest = load_model_artifacts(manifest_path)
+    assert manifest["feature_columns"] == ["price"]
+
+    with pytest.raises(FileNotFoundError):
+        promote_model_release("missing", pointer_path=pointer_path, releases_dir=releases_dir)
+
+
+def test_prune_keeps_the_newest_releases_and_current(tmp_path):
+    releases_dir = str(tmp_path / "releases")
+    pointer_path = str(tmp_path / "CURRENT")
+    versions = [
+        publish_model_release(_tiny_model(), ["price"], "volume", releases_dir=releases_dir)
+        for _ in range(5)
+    ]
+    promote_model_release(versions[0], pointer_path=pointer_path, releases_dir=releases_dir)
+
+    pruned = prune_model_releases(2, pointer_path=pointer_path, releases_dir=releases_dir)
+
+    assert pruned == versions[1:3]
+    remaining = sorted(p.name for p in (tmp_path / "releases").iterdir())
+    assert remaining == [versions[0]] + versions[3:]
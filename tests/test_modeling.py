@@ -0,0 +1,155 @@
+"""
+Tests for model fitting, warm-start retraining and monotone constraints.
+"""
+
+import json
+from functools import partial
+
+import numpy as np
+import pytest
+
+from src import model_store, modeling, pricing
+from src.features import FEATURE_COLUMNS, build_feature_table
+from src.modeling import build_regressor, fit_regressor, fit_warm_start, training_matrix
+from src.pricing import HistoryContext, build_candidate_matrix
+
+TODAY = {
+    "date": "2024-05-01",
+    "price": 95.0,
+    "cost": 85.5,
+    "comp1_price": 95.2,
+    "comp2_price": 95.6,
+    "comp3_price": 94.9,
+}
+
+
+def test_warm_start_appends_trees_and_keeps_base_model(synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    old, recent = feature_df.iloc[:80], feature_df.iloc[60:]
+
+    base = build_regressor(params=small_params)
+    base.fit(old[FEATURE_COLUMNS], old["volume"])
+    base_pred = base.predict(feature_df[FEATURE_COLUMNS])
+
+    warm = fit_warm_start(base, recent, n_trees=5, params=small_params)
+
+    assert warm.get_booster().num_boosted_rounds() == 25
+    assert base.get_booster().num_boosted_rounds() == 20
+    np.testing.assert_array_equal(base.predict(feature_df[FEATURE_COLUMNS]), base_pred)
+    # The first 20 trees are the base model's.
+    np.testing.assert_allclose(
+        warm.predict(feature_df[FEATURE_COLUMNS], iteration_range=(0, 20)), base_pred, rtol=1e-6
+    )
+
+
+def test_fit_regressor_matches_sklearn_fit_and_caches_dmatrix(
+    tmp_path, synthetic_history, small_params
+):
+    feature_df = build_feature_table(synthetic_history())
+    X = feature_df[FEATURE_COLUMNS]
+
+    reference = build_regressor(params=small_params)
+    reference.fit(X, feature_df["volume"])
+    model = fit_regressor(feature_df, params=small_params)
+    np.testing.assert_allclose(model.predict(X), reference.predict(X), rtol=1e-6)
+
+    cache_dir = tmp_path / "dmatrix"
+    first = training_matrix(feature_df, str(cache_dir))
+    (cache_file,) = cache_dir.iterdir()
+    mtime = cache_file.stat().st_mtime_ns
+    second = training_matrix(feature_df, str(cache_dir))
+    assert cache_file.stat().st_mtime_ns == mtime
+    assert second.num_row() == first.num_row() == len(feature_df)
+    np.testing.assert_array_equal(second.get_label(), feature_df["volume"].to_numpy())
+
+    cached = fit_regressor(feature_df, params=small_params, dmatrix_cache_dir=str(cache_dir))
+    np.testing.assert_allclose(cached.predict(X), reference.predict(X), rtol=1e-6)
+
+
+def test_warm_start_retrains_fully_when_monotone_flag_differs(
+    tmp_path, monkeypatch, synthetic_history, small_params
+):
+    feature_df = build_feature_table(synthetic_history())
+    base = fit_regressor(feature_df, params=small_params)
+    metadata_path = tmp_path / "training_metadata.json"
+    metadata_path.write_text(json.dumps({"warm_start_updates": 0}))
+    manifest = {"feature_columns": FEATURE_COLUMNS, "monotone_constraints": {}}
+
+    full_retrains = []
+    monkeypatch.setattr(modeling, "TRAINING_METADATA_PATH", str(metadata_path))
+    monkeypatch.setattr(modeling, "load_model_artifacts", lambda: (base, manifest))
+    monkeypatch.setattr(
+        modeling, "train_volume_model", lambda df, monotone, params: full_retrains.append(monotone)
+    )
+
+    modeling.warm_start_volume_model(feature_df, params=small_params, monotone=True)
+    assert full_retrains == [True]
+
+
+def test_monotone_model_volume_does_not_increase_with_price(synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    model = fit_regressor(feature_df, monotone=True, params=small_params)
+
+    prices = np.linspace(80.0, 110.0, 121)
+    X = build_candidate_matrix(
+        TODAY, prices, HistoryContext.from_feature_table(feature_df), FEATURE_COLUMNS
+    )
+    volumes = model.predict(X)
+
+    assert np.all(np.diff(volumes) <= 0)
+    assert volumes[0] > volumes[-1]
+
+
+def _publish(tmp_path, monkeypatch, model, monotone) -> str:
+    """Publish through `modeling.publish_volume_model` into tmp_path; returns the manifest path."""
+    releases_dir = str(tmp_path / "releases")
+    pointer_path = str(tmp_path / "CURRENT")
+    monkeypatch.setattr(
+        modeling,
+        "publish_model_release",
+        partial(model_store.publish_model_release, releases_dir=releases_dir),
+    )
+    monkeypatch.setattr(
+        modeling,
+        "promote_model_release",
+        partial(
+            model_store.promote_model_release,
+            pointer_path=pointer_path,
+            releases_dir=releases_dir,
+        ),
+    )
+    monkeypatch.setattr(
+        modeling,
+        "prune_model_releases",
+        partial(
+            model_store.prune_model_releases,
+            pointer_path=pointer_path,
+            releases_dir=releases_dir,
+        ),
+    )
+    monkeypatch.setattr(modeling, "FEATURE_CONFIG_PATH", str(tmp_path / "feature_config.json"))
+    monkeypatch.setattr(
+        modeling, "TRAINING_METADATA_PATH", str(tmp_path / "training_metadata.json")
+    )
+    modeling.publish_volume_model(model, monotone, {})
+    return model_store.current_manifest_path(pointer_path, releases_dir)
+
+
+def test_monotone_constraints_are_recorded_and_enforced_at_load(
+    tmp_path, monkeypatch, synthetic_history, small_params
+):
+    feature_df = build_feature_table(synthetic_history())
+    monkeypatch.setattr(pricing, "PRICE_SEARCH_STRATEGY", "monotone")
+
+    manifest_path = _publish(
+        tmp_path, monkeypatch, fit_regressor(feature_df, monotone=True, params=small_params), True
+    )
+    _, manifest = pricing.load_model_with_manifest(manifest_path=manifest_path)
+    assert manifest["monotone_constraints"] == {"price": -1, "price_gap_vs_avg": -1}
+
+    manifest_path = _publish(
+        tmp_path, monkeypatch, fit_regressor(feature_df, params=small_params), False
+    )
+    assert model_store.read_manifest(manifest_path).get("monotone_constraints", {}) == {}
+    with pytest.raises(ValueError, match="monotone"):
+        pricing.load_model_with_manifest(manifest_path=manifest_path)
@@ -0,0 +1,66 @@
+"""
+Tests for price search strategies on a model with a known profit curve,
+and of the monotone search on a monotone-constrained model.
+"""
+
+import numpy as np
+import pytest
+
+from src.features import FEATURE_COLUMNS, build_feature_table
+from src.modeling import fit_regressor
+from src.price_search import SEARCH_STRATEGIES, run_search
+from src.pricing import HistoryContext, recommend_price_for_today
+
+
+class _LinearDemand:
+    """Volume falls linearly with price (column 0): profit is unimodal."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return 20000.0 - 150.0 * np.asarray(X)[:, 0]
+
+
+@pytest.mark.parametrize("strategy", SEARCH_STRATEGIES)
+def test_strategies_find_grid_optimum_of_unimodal_profit(strategy):
+    prices = np.round(np.arange(60.0, 90.0, 0.01), 2)
+    X = prices[:, None]
+    cost = 10.0
+
+    expected = run_search("grid", prices, X, cost, _LinearDemand(), grid_step=0.01)
+    result = run_search(strategy, prices, X, cost, _LinearDemand(), grid_step=0.01)
+
+    assert result["recommended_price"] == expected["recommended_price"]
+    if strategy != "grid":
+        assert result["num_candidates_evaluated"] < len(prices) / 4
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError, match="Unknown price search strategy"):
+        run_search("simplex", np.array([1.0]), np.ones((1, 1)), 0.0, _LinearDemand())
+
+
+def test_monotone_search_matches_grid_on_monotone_model(synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    model = fit_regressor(feature_df, monotone=True, params=small_params)
+    ctx = HistoryContext.from_feature_table(feature_df)
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        shift = rng.normal(0, 2.0)
+        today = {
+            "date": "2024-05-01",
+            "price": round(95.0 + shift, 2),
+            "cost": round(85.5 + shift + rng.normal(0, 1.0), 2),
+            "comp1_price": round(95.2 + shift, 2),
+            "comp2_price": round(95.6 + shift, 2),
+            "comp3_price": round(94.9 + shift, 2),
+        }
+        expected = recommend_price_for_today(today, ctx, model, FEATURE_COLUMNS, "grid", 0.01)
+        result = recommend_price_for_today(today, ctx, model, FEATURE_COLUMNS, "monotone", 0.01)
+
+        assert result["recommended_price"] == expected["recommended_price"]
+        assert result["expected_profit"] == expected["expected_profit"]
+        assert result["num_candidates_evaluated"] < expected["num_candidates_evaluated"]
@@ -0,0 +1,119 @@
+"""
+Tests for the pricing engine using a small model trained on synthetic history.
+"""
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from src.features import FEATURE_COLUMNS, TARGET_COLUMN, build_feature_table
+from src.modeling import fit_regressor
+from src.pricing import (
+    HistoryContext,
+    build_feature_row_for_candidate,
+    build_history_contexts,
+    build_price_grid,
+    recommend_price_for_today,
+    recommend_prices_batch,
+)
+from src.tree_inference import compile_model
+
+
+TODAY = {
+    "date": "2024-05-01",
+    "price": 95.0,
+    "cost": 85.5,
+    "comp1_price": 95.2,
+    "comp2_price": 95.6,
+    "comp3_price": 94.9,
+}
+
+
+def test_recommendation_matches_per_candidate_scoring(synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    model = fit_regressor(feature_df, params=small_params)
+
+    result = recommend_price_for_today(TODAY, feature_df, model, FEATURE_COLUMNS)
+
+    avg_comp = float(np.mean([TODAY["comp1_price"], TODAY["comp2_price"], TODAY["comp3_price"]]))
+    prices = build_price_grid(TODAY["cost"], TODAY["price"], avg_comp)
+    profits = []
+    for p in prices:
+        row = build_feature_row_for_candidate(TODAY, float(p), feature_df)
+        vol = float(model.predict(pd.DataFrame([row])[FEATURE_COLUMNS])[0])
+        profits.append((float(p) - TODAY["cost"]) * vol)
+
+    best_idx = int(np.argmax(profits))
+    assert result["num_candidates_evaluated"] == len(prices)
+    assert result["recommended_price"] == float(prices[best_idx])
+    assert np.isclose(result["expected_profit"], profits[best_idx])
+
+
+def test_history_context_gives_same_recommendation_as_feature_table(
+    synthetic_history, small_params
+):
+    feature_df = build_feature_table(synthetic_history())
+    model = fit_regressor(feature_df, params=small_params)
+    ctx = HistoryContext.from_feature_table(feature_df.sample(frac=1.0, random_state=1))
+
+    assert ctx.date_min == feature_df["date"].min()
+    assert recommend_price_for_today(TODAY, ctx, model, FEATURE_COLUMNS) == (
+        recommend_price_for_today(TODAY, feature_df, model, FEATURE_COLUMNS)
+    )
+
+
+def test_batch_recommendations_match_single_requests(synthetic_history, small_params):
+    feature_df = build_feature_table(synthetic_history())
+    model = fit_regressor(feature_df, params=small_params)
+    ctx = HistoryContext.from_feature_table(feature_df)
+    todays = [TODAY, {**TODAY, "cost": 86.0, "price": 94.2}, {**TODAY, "date": "2024-05-04"}]
+
+    batch = recommend_prices_batch(todays, ctx, model, FEATURE_COLUMNS)
+    singles = [recommend_price_for_today(t, ctx, model, FEATURE_COLUMNS) for t in todays]
+
+    assert len(batch) == len(singles)
+    for got, expected in zip(batch, singles):
+        assert got["recommended_price"] == expected["recommended_price"]
+        assert got["num_candidates_evaluated"] == expected["num_candidates_evaluated"]
+        assert abs(got["expected_profit"] - expected["expected_profit"]) < 1e-6 * abs(expected["expected_profit"])
+
+
+def test_compiled_trees_match_xgboost_predictions(synthetic_history):
+    feature_df = build_feature_table(synthetic_history())
+    model = XGBRegressor(n_estimators=30, max_depth=4, random_state=0)
+    model.fit(feature_df[FEATURE_COLUMNS], feature_df[TARGET_COLUMN])
+    compiled = compile_model(model)
+
+    X = feature_df[FEATURE_COLUMNS].to_numpy()
+    X[::5, FEATURE_COLUMNS.index("lag7_volume")] = np.nan
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=1e-5)
+
+    ctx = HistoryContext.from_feature_table(feature_df)
+    assert recommend_price_for_today(TODAY, ctx, compiled, FEATURE_COLUMNS)["recommended_price"] == (
+        recommend_price_for_today(TODAY, ctx, model, FEATURE_COLUMNS)["recommended_price"]
+    )
+
+
+def test_multi_station_features_match_per_station_tables(synthetic_history, small_params):
+    a = synthetic_history().assign(station_id="a")
+    b = synthetic_history(90).assign(station_id="b", volume=lambda d: d["volume"] * 2)
+    # Interleave the stations to make sure rows are grouped, not just sorted.
+    feature_df = build_feature_table(pd.concat([b, a]).sample(frac=1, random_state=0))
+
+    for station, raw in (("a", a), ("b", b)):
+        expected = build_feature_table(raw)
+        got = feature_df[feature_df["station_id"] == station].reset_index(drop=True)
+        pd.testing.assert_frame_equal(got[expected.columns], expected, check_categorical=False)
+
+    contexts = build_history_contexts(feature_df)
+    model = fit_regressor(feature_df, params=small_params)
+    batch = recommend_prices_batch(
+        [{**TODAY, "station_id": "a"}, {**TODAY, "station_id": "b"}],
+        feature_df,
+        model,
+        FEATURE_COLUMNS,
+    )
+    for station, result in zip("ab", batch):
+        assert result == recommend_price_for_today(
+            TODAY, contexts[station], model, FEATURE_COLUMNS
+        )
@@ -3,9 +3,11 @@ Basic smoke tests to ensure the core modules at least import and
 very simple functionality behaves as expected.
 """
 
-from src.config import RANDOM_STATE
-from src.data_pipeline import clean_history
 import pandas as pd
+import pytest
+
+from src.config import RANDOM_STATE
+from src.data_pipeline import clean_history, load_raw_history
 
 
 def test_random_state_is_int():
@@ -28,3 +30,23 @@ def test_clean_history_filters_invalid_rows():
     clean_df = clean_history(df)
     assert len(clean_df) == 1
     assert float(clean_df.iloc[0]["price"]) == 100.0
+
+
+@pytest.mark.parametrize(
+    "volume, message", [(13513.5, "whole number"), (2.0**31, "fit in int32")]
+)
+def test_invalid_volumes_raise_on_load_and_clean(tmp_path, synthetic_history, volume, message):
+    raw = synthetic_history(10)
+    raw.loc[4, "volume"] = volume
+    csv_path = str(tmp_path / "history.csv")
+    raw.to_csv(csv_path, index=False)
+
+    with pytest.raises(ValueError, match=message):
+        load_raw_history(csv_path)
+    with pytest.raises(ValueError, match=message):
+        clean_history(raw)
+
+
+def test_whole_number_float_volumes_are_accepted(synthetic_history):
+    clean_df = clean_history(synthetic_history(10).astype({"volume": "float64"}))
+    assert str(clean_df["volume"].dtype) == "int32"
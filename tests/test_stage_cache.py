@@ -0,0 +1,62 @@
+"""
+Tests for content-addressed pipeline stage caching.
+"""
+
+import pandas as pd
+
+from src import config, stage_cache
+from src.stage_cache import cached_frame, cached_record, data_stage_keys, stage_key
+
+
+def test_cached_frame_reuses_output_until_inputs_change(tmp_path):
+    calls = []
+
+    def compute() -> pd.DataFrame:
+        calls.append(1)
+        return pd.DataFrame({"x": [1.0, 2.0]})
+
+    key = stage_key("features", upstream="abc", params={"depth": 6})
+    assert key == stage_key("features", params={"depth": 6}, upstream="abc")
+    cache = dict(cache_dir=str(tmp_path))
+
+    first, hit = cached_frame("features", key, compute, **cache)
+    assert not hit
+    second, hit = cached_frame("features", key, compute, **cache)
+    assert hit and len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    cached_frame("features", key, compute, force=True, **cache)
+    other = stage_key("features", upstream="abc", params={"depth": 4})
+    cached_frame("features", other, compute, **cache)
+    assert len(calls) == 3
+
+
+def test_cached_record_recomputes_when_invalid(tmp_path):
+    records = iter([{"version": "v1"}, {"version": "v2"}])
+    cache = dict(cache_dir=str(tmp_path))
+
+    assert cached_record("train", "k", lambda: next(records), **cache) == ({"version": "v1"}, False)
+    assert cached_record("train", "k", lambda: next(records), **cache) == ({"version": "v1"}, True)
+    assert cached_record(
+        "train", "k", lambda: next(records), is_valid=lambda r: False, **cache
+    ) == ({"version": "v2"}, False)
+
+
+def test_data_stage_keys_ignore_training_config(monkeypatch):
+    keys = data_stage_keys("raw-sha")
+
+    # Not hashing config.py as source: editing XGB_PARAMS there must not
+    # invalidate the data stages.
+    fingerprint = stage_cache.code_fingerprint
+
+    def code_fingerprint(*modules):
+        assert config not in modules
+        return fingerprint(*modules)
+
+    monkeypatch.setattr(stage_cache, "code_fingerprint", code_fingerprint)
+    monkeypatch.setattr(config, "XGB_PARAMS", {**config.XGB_PARAMS, "max_depth": 2})
+    assert data_stage_keys("raw-sha") == keys
+
+    monkeypatch.setattr(config, "DEFAULT_STATION_ID", "other")
+    assert data_stage_keys("raw-sha")[2] != keys[2]
+    assert data_stage_keys("other-sha")[2] != keys[2]
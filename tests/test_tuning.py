@@ -0,0 +1,43 @@
+"""
+Tests for the successive-halving hyperparameter search.
+"""
+
+import numpy as np
+
+from src.features import build_feature_table
+from src.tuning import best_params, sample_params, successive_halving, tuning_folds
+
+SPACE = {
+    "max_depth": [2, 3],
+    "learning_rate": (0.05, 0.5, "log"),
+    "subsample": (0.7, 1.0),
+}
+
+
+def test_sample_params_stays_in_space():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        params = sample_params(SPACE, rng)
+        assert params["max_depth"] in (2, 3)
+        assert 0.05 <= params["learning_rate"] <= 0.5
+        assert 0.7 <= params["subsample"] <= 1.0
+
+
+def test_successive_halving_prunes_and_picks_last_rung_winner(synthetic_history):
+    feature_df = build_feature_table(synthetic_history())
+    folds = tuning_folds(feature_df["date"], n_folds=2, val_days=15)
+    assert [f["test_end"] - f["origin"] for f in folds] == [15, 15]
+
+    report = successive_halving(
+        feature_df, n_trials=4, eta=2, max_rounds=40, space=SPACE, folds=folds, workers=2
+    )
+
+    assert report.groupby("rung")["trial"].count().tolist() == [4, 2, 1]
+    assert report.groupby("rung")["num_boost_round"].first().tolist() == [10, 20, 40]
+    assert (report["wall_s"] > 0).all()
+    assert (report.groupby("rung")["rung_wall_s"].nunique() == 1).all()
+    winner = report[report["rung"] == 2].iloc[0]
+    assert set(report[report["rung"] == 1]["trial"]) >= {winner["trial"]}
+    params = best_params(report)
+    assert params["n_estimators"] == winner["best_n_estimators"] <= 40
+    assert set(params) == set(SPACE) | {"n_estimators"}